@@ -2,8 +2,13 @@
 from .controller import (
     get_password_hash,
     verify_password,
+    hash_password_async,
+    verify_password_async,
     create_access_token,
     get_current_user,
+    get_user_from_token,
+    invalidate_user,
+    clear_auth_caches,
     SECRET_KEY,
     ALGORITHM,
     ACCESS_TOKEN_EXPIRE_MINUTES
@@ -14,8 +19,13 @@ from .model import UserCreate, UserResponse, UserInDB, Token
 __all__ = [
     "get_password_hash",
     "verify_password", 
+    "hash_password_async",
+    "verify_password_async",
     "create_access_token",
     "get_current_user",
+    "get_user_from_token",
+    "invalidate_user",
+    "clear_auth_caches",
     "SECRET_KEY",
     "ALGORITHM",
     "ACCESS_TOKEN_EXPIRE_MINUTES",
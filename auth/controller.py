@@ -1,12 +1,20 @@
 import os
+import time
+import asyncio
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from dotenv import load_dotenv
 
+from cache import TTLCache
+from metrics import Histogram, cache_metrics
+from singleflight import SingleFlight
+
 load_dotenv()
 
 # Secret settings
@@ -14,9 +22,39 @@ SECRET_KEY = os.getenv("SECRET_KEY", "supersecretkey")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# Auth caches, so repeat callers skip the JWT decode and the users lookup
+USER_CACHE_TTL_SECONDS = int(os.getenv("USER_CACHE_TTL_SECONDS", 60))
+USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", 1024))
+TOKEN_CACHE_ENABLED = os.getenv("TOKEN_CACHE_ENABLED", "true").lower() == "true"
+
+user_cache = TTLCache(maxsize=USER_CACHE_MAX_SIZE, ttl=USER_CACHE_TTL_SECONDS)
+token_cache = TTLCache(maxsize=USER_CACHE_MAX_SIZE, ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+cache_metrics("user", user_cache)
+cache_metrics("token", token_cache)
+# Concurrent cache misses for the same user share one users lookup;
+# get_current_user copies the record itself
+user_flight = SingleFlight(copy=None)
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
+# bcrypt is CPU-bound, so it runs on its own small thread pool instead of the
+# event loop. BCRYPT_MAX_PENDING caps hashes queued or running at once.
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", min(4, os.cpu_count() or 1)))
+BCRYPT_MAX_PENDING = int(os.getenv("BCRYPT_MAX_PENDING", 64))
+
+_bcrypt_executor = ThreadPoolExecutor(max_workers=BCRYPT_WORKERS, thread_name_prefix="bcrypt")
+_bcrypt_slots = asyncio.Semaphore(BCRYPT_MAX_PENDING)
+
+bcrypt_queue_seconds = Histogram(
+    "bcrypt_queue_seconds",
+    "Time password hashing jobs wait for a bcrypt worker thread"
+)
+bcrypt_run_seconds = Histogram(
+    "bcrypt_run_seconds",
+    "Time spent hashing or verifying a password on a bcrypt worker thread"
+)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against a hashed password."""
@@ -28,6 +66,36 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def _run_bcrypt(func, *args):
+    """Run a bcrypt call on the worker pool, recording queue and run time."""
+    submitted = time.perf_counter()
+    
+    def job():
+        started = time.perf_counter()
+        bcrypt_queue_seconds.observe(started - submitted)
+        try:
+            return func(*args)
+        finally:
+            bcrypt_run_seconds.observe(time.perf_counter() - started)
+    
+    async with _bcrypt_slots:
+        return await asyncio.get_running_loop().run_in_executor(_bcrypt_executor, job)
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password using bcrypt without blocking the event loop."""
+    return await _run_bcrypt(pwd_context.hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password without blocking the event loop.
+    Returns (valid, new_hash); new_hash is set when the stored hash uses
+    outdated CryptContext settings and should be replaced.
+    """
+    return await _run_bcrypt(pwd_context.verify_and_update, plain_password, hashed_password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
@@ -40,24 +108,106 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme)):
-    """Dependency to get the current authenticated user from JWT token."""
+def invalidate_user(email: str) -> None:
+    """Drop a cached user record. Call after updating or deleting a user."""
+    user_cache.delete(email)
+
+
+def clear_auth_caches() -> None:
+    """Drop every cached user record and decoded token."""
+    user_cache.clear()
+    token_cache.clear()
+
+
+def _decode_token_subject(token: str) -> Optional[str]:
+    """Decode a JWT and return its subject, caching the result until the token expires."""
+    key = hashlib.sha256(token.encode()).hexdigest()
+    if TOKEN_CACHE_ENABLED:
+        email = token_cache.get(key)
+        if email is not None:
+            return email
+    
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    email = payload.get("sub")
+    expires_at = payload.get("exp")
+    if TOKEN_CACHE_ENABLED and email is not None and expires_at is not None:
+        # Never keep a token cached past its own expiry
+        remaining = expires_at - time.time()
+        if remaining > 0:
+            token_cache.set(key, email, ttl=remaining)
+    return email
+
+
+async def ensure_user_counter() -> None:
+    """Create the registered-users counter from a one-off count if it does not exist yet."""
+    from database import db  # Import here to avoid circular imports
+    
+    if await db.counters.find_one({"_id": "users"}) is None:
+        user_count = await db.users.count_documents({})
+        await db.counters.update_one(
+            {"_id": "users"},
+            {"$setOnInsert": {"count": user_count}},
+            upsert=True
+        )
+
+
+async def reserve_user_slot(max_users: int) -> bool:
+    """Atomically claim one of max_users registration slots. Returns False when full."""
+    from database import db  # Import here to avoid circular imports
+    
+    query = {"_id": "users", "count": {"$lt": max_users}}
+    update = {"$inc": {"count": 1}}
+    if await db.counters.find_one_and_update(query, update) is not None:
+        return True
+    # The counter may not exist yet if startup could not reach the database
+    await ensure_user_counter()
+    return await db.counters.find_one_and_update(query, update) is not None
+
+
+async def release_user_slot() -> None:
+    """Give back a slot claimed by reserve_user_slot when registration fails."""
+    from database import db  # Import here to avoid circular imports
+    
+    await db.counters.update_one({"_id": "users"}, {"$inc": {"count": -1}})
+
+
+async def _load_user(email: str) -> Optional[dict]:
+    """Fetch a user by email and cache the record."""
     from database import db, fix_id  # Import here to avoid circular imports
     
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+    user = await db.users.find_one({"email": email})
+    if user is None:
+        return None
+    user = fix_id(user)
+    user_cache.set(email, user)
+    return user
+
+
+async def get_user_from_token(token: str) -> Optional[dict]:
+    """Resolve a JWT to its user, or None if the token or user is invalid."""
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
+        email = _decode_token_subject(token)
     except JWTError:
-        raise credentials_exception
+        return None
+    if email is None:
+        return None
     
-    user = await db.users.find_one({"email": email})
+    user = user_cache.get(email)
+    if user is None:
+        user = await user_flight.do(email, _load_user, email)
+        if user is None:
+            return None
+    # Hand out a copy so callers cannot mutate the cached record
+    return dict(user)
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme)):
+    """Dependency to get the current authenticated user from JWT token."""
+    user = await get_user_from_token(token)
     if user is None:
-        raise credentials_exception
-    return fix_id(user)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
@@ -2,15 +2,19 @@ import os
 from datetime import datetime, timedelta
 from fastapi import APIRouter, HTTPException, Depends, status
 from fastapi.security import OAuth2PasswordRequestForm
+from pymongo.errors import DuplicateKeyError
 from dotenv import load_dotenv
 
 from database import db, fix_id
 from .model import UserCreate, UserResponse, Token
 from .controller import (
-    get_password_hash,
-    verify_password,
+    hash_password_async,
+    verify_password_async,
     create_access_token,
     get_current_user,
+    invalidate_user,
+    reserve_user_slot,
+    release_user_slot,
     ACCESS_TOKEN_EXPIRE_MINUTES
 )
 
@@ -22,30 +26,33 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 @router.post("/register", response_model=UserResponse)
 async def register(user: UserCreate):
     """Register a new user with default 'user' role."""
-    # Check max user limit
+    # Check max user limit by claiming a slot on the users counter
     max_users = int(os.getenv("MAX_USERS", 3))
-    user_count = await db.users.count_documents({})
-    if user_count >= max_users:
+    if not await reserve_user_slot(max_users):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=f"Maximum user limit ({max_users}) reached. Registration is closed."
         )
     
-    # Check if user already exists
-    existing_user = await db.users.find_one({"email": user.email})
-    if existing_user:
-        raise HTTPException(status_code=400, detail="Email already registered")
-    
     # Hash password and save with default role
     user_dict = user.dict()
-    user_dict["hashed_password"] = get_password_hash(user.password)
     user_dict["role"] = "user"  # Default role for registered users
     user_dict["created_at"] = datetime.utcnow()
     del user_dict["password"]  # Don't save plain password
     
-    new_user = await db.users.insert_one(user_dict)
-    created_user = await db.users.find_one({"_id": new_user.inserted_id})
-    return fix_id(created_user)
+    # The unique email index rejects users that already exist
+    try:
+        user_dict["hashed_password"] = await hash_password_async(user.password)
+        await db.users.insert_one(user_dict)
+    except DuplicateKeyError:
+        await release_user_slot()
+        raise HTTPException(status_code=400, detail="Email already registered")
+    except Exception:
+        await release_user_slot()
+        raise
+    
+    # insert_one filled in _id, so the document is the response as-is
+    return fix_id(user_dict)
 
 
 @router.post("/token", response_model=Token)
@@ -53,13 +60,21 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
     """Login and get access token."""
     # Find user
     user = await db.users.find_one({"email": form_data.username})
-    if not user or not verify_password(form_data.password, user["hashed_password"]):
+    valid, new_hash = False, None
+    if user:
+        valid, new_hash = await verify_password_async(form_data.password, user["hashed_password"])
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Transparently upgrade hashes made with outdated bcrypt settings
+    if new_hash:
+        await db.users.update_one({"_id": user["_id"]}, {"$set": {"hashed_password": new_hash}})
+        invalidate_user(user["email"])
+    
     # Create Token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
@@ -0,0 +1 @@
+# Benchmarks, run with: python -m benchmarks.<name>
@@ -0,0 +1,63 @@
+"""
+Accuracy and throughput of the Google Maps coordinate parser.
+
+Usage: python -m benchmarks.bench_parser [--iterations N] [--json]
+"""
+import sys
+import json
+import time
+import argparse
+
+from wishlist.parser import parse_coordinates
+from .parser_corpus import PARSER_CORPUS
+
+
+def check_accuracy() -> list:
+    """Return the corpus cases whose parsed coordinates differ from the expected ones."""
+    failures = []
+    for url, expected in PARSER_CORPUS:
+        actual = parse_coordinates(url)
+        if actual != expected:
+            failures.append({"url": url, "expected": expected, "actual": actual})
+    return failures
+
+
+def measure_throughput(iterations: int) -> float:
+    """Parse the whole corpus repeatedly and return URLs parsed per second."""
+    urls = [url for url, _ in PARSER_CORPUS]
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for url in urls:
+            parse_coordinates(url)
+    elapsed = time.perf_counter() - start
+    return iterations * len(urls) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+    
+    failures = check_accuracy()
+    throughput = measure_throughput(args.iterations)
+    result = {
+        "cases": len(PARSER_CORPUS),
+        "failures": failures,
+        "accuracy": 1 - len(failures) / len(PARSER_CORPUS),
+        "urls_per_second": round(throughput),
+    }
+    
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"Accuracy: {result['accuracy']:.1%} ({len(failures)} of {len(PARSER_CORPUS)} cases failed)")
+        for failure in failures:
+            print(f"  {failure['url']}\n    expected {failure['expected']}, got {failure['actual']}")
+        print(f"Throughput: {result['urls_per_second']:,} URLs/s")
+    
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
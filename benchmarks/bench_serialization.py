@@ -0,0 +1,100 @@
+"""
+Compare the stock list serialization path (fix_id + Pydantic validation +
+jsonable_encoder + json) with the fast path (response-shaped documents
+rendered directly by orjson) on synthetic wishlist documents.
+
+Usage: python -m benchmarks.bench_serialization [--docs N] [--activities N] [--repeat N]
+"""
+import time
+import uuid
+import random
+import argparse
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from database import fix_id
+from wishlist.model import WishlistPage
+from wishlist.serialization import FastJSONResponse
+
+
+def make_documents(count: int, activities: int) -> list:
+    """Build wishlist documents as they are stored in MongoDB."""
+    start = datetime(2024, 1, 1)
+    docs = []
+    for i in range(count):
+        docs.append({
+            "_id": ObjectId(),
+            "name": f"Place {i}",
+            "description": "A place worth visiting" if i % 2 else None,
+            "status": random.choice(["Wishlist", "Planned", "Visited"]),
+            "user_id": str(ObjectId()),
+            "latitude": random.uniform(-90, 90),
+            "longitude": random.uniform(-180, 180),
+            "google_maps_url": None,
+            "source_type": "manual",
+            "geocode_status": None,
+            "activities": [
+                {"id": str(uuid.uuid4()), "name": f"Activity {j}", "cost": 10.5 * j, "is_completed": j % 2 == 0}
+                for j in range(activities)
+            ],
+            "created_at": start + timedelta(minutes=i),
+        })
+    return docs
+
+
+def response_shaped(docs: list) -> list:
+    """What RESPONSE_PROJECTION makes MongoDB return for the same documents."""
+    shaped = []
+    for doc in docs:
+        doc = dict(doc)
+        doc["id"] = str(doc.pop("_id"))
+        shaped.append(doc)
+    return shaped
+
+
+def stock_path(docs: list) -> bytes:
+    items = [fix_id(doc) for doc in docs]
+    page = WishlistPage(items=items, next_cursor=None)
+    return JSONResponse(jsonable_encoder(page)).body
+
+
+def fast_path(docs: list) -> bytes:
+    return FastJSONResponse({"items": docs, "next_cursor": None}).body
+
+
+def best_of(repeat: int, func, make_input) -> float:
+    """Best wall time of func over repeat runs, each on a fresh input."""
+    timings = []
+    for _ in range(repeat):
+        data = make_input()
+        start = time.perf_counter()
+        func(data)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--docs", type=int, default=10000)
+    parser.add_argument("--activities", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    
+    docs = make_documents(args.docs, args.activities)
+    shaped = response_shaped(docs)
+    
+    # fix_id mutates its input, so the stock path gets fresh copies each run
+    stock = best_of(args.repeat, stock_path, lambda: [dict(doc) for doc in docs])
+    fast = best_of(args.repeat, fast_path, lambda: shaped)
+    
+    print(f"{args.docs} documents, {args.activities} activities each, best of {args.repeat}")
+    print(f"  stock (fix_id + Pydantic + json): {stock * 1000:8.1f} ms")
+    print(f"  fast  (projection + orjson):      {fast * 1000:8.1f} ms")
+    print(f"  speedup: {stock / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
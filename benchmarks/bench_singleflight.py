@@ -0,0 +1,129 @@
+"""
+Checks that single-flight coalescing turns N concurrent identical calls
+into one backend call, and measures how long the callers wait.
+
+Usage: python -m benchmarks.bench_singleflight [--callers N] [--latency SECONDS] [--json]
+"""
+import sys
+import json
+import time
+import asyncio
+import argparse
+
+from singleflight import SingleFlight
+
+
+class Backend:
+    """Slow stand-in for Mongo or the short-link resolver that counts its calls."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    async def fetch(self, key: str) -> dict:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return {"id": key, "activities": [{"name": "Visit"}]}
+
+    async def fail(self, key: str) -> dict:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        raise ConnectionError(f"backend down for {key}")
+
+
+async def check_coalescing(callers: int, latency: float) -> dict:
+    """N concurrent callers for one key share a single backend call."""
+    backend = Backend(latency)
+    flight = SingleFlight()
+    start = time.perf_counter()
+    results = await asyncio.gather(*(flight.do("place", backend.fetch, "place") for _ in range(callers)))
+    elapsed = time.perf_counter() - start
+    return {
+        "check": "coalescing",
+        "passed": backend.calls == 1 and all(result == results[0] for result in results),
+        "backend_calls": backend.calls,
+        "callers": callers,
+        "seconds": round(elapsed, 4),
+    }
+
+
+async def check_copies(callers: int, latency: float) -> dict:
+    """Each caller gets its own copy, so mutations do not leak between them."""
+    backend = Backend(latency)
+    flight = SingleFlight()
+    results = await asyncio.gather(*(flight.do("place", backend.fetch, "place") for _ in range(callers)))
+    results[0]["activities"].append({"name": "Mutated"})
+    return {
+        "check": "copies",
+        "passed": all(len(result["activities"]) == 1 for result in results[1:]),
+    }
+
+
+async def check_distinct_keys(callers: int, latency: float) -> dict:
+    """Different keys are not coalesced."""
+    backend = Backend(latency)
+    flight = SingleFlight()
+    await asyncio.gather(*(flight.do(key, backend.fetch, key) for key in map(str, range(callers))))
+    return {"check": "distinct_keys", "passed": backend.calls == callers, "backend_calls": backend.calls}
+
+
+async def check_errors(callers: int, latency: float) -> dict:
+    """A failure reaches every waiting caller, and the next call starts afresh."""
+    backend = Backend(latency)
+    flight = SingleFlight()
+    results = await asyncio.gather(
+        *(flight.do("place", backend.fail, "place") for _ in range(callers)),
+        return_exceptions=True
+    )
+    all_failed = all(isinstance(result, ConnectionError) for result in results)
+    await flight.do("place", backend.fetch, "place")
+    return {
+        "check": "errors",
+        "passed": all_failed and backend.calls == 2 and len(flight) == 0,
+        "backend_calls": backend.calls,
+    }
+
+
+async def check_cancellation(callers: int, latency: float) -> dict:
+    """A caller that gives up does not cancel the call for the others."""
+    backend = Backend(latency)
+    flight = SingleFlight()
+    tasks = [asyncio.ensure_future(flight.do("place", backend.fetch, "place")) for _ in range(callers)]
+    await asyncio.sleep(latency / 2)
+    tasks[0].cancel()
+    results = await asyncio.gather(*tasks[1:])
+    return {
+        "check": "cancellation",
+        "passed": backend.calls == 1 and all(result["id"] == "place" for result in results),
+    }
+
+
+async def run(callers: int, latency: float) -> list:
+    return [
+        await check(callers, latency)
+        for check in (check_coalescing, check_copies, check_distinct_keys, check_errors, check_cancellation)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--callers", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated backend latency in seconds")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.callers, args.latency))
+    failed = [result for result in results if not result["passed"]]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for result in results:
+            details = ", ".join(f"{k}={v}" for k, v in result.items() if k not in ("check", "passed"))
+            print(f"{'ok  ' if result['passed'] else 'FAIL'} {result['check']} {details}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Count the MongoDB round trips each API route makes and fail if any route
+exceeds its budget, so extra round trips are caught as regressions.
+Commands sent concurrently (asyncio.gather) share one round trip.
+
+Runs the real FastAPI app in-process against MONGO_URL, using the scratch
+database travel_app_commands, which is dropped afterwards. MONGO_DB_NAME
+is ignored so a real database can never be dropped.
+
+Usage: python -m benchmarks.count_commands
+"""
+import os
+import sys
+import uuid
+import asyncio
+
+SCRATCH_DB_NAME = "travel_app_commands"
+os.environ["MONGO_DB_NAME"] = SCRATCH_DB_NAME
+os.environ["COMMAND_COUNTING_ENABLED"] = "true"
+os.environ.setdefault("MAX_USERS", "1000000")
+
+import httpx
+
+from database import client, db, command_counter
+from indexes import ensure_indexes
+from auth.controller import ensure_user_counter
+from main import app
+
+# Maximum round trips per route once the caller's user record is cached.
+# Wishlist mutations make one write, then bump the collection version and
+# $inc the owner's user_stats summary together.
+BUDGETS = {
+    "POST /auth/register": 2,
+    "POST /auth/token": 1,
+    "GET /auth/me": 0,
+    "POST /wishlist/": 2,
+    "GET /wishlist/{id}": 1,
+    "PUT /wishlist/{id}": 2,
+    "POST /wishlist/{id}/activities": 2,
+    "PUT /wishlist/{id}/activities/{activity_id}": 2,
+    "PATCH /wishlist/{id}/activities": 2,
+    "DELETE /wishlist/{id}/activities/{activity_id}": 2,
+    "DELETE /wishlist/{id}": 2,
+}
+
+
+async def run() -> dict:
+    counts = {}
+    
+    async def call(http, label, method, url, **kwargs):
+        command_counter.reset()
+        response = await http.request(method, url, **kwargs)
+        response.raise_for_status()
+        counts[label] = (command_counter.round_trips, dict(command_counter.counts))
+        return response
+    
+    await ensure_indexes()
+    await ensure_user_counter()
+    
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+        email = f"bench-{uuid.uuid4().hex[:8]}@example.com"
+        password = "bench-password"
+        await call(http, "POST /auth/register", "POST", "/auth/register",
+                   json={"full_name": "Bench User", "email": email, "password": password})
+        token = (await call(http, "POST /auth/token", "POST", "/auth/token",
+                            data={"username": email, "password": password})).json()["access_token"]
+        http.headers["Authorization"] = f"Bearer {token}"
+        
+        # Warm the user cache so routes are measured without the auth lookup
+        await http.get("/auth/me")
+        await call(http, "GET /auth/me", "GET", "/auth/me")
+        
+        wishlist = (await call(http, "POST /wishlist/", "POST", "/wishlist/",
+                               json={"name": "Bench Place", "latitude": 3.1, "longitude": 101.6})).json()
+        wishlist_id = wishlist["id"]
+        await call(http, "GET /wishlist/{id}", "GET", f"/wishlist/{wishlist_id}")
+        await call(http, "PUT /wishlist/{id}", "PUT", f"/wishlist/{wishlist_id}",
+                   json={"status": "Planned"})
+        
+        activities = (await call(http, "POST /wishlist/{id}/activities", "POST",
+                                 f"/wishlist/{wishlist_id}/activities",
+                                 json={"name": "Lunch", "cost": 12.5})).json()["activities"]
+        activity_id = activities[0]["id"]
+        await call(http, "PUT /wishlist/{id}/activities/{activity_id}", "PUT",
+                   f"/wishlist/{wishlist_id}/activities/{activity_id}", json={"is_completed": True})
+        await call(http, "PATCH /wishlist/{id}/activities", "PATCH", f"/wishlist/{wishlist_id}/activities",
+                   json={"operations": [
+                       {"op": "add", "activity": {"name": "Dinner", "cost": 30}},
+                       {"op": "update", "id": activity_id, "changes": {"cost": 15}},
+                   ]})
+        await call(http, "DELETE /wishlist/{id}/activities/{activity_id}", "DELETE",
+                   f"/wishlist/{wishlist_id}/activities/{activity_id}")
+        await call(http, "DELETE /wishlist/{id}", "DELETE", f"/wishlist/{wishlist_id}")
+    
+    return counts
+
+
+async def main() -> int:
+    if db.name != SCRATCH_DB_NAME:
+        print(f"❌ Refusing to run against {db.name}; it would be dropped afterwards")
+        return 2
+    try:
+        counts = await run()
+    finally:
+        await client.drop_database(db.name)
+    
+    over_budget = 0
+    for label, budget in BUDGETS.items():
+        total, commands = counts.get(label, (0, {}))
+        marker = "OK " if total <= budget else "OVER"
+        over_budget += total > budget
+        detail = ", ".join(f"{name}={n}" for name, n in sorted(commands.items())) or "-"
+        print(f"{marker} {label:<50} {total}/{budget}  {detail}")
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
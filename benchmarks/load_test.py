@@ -0,0 +1,275 @@
+"""
+Load test: seeds a dataset, then drives the real FastAPI app in-process with
+concurrent async workers and reports p50/p95/p99 latency and throughput per
+route.
+
+Runs against MONGO_URL using the scratch database travel_app_loadtest,
+whatever MONGO_DB_NAME says, and drops it afterwards unless --keep is
+given. It refuses to run against a database not named *_loadtest.
+Set MONGO_URL=mongomock:// to use the in-memory stand-in instead; routes
+that need server-only features then show up as errors.
+
+Usage: python -m benchmarks.load_test [--users N] [--wishlists N] [--activities N]
+                                      [--requests N] [--concurrency N]
+                                      [--routes register,token,...] [--json] [--output FILE]
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import asyncio
+import argparse
+import platform
+from datetime import datetime, timedelta
+
+# Never the configured database: this one is seeded and then dropped
+SCRATCH_DB_SUFFIX = "_loadtest"
+os.environ["MONGO_DB_NAME"] = "travel_app" + SCRATCH_DB_SUFFIX
+os.environ.setdefault("MAX_USERS", "1000000")
+
+import httpx
+
+from database import client, db
+from indexes import ensure_indexes
+from auth.controller import ensure_user_counter, get_password_hash, create_access_token
+from wishlist.controller import import_wishlists, add_activity
+from main import app
+
+SEED_PASSWORD = "load-test-password"
+ROUTES = ("register", "token", "list", "get", "create", "activity")
+
+
+def at_least(minimum: int):
+    """argparse type for an integer no smaller than minimum."""
+    def parse(value: str) -> int:
+        number = int(value)
+        if number < minimum:
+            raise argparse.ArgumentTypeError(f"must be at least {minimum}")
+        return number
+    return parse
+
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+async def seed(users: int, wishlists_per_user: int, activities_per_wishlist: int) -> dict:
+    """Create users, wishlists and activities directly, bypassing the API."""
+    hashed_password = get_password_hash(SEED_PASSWORD)
+    run_id = uuid.uuid4().hex[:8]
+    emails = [f"load-{run_id}-{i}@example.com" for i in range(users)]
+    # Seeded users skip registration, so they are added to the registered-users
+    # counter by hand; otherwise it undercounts and MAX_USERS lets extra
+    # registrations through. The counter must exist first, or creating it
+    # later from a count would include these users twice.
+    await ensure_user_counter()
+    result = await db.users.insert_many([
+        {
+            "full_name": f"Load User {i}",
+            "email": email,
+            "role": "user",
+            "hashed_password": hashed_password,
+            "created_at": datetime.utcnow(),
+        }
+        for i, email in enumerate(emails)
+    ])
+    await db.counters.update_one({"_id": "users"}, {"$inc": {"count": users}}, upsert=True)
+
+    seeded = {"users": [], "wishlist_ids": []}
+    for email, user_id in zip(emails, map(str, result.inserted_ids)):
+        items = [
+            {
+                "name": f"Place {i} of {email}",
+                "description": "Seeded by the load test",
+                "latitude": random.uniform(-60, 60),
+                "longitude": random.uniform(-180, 180),
+            }
+            for i in range(wishlists_per_user)
+        ]
+        ids = [row["id"] for row in await import_wishlists(items, user_id) if row["id"]]
+        for wishlist_id in ids:
+            for i in range(activities_per_wishlist):
+                activity = {"name": f"Activity {i}", "cost": 10.0 * i, "is_completed": i % 2 == 0}
+                if await add_activity(wishlist_id, user_id, activity) is None:
+                    raise RuntimeError(f"Could not seed activities of wishlist {wishlist_id}")
+        token = create_access_token({"sub": email}, expires_delta=timedelta(hours=1))
+        seeded["users"].append({"email": email, "id": user_id, "token": token, "wishlist_ids": ids})
+        seeded["wishlist_ids"].extend(ids)
+    return seeded
+
+
+def scenarios(seeded: dict) -> dict:
+    """One request factory per route; each call returns (method, url, kwargs)."""
+    def user():
+        return random.choice(seeded["users"])
+
+    def auth(chosen):
+        return {"Authorization": f"Bearer {chosen['token']}"}
+
+    def register():
+        email = f"load-register-{uuid.uuid4().hex}@example.com"
+        return "POST", "/auth/register", {"json": {"full_name": "Load Register", "email": email, "password": SEED_PASSWORD}}
+
+    def token():
+        return "POST", "/auth/token", {"data": {"username": user()["email"], "password": SEED_PASSWORD}}
+
+    def list_page():
+        return "GET", "/wishlist/?limit=50", {"headers": auth(user())}
+
+    def get():
+        return "GET", f"/wishlist/{random.choice(seeded['wishlist_ids'])}", {"headers": auth(user())}
+
+    def create():
+        return "POST", "/wishlist/", {
+            "headers": auth(user()),
+            "json": {"name": "Load Place", "latitude": 3.1, "longitude": 101.6},
+        }
+
+    def activity():
+        chosen = user()
+        return "POST", f"/wishlist/{random.choice(chosen['wishlist_ids'])}/activities", {
+            "headers": auth(chosen),
+            "json": {"name": "Load Activity", "cost": 5},
+        }
+
+    return {
+        "register": register,
+        "token": token,
+        "list": list_page,
+        "get": get,
+        "create": create,
+        "activity": activity,
+    }
+
+
+async def drive(http: httpx.AsyncClient, make_request, requests: int, concurrency: int) -> dict:
+    """Send requests from concurrent workers and summarize their latencies."""
+    latencies = []
+    errors = {}
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            method, url, kwargs = make_request()
+            started = time.perf_counter()
+            try:
+                response = await http.request(method, url, **kwargs)
+                outcome = None if response.status_code < 400 else str(response.status_code)
+            except Exception as e:
+                outcome = type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            if outcome:
+                errors[outcome] = errors.get(outcome, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(1000 * sum(latencies) / len(latencies), 2) if latencies else 0.0,
+        "p50_ms": round(1000 * percentile(latencies, 0.50), 2),
+        "p95_ms": round(1000 * percentile(latencies, 0.95), 2),
+        "p99_ms": round(1000 * percentile(latencies, 0.99), 2),
+    }
+
+
+async def run(args) -> dict:
+    # Startup hooks are not run by the ASGI transport, so do what the routes need
+    await ensure_indexes()
+    await ensure_user_counter()
+    seed_started = time.perf_counter()
+    seeded = await seed(args.users, args.wishlists, args.activities)
+    seed_seconds = time.perf_counter() - seed_started
+
+    factories = scenarios(seeded)
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=60) as http:
+        for route in args.routes:
+            # Warm caches and lazily created clients outside the measurement
+            method, url, kwargs = factories[route]()
+            await http.request(method, url, **kwargs)
+            results[route] = await drive(http, factories[route], args.requests, args.concurrency)
+
+    return {
+        "config": {
+            "users": args.users,
+            "wishlists_per_user": args.wishlists,
+            "activities_per_wishlist": args.activities,
+            "requests_per_route": args.requests,
+            "concurrency": args.concurrency,
+            "mongo": "mongomock" if os.getenv("MONGO_URL", "").startswith("mongomock://") else "mongodb",
+            "activity_storage": os.getenv("ACTIVITY_STORAGE", "embedded"),
+            "python": platform.python_version(),
+            "started_at": datetime.utcnow().isoformat(),
+        },
+        "seed_seconds": round(seed_seconds, 3),
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=at_least(1), default=20)
+    parser.add_argument("--wishlists", type=at_least(1), default=25, help="wishlists per user")
+    parser.add_argument("--activities", type=at_least(0), default=5, help="activities per wishlist")
+    parser.add_argument("--requests", type=at_least(1), default=500, help="requests per route")
+    parser.add_argument("--concurrency", type=at_least(1), default=16)
+    parser.add_argument("--routes", default=",".join(ROUTES), help=f"comma-separated subset of {', '.join(ROUTES)}")
+    parser.add_argument("--seed", type=int, default=0, help="random seed, for repeatable datasets")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch database")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--output", help="also write the JSON results to this file")
+    args = parser.parse_args()
+
+    args.routes = [route.strip() for route in args.routes.split(",") if route.strip()]
+    unknown = [route for route in args.routes if route not in ROUTES]
+    if unknown:
+        parser.error(f"unknown routes: {', '.join(unknown)}")
+    if not db.name.endswith(SCRATCH_DB_SUFFIX):
+        parser.error(f"refusing to seed and drop {db.name}; the database name must end in {SCRATCH_DB_SUFFIX}")
+    random.seed(args.seed)
+
+    async def run_and_clean():
+        try:
+            return await run(args)
+        finally:
+            if not args.keep:
+                await client.drop_database(db.name)
+
+    report = asyncio.run(run_and_clean())
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"Seeded in {report['seed_seconds']}s; {args.requests} requests per route at concurrency {args.concurrency}")
+        print(f"{'route':<10} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}  errors")
+        for route, result in report["results"].items():
+            errors = ", ".join(f"{code}x{n}" for code, n in result["errors"].items()) or "-"
+            print(
+                f"{route:<10} {result['throughput_rps']:>9} {result['p50_ms']:>9} "
+                f"{result['p95_ms']:>9} {result['p99_ms']:>9}  {errors}"
+            )
+
+    failed = any(result["errors"] for result in report["results"].values())
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Real-world Google Maps URL shapes with the coordinates parse_coordinates
+should extract from them. Add a case whenever a new URL form shows up.
+"""
+
+# (url, expected (latitude, longitude))
+PARSER_CORPUS = [
+    # Place page: viewport centre wins over the pin in the data= blob
+    (
+        "https://www.google.com/maps/place/Petronas+Twin+Towers/@3.1578556,101.7097306,17z/"
+        "data=!3m1!4b1!4m6!3m5!1s0x31cc37d12d669c1f:0x9e3afdd17c8a9056!8m2!3d3.1578556!4d101.7119193",
+        (3.1578556, 101.7097306),
+    ),
+    (
+        "https://www.google.com/maps/@-33.8567844,151.213108,15z",
+        (-33.8567844, 151.213108),
+    ),
+    (
+        "https://www.google.com/maps/@48.8583701,2.2944813,3a,75y,90t/data=!3m6!1e1",
+        (48.8583701, 2.2944813),
+    ),
+    # Pin only in the data= blob
+    (
+        "https://www.google.com/maps/place/Eiffel+Tower/data=!4m6!3m5!1s0x47e66e2964e34e2d:0x8ddca9ee380ef7e0"
+        "!8m2!3d48.8583701!4d2.2944813!16zL20vMDJqODE",
+        (48.8583701, 2.2944813),
+    ),
+    # URL-encoded data= blob
+    (
+        "https://www.google.com/maps/place/Eiffel+Tower/data=%214m6%213m5%218m2%213d48.8583701%214d2.2944813",
+        (48.8583701, 2.2944813),
+    ),
+    # Legacy ll= / sll= / center= parameters
+    ("https://maps.google.com/?ll=40.748817,-73.985428&z=16", (40.748817, -73.985428)),
+    ("https://maps.google.com/maps?sll=51.5007292,-0.1246254&sspn=0.1,0.1", (51.5007292, -0.1246254)),
+    ("https://www.google.com/maps/@?api=1&map_action=map&center=-22.9519,-43.2105&zoom=12", (-22.9519, -43.2105)),
+    # /place/lat,lng
+    ("https://www.google.com/maps/place/35.6585805,139.7454329", (35.6585805, 139.7454329)),
+    ("https://www.google.com/maps/place/35.6585805,+139.7454329/", (35.6585805, 139.7454329)),
+    # q= / query= / destination= / daddr= with raw coordinates
+    ("https://maps.google.com/?q=27.1751448,78.0421422", (27.1751448, 78.0421422)),
+    ("https://maps.google.com/maps?q=loc:27.1751448,+78.0421422", (27.1751448, 78.0421422)),
+    (
+        "https://www.google.com/maps/search/?api=1&query=47.5951518%2C-122.3316393",
+        (47.5951518, -122.3316393),
+    ),
+    (
+        "https://www.google.com/maps/dir/?api=1&origin=Home&destination=40.6892494%2C-74.0445004",
+        (40.6892494, -74.0445004),
+    ),
+    ("https://maps.google.com/maps?saddr=Home&daddr=41.8902102,12.4922309", (41.8902102, 12.4922309)),
+    # Embed pb= blob stores longitude first
+    (
+        "https://www.google.com/maps/embed?pb=!1m18!1m12!1m3!1d3153.0!2d-122.4194155!3d37.7749295"
+        "!2m3!1f0!2f0!3f0!3m2!1i1024!2i768!4f13.1",
+        (37.7749295, -122.4194155),
+    ),
+    # No coordinates
+    ("https://www.google.com/maps/place/Some+Cafe/", (None, None)),
+    ("https://www.google.com/maps/search/?api=1&query=pizza+near+me", (None, None)),
+    ("https://maps.google.com/?q=Kuala+Lumpur", (None, None)),
+    # Out-of-range numbers are not coordinates
+    ("https://www.google.com/maps/place/123,456", (None, None)),
+]
@@ -1,14 +1,95 @@
 import os
+import threading
+from collections import Counter
 import motor.motor_asyncio
+from pymongo import monitoring
 from dotenv import load_dotenv
 
+from metrics import Histogram
+
 load_dotenv()
 
 # Get DB URL from .env file
 MONGO_URL = os.getenv("MONGO_URL", "localhost") 
+MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "travel_app")
+# Attach command_counter to the client; only benchmarks/count_commands.py needs it
+COMMAND_COUNTING_ENABLED = os.getenv("COMMAND_COUNTING_ENABLED", "false").lower() == "true"
+
+
+class CommandCounter(monitoring.CommandListener):
+    """
+    Counts database commands by name, and the round trips they took: commands
+    sent while another is still waiting for its reply (e.g. under
+    asyncio.gather) share a round trip. Only attached when
+    COMMAND_COUNTING_ENABLED is set.
+    """
+    
+    def __init__(self):
+        self.counts = Counter()
+        self.round_trips = 0
+        self._in_flight = 0
+        # Listeners are called from the driver's worker threads
+        self._lock = threading.Lock()
+    
+    def started(self, event):
+        with self._lock:
+            self.counts[event.command_name] += 1
+            if self._in_flight == 0:
+                self.round_trips += 1
+            self._in_flight += 1
+    
+    def succeeded(self, event):
+        with self._lock:
+            self._in_flight -= 1
+    
+    def failed(self, event):
+        with self._lock:
+            self._in_flight -= 1
+    
+    def reset(self):
+        with self._lock:
+            self.counts.clear()
+            self.round_trips = 0
+    
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+
+class CommandTimer(monitoring.CommandListener):
+    """Records how long each database command takes, by command name and outcome."""
+    
+    def __init__(self):
+        self.seconds = Histogram(
+            "mongodb_command_duration_seconds",
+            "MongoDB command round-trip time as reported by the driver",
+            labelnames=["command", "outcome"]
+        )
+    
+    def started(self, event):
+        pass
+    
+    def succeeded(self, event):
+        self.seconds.labels(event.command_name, "success").observe(event.duration_micros / 1e6)
+    
+    def failed(self, event):
+        self.seconds.labels(event.command_name, "failure").observe(event.duration_micros / 1e6)
+
+
+command_counter = CommandCounter()
+command_timer = CommandTimer()
 
-client = motor.motor_asyncio.AsyncIOMotorClient(MONGO_URL)
-db = client.travel_app  # The DB name is 'travel_app'
+if MONGO_URL.startswith("mongomock://"):
+    # In-memory stand-in for benchmarks (pip install mongomock-motor). It lacks
+    # server features such as $text, geo queries and $merge, and runs no listeners.
+    from mongomock_motor import AsyncMongoMockClient
+    client = AsyncMongoMockClient()
+else:
+    client = motor.motor_asyncio.AsyncIOMotorClient(
+        MONGO_URL,
+        event_listeners=[command_counter, command_timer] if COMMAND_COUNTING_ENABLED else [command_timer]
+    )
+db = client[MONGO_DB_NAME]  # The DB name defaults to 'travel_app'
 
 # Helper to fix MongoDB _id to string for Pydantic
 # Because MongoDB uses ObjectId(), but JSON needs Strings
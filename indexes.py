@@ -0,0 +1,66 @@
+from pymongo import ASCENDING, GEOSPHERE, TEXT, IndexModel
+
+from database import db
+from wishlist.resolver import URL_CACHE_TTL_SECONDS
+
+# Every index the app relies on, per collection. ensure_indexes() creates
+# missing ones at startup; existing identical indexes are left untouched.
+INDEXES = {
+    "users": [
+        # Login, auth lookups and duplicate detection on registration
+        IndexModel([("email", ASCENDING)], unique=True),
+    ],
+    "wishlists": [
+        # Per-user listings, newest last
+        IndexModel([("user_id", ASCENDING), ("created_at", ASCENDING)]),
+        # Keyset pagination of GET /wishlist/
+        IndexModel([("created_at", ASCENDING), ("_id", ASCENDING)]),
+        # Activity updates and deletes match on the embedded id
+        IndexModel([("activities.id", ASCENDING)]),
+        # Near-me, bounding-box and cluster queries
+        IndexModel([("location", GEOSPHERE)]),
+        # Lets the geocode sweep find unresolved places without a scan
+        IndexModel([("geocode_status", ASCENDING)], sparse=True),
+        # GET /wishlist/search, place names weighing most
+        IndexModel(
+            [("name", TEXT), ("description", TEXT), ("activities.name", TEXT)],
+            weights={"name": 10, "activities.name": 3, "description": 2}
+        ),
+    ],
+    "activities": [
+        # Listing a wishlist's activities in order (ACTIVITY_STORAGE=collection)
+        IndexModel([("wishlist_id", ASCENDING), ("position", ASCENDING), ("id", ASCENDING)]),
+        # Activity updates and deletes match on the activity id
+        IndexModel([("id", ASCENDING)], unique=True),
+        # Search over activity names when they are not embedded
+        IndexModel([("name", TEXT)]),
+    ],
+    "url_resolutions": [
+        # Short URL resolutions expire from the shared cache on their own
+        IndexModel(
+            [("resolved_at", ASCENDING)],
+            expireAfterSeconds=URL_CACHE_TTL_SECONDS
+        ),
+    ],
+}
+
+
+class IndexCreationError(RuntimeError):
+    """A unique index could not be built, so writes relying on it are unsafe."""
+
+
+async def ensure_indexes() -> None:
+    """
+    Create any missing indexes declared in INDEXES. Raises IndexCreationError
+    when a collection with a unique index fails, since registration and
+    activity writes rely on those to reject duplicates; other failures only
+    cost query speed and are reported.
+    """
+    for collection, indexes in INDEXES.items():
+        try:
+            await db[collection].create_indexes(indexes)
+        except Exception as e:
+            # e.g. duplicate emails already stored block the unique index
+            print(f"❌ Failed to create indexes on {collection}: {e}")
+            if any(index.document.get("unique") for index in indexes):
+                raise IndexCreationError(f"Unique index on {collection} is missing: {e}") from e
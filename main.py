@@ -1,7 +1,9 @@
 from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from datetime import datetime
 import os
+from pymongo.errors import DuplicateKeyError
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -9,8 +11,17 @@ load_dotenv()
 # Import our modules
 from database import db, fix_id, client
 from models import PlaceCreate
-from auth import auth_router, get_password_hash, get_current_user
+from auth import auth_router, hash_password_async, get_current_user
+from auth.controller import ensure_user_counter
+from indexes import ensure_indexes, IndexCreationError
 from wishlist import wishlist_router
+from wishlist.resolver import close_http_client
+from wishlist.geocoder import start_geocoder, stop_geocoder
+from wishlist.suggest import start_suggest_index, stop_suggest_index
+from wishlist.events import start_event_feed, stop_event_feed
+from response_cache import response_cache
+from metrics import REGISTRY, MetricsMiddleware
+from profiling import PROFILING_ENABLED, ProfilingMiddleware
 
 app = FastAPI()
 
@@ -26,33 +37,59 @@ async def startup_db_client():
         print("\n✅ Successfully connected to MongoDB!")
         print(f"📦 Database: {db.name}")
         
+        # Create any missing indexes before the collections are used. Without
+        # the unique ones duplicates would be accepted, so refuse to start.
+        await ensure_indexes()
+        
         # Check and initialize users collection
-        user_count = await db.users.count_documents({})
-        if user_count == 0:
+        if await db.users.find_one({}, {"_id": 1}) is None:
             print("📋 No users found. Creating default admin user...")
             default_user = {
                 "full_name": os.getenv("DEFAULT_USER_NAME"),
                 "email": os.getenv("DEFAULT_USER_EMAIL"),
                 "role": os.getenv("DEFAULT_USER_ROLE", "admin"),
-                "hashed_password": get_password_hash(os.getenv("DEFAULT_USER_PASSWORD")),
+                "hashed_password": await hash_password_async(os.getenv("DEFAULT_USER_PASSWORD")),
                 "created_at": datetime.utcnow()
             }
-            await db.users.insert_one(default_user)
-            print("👤 Default admin user created successfully!")
+            try:
+                await db.users.insert_one(default_user)
+                await db.counters.update_one({"_id": "users"}, {"$set": {"count": 1}}, upsert=True)
+                print("👤 Default admin user created successfully!")
+            except DuplicateKeyError:
+                # Another worker created it first
+                pass
         else:
-            print(f"👥 Users collection exists with {user_count} user(s)")
+            await ensure_user_counter()
+            user_count = await db.users.estimated_document_count()
+            print(f"👥 Users collection exists with ~{user_count} user(s)")
         
         # Check and initialize wishlists collection
-        collections = await db.list_collection_names()
-        if "wishlists" not in collections:
-            await db.create_collection("wishlists")
-            print("📍 Wishlists collection created!")
-        else:
-            wishlist_count = await db.wishlists.count_documents({})
-            print(f"📍 Wishlists collection exists with {wishlist_count} item(s)")
+        wishlist_count = await db.wishlists.estimated_document_count()
+        print(f"📍 Wishlists collection has ~{wishlist_count} item(s)")
+        
+        # Load place names into the in-memory type-ahead index
+        await start_suggest_index()
+        
+        # Relay wishlist changes to /wishlist/events clients
+        start_event_feed()
             
+    except IndexCreationError:
+        raise
     except Exception as e:
         print(f"\n❌ Failed to connect to MongoDB: {e}")
+    
+    # Resolve short Google Maps links in the background. Started regardless of
+    # the checks above; the workers and sweep retry until MongoDB is reachable.
+    start_geocoder()
+
+# --- SHUTDOWN EVENT ---
+@app.on_event("shutdown")
+async def shutdown_clients():
+    await stop_geocoder()
+    await stop_suggest_index()
+    await stop_event_feed()
+    await response_cache.close()
+    await close_http_client()
 
 # --- CORS SETUP ---
 # This allows your Nuxt frontend to talk to this backend
@@ -66,6 +103,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# --- METRICS ---
+# Per-route latency and in-flight requests, scraped from /metrics
+app.add_middleware(MetricsMiddleware)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics in the text exposition format."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+# --- PROFILING ---
+# Opt-in per-request profiles for admins; not installed at all unless enabled
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
 # --- ROUTES ---
 
 @app.post("/places/")
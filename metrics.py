@@ -0,0 +1,255 @@
+import time
+import bisect
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Default latency buckets in seconds
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Registry:
+    """Collection of metrics rendered together in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, "_Metric"] = {}
+
+    def register(self, metric: "_Metric") -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Metrics register here unless given another registry (or None)
+REGISTRY = Registry()
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+class _Metric(ABC):
+    kind = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labelnames: Sequence[str] = (),
+        registry: Optional[Registry] = REGISTRY
+    ):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: Dict[Tuple[str, ...], "_Metric"] = {}
+        if registry is not None:
+            registry.register(self)
+
+    @abstractmethod
+    def _child(self) -> "_Metric":
+        """A new unregistered series of the same kind, for one label combination."""
+
+    def labels(self, *values) -> "_Metric":
+        """The series for one combination of label values, created on first use."""
+        key = tuple(str(value) for value in values)
+        if len(key) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._child())
+        return child
+
+    @abstractmethod
+    def _samples(self, labels: Dict[str, str]) -> List[str]:
+        """Exposition lines for this series with the given labels."""
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+        if self.labelnames:
+            for key, child in list(self._children.items()):
+                lines.extend(child._samples(dict(zip(self.labelnames, key))))
+        else:
+            lines.extend(self._samples({}))
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing count. A function can supply the value instead of inc()."""
+
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._value = 0.0
+        self._function: Optional[Callable[[], float]] = None
+
+    def _child(self) -> "Counter":
+        return Counter(self.name, self.description, registry=None)
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Read the value from function at render time, e.g. a cache's hit count."""
+        self._function = function
+
+    @property
+    def value(self) -> float:
+        return self._function() if self._function else self._value
+
+    def _samples(self, labels: Dict[str, str]) -> List[str]:
+        return [f"{self.name}{_format_labels(labels)} {_format_value(self.value)}"]
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def _child(self) -> "Gauge":
+        return Gauge(self.name, self.description, registry=None)
+
+    def dec(self, amount: float = 1) -> None:
+        self.inc(-amount)
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self._value = value
+
+
+class Histogram(_Metric):
+    """Latency histogram with fixed upper bounds, in seconds."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        labelnames: Sequence[str] = (),
+        registry: Optional[Registry] = REGISTRY
+    ):
+        super().__init__(name, description, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # Per bucket; last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def _child(self) -> "Histogram":
+        return Histogram(self.name, self.description, self.buckets, registry=None)
+
+    def observe(self, value: float) -> None:
+        """Record one observation."""
+        index = bisect.bisect_left(self.buckets, value)
+        # Observed from worker threads too (bcrypt pool, PyMongo listeners)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def time(self) -> "_Timer":
+        """Context manager observing the duration of its block."""
+        return _Timer(self)
+
+    def _samples(self, labels: Dict[str, str]) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += count
+            bucket_labels = _format_labels({**labels, "le": _format_value(float(bound))})
+            lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+        lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(self.sum)}")
+        lines.append(f"{self.name}_count{_format_labels(labels)} {self.count}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram):
+        self._histogram = histogram
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._histogram.observe(time.perf_counter() - self._start)
+
+
+def cache_metrics(cache_name: str, cache) -> None:
+    """Expose a cache's hits and misses counters under the given cache label."""
+    cache_hits_total.labels(cache_name).set_function(lambda: cache.hits)
+    cache_misses_total.labels(cache_name).set_function(lambda: cache.misses)
+
+
+cache_hits_total = Counter("cache_hits_total", "Cache lookups served from the cache", ["cache"])
+cache_misses_total = Counter("cache_misses_total", "Cache lookups that missed", ["cache"])
+
+http_requests_in_flight = Gauge("http_requests_in_flight", "HTTP requests currently being handled")
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    labelnames=["method", "route", "status"]
+)
+
+
+def _route_template(scope) -> str:
+    """The matched route's path template, so IDs do not explode the label set."""
+    # The router records the route it dispatched to in the shared scope
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route latency and the number of requests in flight."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            http_requests_in_flight.dec()
+            http_request_duration_seconds.labels(
+                scope["method"], _route_template(scope), status_code
+            ).observe(elapsed)
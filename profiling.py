@@ -0,0 +1,187 @@
+import os
+import re
+import sys
+import time
+import asyncio
+import cProfile
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+from urllib.parse import parse_qs
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# The middleware is only installed when enabled, so it costs nothing otherwise
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+# "sample" writes collapsed stacks for flamegraph.pl / speedscope;
+# "cprofile" writes pstats files for snakeviz / flameprof. cProfile traces
+# everything the event loop runs while enabled, so it is for debugging one
+# request on an otherwise idle server and only starts when no other request
+# is in flight.
+PROFILE_MODE = os.getenv("PROFILE_MODE", "sample").lower()
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+# CPU-bound threads only yield the GIL every 5 ms, so finer sampling gains little
+PROFILE_SAMPLE_INTERVAL_SECONDS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_SECONDS", 0.005))
+
+# Send this header, or the query flag ?profile=1, as an admin to profile a request
+PROFILE_HEADER = b"x-profile"
+PROFILE_QUERY_FLAG = "profile"
+
+# Innermost frames of threads that are just waiting for work
+_IDLE_FRAMES = {("threading.py", "wait"), ("queue.py", "get"), ("thread.py", "_worker")}
+
+
+class StackSampler:
+    """
+    Samples the stacks of every thread (the event loop, the bcrypt pool and
+    the driver's threads) at a fixed interval and counts identical stacks.
+    """
+
+    def __init__(self, interval: float = PROFILE_SAMPLE_INTERVAL_SECONDS):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in _IDLE_FRAMES:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(part.replace(";", ":") for part in reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        """Stacks in the collapsed format: "outer;inner count" per line."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def _requested(scope) -> bool:
+    if any(name == PROFILE_HEADER for name, _ in scope["headers"]):
+        return True
+    query = parse_qs(scope.get("query_string", b"").decode())
+    return PROFILE_QUERY_FLAG in query
+
+
+def _bearer_token(scope) -> Optional[str]:
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode().partition(" ")
+            if scheme.lower() == "bearer":
+                return token
+    return None
+
+
+# Blocking file writes, run in a worker thread with asyncio.to_thread
+def _write_stats(path: str, profiler: cProfile.Profile) -> None:
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    profiler.dump_stats(path)
+
+
+def _write_collapsed(path: str, collapsed: str) -> None:
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    with open(path, "w") as profile_file:
+        profile_file.write(collapsed)
+
+
+def _profile_path(scope, extension: str) -> str:
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_") or "root"
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+    return os.path.join(PROFILE_DIR, f"{stamp}-{scope['method']}-{slug}.{extension}")
+
+
+class ProfilingMiddleware:
+    """
+    Profiles requests flagged with an X-Profile header or ?profile=1 from an
+    admin, writing the profile to PROFILE_DIR and naming it in the
+    X-Profile-File response header. One request is profiled at a time; the
+    profile also contains whatever else the process did meanwhile, so
+    cprofile mode skips requests that arrive while others are in flight.
+    Profiles are written off the event loop.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._busy = False
+        self._in_flight = 0
+
+    async def _is_admin(self, scope) -> bool:
+        from auth.controller import get_user_from_token  # Import here to avoid circular imports
+
+        token = _bearer_token(scope)
+        if token is None:
+            return False
+        user = await get_user_from_token(token)
+        return user is not None and user.get("role") == "admin"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        self._in_flight += 1
+        try:
+            await self._handle(scope, receive, send)
+        finally:
+            self._in_flight -= 1
+
+    async def _handle(self, scope, receive, send):
+        if self._busy or not _requested(scope) or not await self._is_admin(scope):
+            await self.app(scope, receive, send)
+            return
+        if PROFILE_MODE == "cprofile" and self._in_flight > 1:
+            print(f"🔬 Not profiling {scope['method']} {scope['path']}: cProfile needs an otherwise idle server")
+            await self.app(scope, receive, send)
+            return
+
+        self._busy = True
+        extension = "prof" if PROFILE_MODE == "cprofile" else "collapsed"
+        path = _profile_path(scope, extension)
+
+        async def send_with_header(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-file", os.path.basename(path).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            if PROFILE_MODE == "cprofile":
+                profiler = cProfile.Profile()
+                profiler.enable()
+                try:
+                    await self.app(scope, receive, send_with_header)
+                finally:
+                    profiler.disable()
+                await asyncio.to_thread(_write_stats, path, profiler)
+            else:
+                sampler = StackSampler()
+                sampler.start()
+                try:
+                    await self.app(scope, receive, send_with_header)
+                finally:
+                    await asyncio.to_thread(sampler.stop)
+                await asyncio.to_thread(_write_collapsed, path, sampler.collapsed())
+            print(f"🔬 Profiled {scope['method']} {scope['path']} in {time.perf_counter() - started:.3f}s -> {path}")
+        finally:
+            self._busy = False
@@ -0,0 +1,123 @@
+import os
+from typing import Optional
+from dotenv import load_dotenv
+
+from cache import TTLCache
+from metrics import cache_metrics
+
+load_dotenv()
+
+# "memory" (per process, default), "redis" (shared) or "none"
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory").lower()
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", 300))
+RESPONSE_CACHE_MAX_SIZE = int(os.getenv("RESPONSE_CACHE_MAX_SIZE", 256))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+
+class MemoryBackend:
+    """In-process LRU of response bodies."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: bytes) -> None:
+        self._cache.set(key, value)
+
+    async def close(self) -> None:
+        self._cache.clear()
+
+
+class RedisBackend:
+    """
+    Redis-backed store shared by every app process. Any Redis-protocol server
+    works, or pass a client such as fakeredis' FakeRedis to stand in locally.
+    """
+
+    def __init__(self, ttl: float, url: str = REDIS_URL, client=None, prefix: str = "responses:"):
+        if client is None:
+            import redis.asyncio as redis
+            client = redis.from_url(url)
+        self._client = client
+        self._ttl = max(1, int(ttl))
+        self._prefix = prefix
+
+    async def get(self, key: str) -> Optional[bytes]:
+        try:
+            return await self._client.get(self._prefix + key)
+        except Exception as e:
+            # A cache outage should only cost speed
+            print(f"Error reading response cache: {e}")
+            return None
+
+    async def set(self, key: str, value: bytes) -> None:
+        try:
+            await self._client.set(self._prefix + key, value, ex=self._ttl)
+        except Exception as e:
+            print(f"Error writing response cache: {e}")
+
+    async def close(self) -> None:
+        close = getattr(self._client, "aclose", None) or self._client.close
+        await close()
+
+
+class NullBackend:
+    """Caches nothing."""
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return None
+
+    async def set(self, key: str, value: bytes) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+
+class ResponseCache:
+    """
+    Read-through cache of serialized response bodies.
+
+    Keys must include the collection version (the ETag does), so every
+    write makes older entries unreachable instead of having to delete them.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """Return a cached body, or None."""
+        body = await self.backend.get(key)
+        if body is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return body
+
+    async def set(self, key: str, body: bytes) -> None:
+        """Store a body."""
+        await self.backend.set(key, body)
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+
+def make_backend(name: str = RESPONSE_CACHE_BACKEND):
+    """Build the backend selected by RESPONSE_CACHE_BACKEND."""
+    if name == "none":
+        return NullBackend()
+    if name == "redis":
+        try:
+            return RedisBackend(ttl=RESPONSE_CACHE_TTL_SECONDS)
+        except ImportError:
+            print("❌ RESPONSE_CACHE_BACKEND=redis needs the redis package "
+                  "(pip install -r requirements-redis.txt); using memory")
+    return MemoryBackend(maxsize=RESPONSE_CACHE_MAX_SIZE, ttl=RESPONSE_CACHE_TTL_SECONDS)
+
+
+response_cache = ResponseCache(make_backend())
+cache_metrics("wishlist_list", response_cache)
@@ -0,0 +1 @@
+# Maintenance scripts, run with: python -m scripts.<name>
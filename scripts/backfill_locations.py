@@ -0,0 +1,23 @@
+"""
+Add the GeoJSON `location` and `geohash` fields to wishlists created
+before map queries existed, and make sure the 2dsphere index is in place.
+
+Usage: python -m scripts.backfill_locations
+"""
+import asyncio
+
+from indexes import ensure_indexes
+from wishlist.controller import backfill_locations
+from wishlist.versioning import bump_collection_version
+
+
+async def main():
+    await ensure_indexes()
+    updated = await backfill_locations()
+    if updated:
+        await bump_collection_version()
+    print(f"📍 Added location to {updated} wishlist(s)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,36 @@
+"""
+Move activities between the two storage modes: embedded arrays on each
+wishlist, or one document per activity in the activities collection.
+Run with the app stopped, then start it with the matching
+ACTIVITY_STORAGE setting. The stored counters and user stats are carried
+over as they are, so wishlists written before the counters existed need
+`python -m scripts.rebuild_stats` (with the new ACTIVITY_STORAGE setting)
+afterwards.
+
+Usage: python -m scripts.migrate_activities --to collection
+       python -m scripts.migrate_activities --to embedded
+"""
+import argparse
+import asyncio
+
+from indexes import ensure_indexes
+from wishlist.activity_store import migrate_to_collection, migrate_to_embedded
+from wishlist.versioning import bump_collection_version
+
+
+async def main(target: str, batch_size: int):
+    await ensure_indexes()
+    if target == "collection":
+        migrated = await migrate_to_collection(batch_size)
+    else:
+        migrated = await migrate_to_embedded()
+    await bump_collection_version()
+    print(f"🗂️ Moved activities of {migrated} wishlist(s) to {target} storage")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate activity storage")
+    parser.add_argument("--to", dest="target", choices=["collection", "embedded"], required=True)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.target, args.batch_size))
@@ -0,0 +1,23 @@
+"""
+Recompute every wishlist's activity counters (activity_count,
+completed_count, total_cost) and every user's summary in user_stats.
+Run once after deploying stats, or whenever the counters are suspected
+to have drifted.
+
+Usage: python -m scripts.rebuild_stats
+"""
+import asyncio
+
+from wishlist.stats import rebuild_stats
+from wishlist.versioning import bump_collection_version
+
+
+async def main():
+    await rebuild_stats()
+    # Counters are part of the response, so cached bodies and ETags are stale
+    await bump_collection_version()
+    print("📊 Wishlist and user statistics rebuilt")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
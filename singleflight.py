@@ -0,0 +1,63 @@
+import copy
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical calls: while a call for a key is in flight,
+    later callers with the same key await it instead of starting their own.
+
+    The caller that started the call gets the result itself; callers that
+    joined get their own copy (copy.deepcopy by default; pass copy=None for
+    immutable results), so nobody mutating what they got can affect the
+    others and an unshared call costs no copy. Errors are raised to every
+    waiting caller. Nothing is cached once the call completes.
+    """
+
+    def __init__(self, copy: Optional[Callable[[Any], Any]] = copy.deepcopy):
+        self._copy = copy
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.shared = 0
+
+    def _done(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._calls.get(key) is future:
+            del self._calls[key]
+        # Mark the error retrieved even if every waiting caller was cancelled
+        if not future.cancelled():
+            future.exception()
+
+    def _deliver(self, future: asyncio.Future, joined: asyncio.Future) -> None:
+        # Runs as a done callback, so before any awaiting caller resumes and
+        # can mutate the result the copy is taken from
+        if joined.cancelled():
+            return
+        if future.cancelled():
+            joined.cancel()
+        elif future.exception() is not None:
+            joined.set_exception(future.exception())
+        else:
+            try:
+                joined.set_result(future.result() if self._copy is None else self._copy(future.result()))
+            except Exception as e:
+                joined.set_exception(e)
+
+    async def do(self, key: Hashable, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """Run func(*args, **kwargs), or join the in-flight call for the same key."""
+        future = self._calls.get(key)
+        if future is None:
+            self.calls += 1
+            future = asyncio.ensure_future(func(*args, **kwargs))
+            self._calls[key] = future
+            future.add_done_callback(lambda done: self._done(key, done))
+        else:
+            self.shared += 1
+            joined = asyncio.get_running_loop().create_future()
+            future.add_done_callback(lambda done: self._deliver(done, joined))
+            return await joined
+        # Shield so the starting caller giving up does not cancel the call for the rest
+        return await asyncio.shield(future)
+
+    def __len__(self) -> int:
+        return len(self._calls)
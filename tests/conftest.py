@@ -0,0 +1,72 @@
+"""
+Tests drive the real app in-process. They use the in-memory mongomock
+stand-in unless MONGO_URL points at a server, and always the scratch
+database travel_app_test, which is dropped after every test.
+
+Install with: pip install -r requirements-dev.txt
+Run with: python -m pytest
+"""
+import os
+
+os.environ.setdefault("MONGO_URL", "mongomock://")
+os.environ["MONGO_DB_NAME"] = "travel_app_test"
+os.environ["MAX_USERS"] = "1000000"
+# Lets tests check how many commands a route issues (real servers only)
+os.environ["COMMAND_COUNTING_ENABLED"] = "true"
+
+import uuid
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+
+from database import client, db, MONGO_URL
+from auth.controller import get_password_hash, create_access_token, clear_auth_caches
+from response_cache import response_cache
+from main import app
+
+TEST_PASSWORD = "test-password"
+
+# For tests of server features the in-memory stand-in lacks
+requires_server = pytest.mark.skipif(
+    MONGO_URL.startswith("mongomock://"),
+    reason="needs a MongoDB server (set MONGO_URL)"
+)
+
+_password_hash = None
+
+
+@pytest.fixture(autouse=True)
+async def clean_database():
+    yield
+    await client.drop_database(db.name)
+    clear_auth_caches()
+    # Collection versions restart with the database, so cached pages would be reused
+    await response_cache.close()
+
+
+@pytest.fixture
+async def user() -> dict:
+    """A stored user with a valid access token."""
+    global _password_hash
+    if _password_hash is None:
+        _password_hash = get_password_hash(TEST_PASSWORD)
+    email = f"test-{uuid.uuid4().hex[:8]}@example.com"
+    result = await db.users.insert_one({
+        "full_name": "Test User",
+        "email": email,
+        "role": "user",
+        "hashed_password": _password_hash,
+        "created_at": datetime.utcnow()
+    })
+    token = create_access_token({"sub": email}, expires_delta=timedelta(minutes=30))
+    return {"id": str(result.inserted_id), "email": email, "token": token}
+
+
+@pytest.fixture
+async def api(user):
+    """HTTP client for the app, signed in as user."""
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Authorization": f"Bearer {user['token']}"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", headers=headers) as http:
+        yield http
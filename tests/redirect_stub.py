@@ -0,0 +1,69 @@
+"""
+Local stand-in for a link shortener, so short-link resolution can be
+exercised offline. Serves on 127.0.0.1 (list it in SHORT_URL_HOSTS) and
+redirects to full URLs on localhost, which is a different host.
+
+Paths:
+  /<lat>,<lng>   302 to a Google Maps style URL with those coordinates
+  /status/<code> responds with that status, e.g. 404 or 429
+  /stay          200 without redirecting
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+SHORT_HOST = "127.0.0.1"
+FULL_HOST = "localhost"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.requests += 1
+        path = self.path.lstrip("/")
+        if path.startswith("maps/"):
+            self._respond(200)
+        elif path.startswith("status/"):
+            self._respond(int(path.split("/", 1)[1]))
+        elif path == "stay":
+            self._respond(200)
+        else:
+            self.send_response(302)
+            self.send_header("Location", f"http://{FULL_HOST}:{self.server.server_port}/maps/place/@{path},15z")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+    def _respond(self, code: int):
+        body = b"stub"
+        self.send_response(code)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class RedirectStub:
+    """Context manager running the stub server on a free port in a background thread."""
+
+    def __init__(self):
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def __enter__(self) -> "RedirectStub":
+        self._server = ThreadingHTTPServer((SHORT_HOST, 0), _Handler)
+        self._server.requests = 0
+        threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    @property
+    def requests(self) -> int:
+        """Requests served so far."""
+        return self._server.requests
+
+    def url(self, path: str) -> str:
+        """Short link for path on the stub."""
+        return f"http://{SHORT_HOST}:{self._server.server_port}/{path}"
@@ -0,0 +1,123 @@
+import pytest
+
+import wishlist.activity_store as activity_store
+from database import db
+from wishlist.controller import (
+    create_wishlist,
+    add_activity,
+    update_activity,
+    apply_activity_operations,
+    _activity_stages
+)
+from wishlist.routes import ACTIVITY_BATCH_MAX_OPERATIONS
+from wishlist.stats import counters_stage
+from wishlist.versioning import pipeline_version_stage
+
+
+async def _wishlist_with_activities(user_id: str, names: list) -> dict:
+    wishlist = await create_wishlist({"name": "Trip", "latitude": 1.0, "longitude": 2.0}, user_id)
+    for name in names:
+        wishlist = await add_activity(wishlist["id"], user_id, {"name": name, "cost": 0.0, "is_completed": False})
+    return wishlist
+
+
+def _depth(value) -> int:
+    if isinstance(value, dict):
+        return 1 + max(map(_depth, value.values()), default=0)
+    if isinstance(value, list):
+        return 1 + max(map(_depth, value), default=0)
+    return 0
+
+
+def test_reorder_stage_lists_each_activity_once():
+    stages, required_ids = _activity_stages([{"op": "reorder", "order": ["c", "c", "a"]}])
+
+    listed = stages[-1]["$set"]["activities"]["$concatArrays"][:-1]
+    assert [part["$filter"]["cond"]["$eq"][1] for part in listed] == [{"$literal": "c"}, {"$literal": "a"}]
+    assert required_ids == ["c", "a"]
+
+
+def test_update_depth_does_not_grow_with_the_batch():
+    operations = [
+        {"op": "update", "id": "a", "changes": {"cost": 1.0}},
+        {"op": "delete", "id": "b"},
+        {"op": "add", "activity": {"name": "C", "cost": 0.0, "is_completed": False}},
+        {"op": "reorder", "order": ["a"]},
+    ] * (ACTIVITY_BATCH_MAX_OPERATIONS // 4)
+    stages, _ = _activity_stages(operations)
+    pipeline = [*stages, counters_stage(), pipeline_version_stage()]
+
+    assert len(stages) == ACTIVITY_BATCH_MAX_OPERATIONS + 1
+    # Well inside the server's nesting limit of 100 levels
+    assert _depth(pipeline) == _depth([*_activity_stages(operations[:4])[0], counters_stage()]) < 20
+
+
+@pytest.mark.parametrize("storage", ["embedded", "collection"])
+async def test_reorder_with_repeated_id_keeps_one_copy(user, monkeypatch, storage):
+    monkeypatch.setattr(activity_store, "ACTIVITY_STORAGE", storage)
+    wishlist = await _wishlist_with_activities(user["id"], ["A", "B", "C"])
+    a, b, c = (activity["id"] for activity in wishlist["activities"])
+
+    updated = await apply_activity_operations(
+        wishlist["id"], user["id"], [{"op": "reorder", "order": [c, c, a]}]
+    )
+
+    assert [activity["id"] for activity in updated["activities"]] == [c, a, b]
+    assert updated["activity_count"] == 3
+
+
+async def test_batch_rejects_reorder_with_repeated_id(api, user):
+    wishlist = await _wishlist_with_activities(user["id"], ["A", "B"])
+    a, b = (activity["id"] for activity in wishlist["activities"])
+
+    response = await api.patch(
+        f"/wishlist/{wishlist['id']}/activities",
+        json={"operations": [{"op": "reorder", "order": [b, b]}]}
+    )
+
+    assert response.status_code == 400
+    unchanged = (await api.get(f"/wishlist/{wishlist['id']}")).json()
+    assert [activity["id"] for activity in unchanged["activities"]] == [a, b]
+
+
+@pytest.mark.parametrize("storage", ["embedded", "collection"])
+async def test_ids_are_compared_as_strings_not_expressions(user, monkeypatch, storage):
+    monkeypatch.setattr(activity_store, "ACTIVITY_STORAGE", storage)
+    wishlist = await _wishlist_with_activities(user["id"], ["A", "B"])
+    ids = [activity["id"] for activity in wishlist["activities"]]
+
+    assert await apply_activity_operations(wishlist["id"], user["id"], [{"op": "delete", "id": "$$a.id"}]) is None
+    assert await update_activity(wishlist["id"], user["id"], "$$a.id", {"cost": 5.0}) is None
+
+    unchanged = await apply_activity_operations(wishlist["id"], user["id"], [])
+    assert [activity["id"] for activity in unchanged["activities"]] == ids
+    assert [activity["cost"] for activity in unchanged["activities"]] == [0.0, 0.0]
+
+
+async def test_batch_at_the_cap_is_applied(api, user):
+    wishlist = await _wishlist_with_activities(user["id"], ["A"])
+    a = wishlist["activities"][0]["id"]
+    operations = [{"op": "update", "id": a, "changes": {"cost": n}} for n in range(ACTIVITY_BATCH_MAX_OPERATIONS - 1)]
+    operations.append({"op": "add", "activity": {"name": "B", "cost": 1}})
+
+    response = await api.patch(f"/wishlist/{wishlist['id']}/activities", json={"operations": operations})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [(activity["name"], activity["cost"]) for activity in body["activities"]] == [
+        ("A", ACTIVITY_BATCH_MAX_OPERATIONS - 2), ("B", 1)
+    ]
+    assert body["total_cost"] == ACTIVITY_BATCH_MAX_OPERATIONS - 1
+
+
+async def test_migrate_to_embedded_gives_every_wishlist_an_array(user, monkeypatch):
+    monkeypatch.setattr(activity_store, "ACTIVITY_STORAGE", "collection")
+    busy = await _wishlist_with_activities(user["id"], ["A", "B"])
+    empty = await _wishlist_with_activities(user["id"], [])
+
+    assert await activity_store.migrate_to_embedded() == 1
+
+    docs = {str(doc["_id"]): doc async for doc in db.wishlists.find({}, {"activities": 1})}
+    assert [activity["name"] for activity in docs[busy["id"]]["activities"]] == ["A", "B"]
+    assert docs[empty["id"]]["activities"] == []
+    assert await db.activities.count_documents({}) == 0
@@ -0,0 +1,52 @@
+import time
+import hashlib
+from datetime import timedelta
+
+import cache
+from auth.controller import (
+    create_access_token,
+    get_user_from_token,
+    invalidate_user,
+    token_cache
+)
+from database import db
+
+
+async def test_cached_user_is_refreshed_after_invalidation(api, user):
+    first = await api.get("/auth/me")
+    await db.users.update_one({"email": user["email"]}, {"$set": {"full_name": "Renamed"}})
+
+    cached = await api.get("/auth/me")
+    invalidate_user(user["email"])
+    refreshed = await api.get("/auth/me")
+
+    assert first.json()["full_name"] == cached.json()["full_name"] == "Test User"
+    assert refreshed.json()["full_name"] == "Renamed"
+
+
+async def test_deleted_user_is_locked_out_once_invalidated(api, user):
+    assert (await api.get("/auth/me")).status_code == 200
+    await db.users.delete_one({"email": user["email"]})
+    invalidate_user(user["email"])
+
+    assert (await api.get("/auth/me")).status_code == 401
+
+
+async def test_callers_get_a_copy_of_the_cached_user(user):
+    record = await get_user_from_token(user["token"])
+    record["role"] = "admin"
+
+    assert (await get_user_from_token(user["token"]))["role"] == "user"
+
+
+async def test_decoded_token_is_not_cached_past_its_expiry(user, monkeypatch):
+    token = create_access_token({"sub": user["email"]}, expires_delta=timedelta(minutes=5))
+    key = hashlib.sha256(token.encode()).hexdigest()
+    await get_user_from_token(token)
+    assert token_cache.get(key) == user["email"]
+
+    # Still inside the cache's own TTL, but past the token's expiry
+    later = time.monotonic() + 6 * 60
+    monkeypatch.setattr(cache.time, "monotonic", lambda: later)
+
+    assert token_cache.get(key) is None
@@ -0,0 +1,55 @@
+from wishlist.controller import create_wishlist
+from wishlist.geo import encode_geohash, zoom_to_precision
+from tests.conftest import requires_server
+
+
+def test_geohash_matches_the_reference_encoding():
+    assert encode_geohash(57.64911, 10.40744, precision=11) == "u4pruydqqvj"
+
+
+def test_zoomed_out_maps_use_coarser_cells():
+    precisions = [zoom_to_precision(zoom) for zoom in range(0, 23)]
+
+    assert precisions[0] == 1 and precisions[-1] == 8
+    assert precisions == sorted(precisions)
+
+
+async def _seed(user_id: str) -> list:
+    # Two places in one coarse cell around Kuala Lumpur, one in Paris
+    places = [("KLCC", 3.1579, 101.7116), ("Chinatown", 3.1440, 101.6958), ("Louvre", 48.8606, 2.3376)]
+    return [
+        await create_wishlist({"name": name, "latitude": latitude, "longitude": longitude}, user_id)
+        for name, latitude, longitude in places
+    ]
+
+
+# mongomock has neither $geoWithin nor $substrCP
+@requires_server
+async def test_clusters_group_places_by_cell(api, user):
+    _, _, louvre = await _seed(user["id"])
+
+    response = await api.get("/wishlist/clusters", params={"bbox": "-180,-90,180,90", "zoom": 4})
+
+    body = response.json()
+    assert body["precision"] == 2
+    by_count = sorted(body["clusters"], key=lambda cell: cell["count"])
+    assert [cell["count"] for cell in by_count] == [1, 2]
+    assert by_count[0]["wishlist_id"] == louvre["id"]
+    assert by_count[1]["wishlist_id"] is None
+    assert round(by_count[1]["latitude"], 4) == round((3.1579 + 3.1440) / 2, 4)
+
+
+async def test_clusters_reject_bad_viewports(api):
+    bad_bbox = await api.get("/wishlist/clusters", params={"bbox": "1,2,3", "zoom": 4})
+    bad_zoom = await api.get("/wishlist/clusters", params={"bbox": "-10,-10,10,10", "zoom": 23})
+
+    assert (bad_bbox.status_code, bad_zoom.status_code) == (400, 422)
+
+
+@requires_server
+async def test_clusters_only_cover_the_viewport(api, user):
+    await _seed(user["id"])
+
+    response = await api.get("/wishlist/clusters", params={"bbox": "100,0,105,5", "zoom": 4})
+
+    assert [cell["count"] for cell in response.json()["clusters"]] == [2]
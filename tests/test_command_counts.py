@@ -0,0 +1,35 @@
+from types import SimpleNamespace
+
+from benchmarks import count_commands
+from database import CommandCounter
+from tests.conftest import requires_server
+
+
+def test_overlapping_commands_share_a_round_trip():
+    counter = CommandCounter()
+    write, bump, stats = (SimpleNamespace(command_name=name) for name in ("findAndModify", "update", "update"))
+
+    counter.started(write)
+    counter.succeeded(write)
+    # Sent together, as under asyncio.gather
+    counter.started(bump)
+    counter.started(stats)
+    counter.succeeded(stats)
+    counter.failed(bump)
+
+    assert counter.round_trips == 2
+    assert counter.counts == {"findAndModify": 1, "update": 2}
+
+
+# mongomock runs no command listeners, so there is nothing to count
+@requires_server
+async def test_routes_stay_within_round_trip_budgets():
+    counts = await count_commands.run()
+
+    over = {
+        label: counts.get(label)
+        for label, budget in count_commands.BUDGETS.items()
+        if counts.get(label, (0, {}))[0] > budget
+    }
+    assert over == {}
+    assert set(counts) == set(count_commands.BUDGETS)
@@ -0,0 +1,42 @@
+from wishlist.controller import create_wishlist
+
+
+async def test_place_etag_revalidates_until_the_place_changes(api, user):
+    wishlist = await create_wishlist({"name": "Trip", "latitude": 1.0, "longitude": 2.0}, user["id"])
+    url = f"/wishlist/{wishlist['id']}"
+
+    first = await api.get(url)
+    etag = first.headers["ETag"]
+    unchanged = await api.get(url, headers={"If-None-Match": etag})
+
+    assert first.status_code == 200
+    assert unchanged.status_code == 304
+    assert unchanged.content == b""
+    assert unchanged.headers["ETag"] == etag
+
+    await api.put(url, json={"name": "Renamed"})
+    changed = await api.get(url, headers={"If-None-Match": etag})
+
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.json()["name"] == "Renamed"
+
+
+async def test_list_etag_and_cached_page_follow_the_collection_version(api, user):
+    await create_wishlist({"name": "Trip", "latitude": 1.0, "longitude": 2.0}, user["id"])
+    url = "/wishlist/"
+
+    first = await api.get(url)
+    again = await api.get(url)
+    unchanged = await api.get(url, headers={"If-None-Match": first.headers["ETag"]})
+
+    assert (first.headers["X-Cache"], again.headers["X-Cache"]) == ("MISS", "HIT")
+    assert again.content == first.content
+    assert unchanged.status_code == 304
+
+    await create_wishlist({"name": "Beach", "latitude": 3.0, "longitude": 4.0}, user["id"])
+    changed = await api.get(url, headers={"If-None-Match": first.headers["ETag"]})
+
+    assert changed.status_code == 200
+    assert changed.headers["X-Cache"] == "MISS"
+    assert [item["name"] for item in changed.json()["items"]] == ["Trip", "Beach"]
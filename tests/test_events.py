@@ -0,0 +1,65 @@
+import asyncio
+
+import wishlist.events as events
+
+
+class FakeStream:
+    """Change stream that reports its opening token, then fails before any change."""
+
+    def __init__(self, token):
+        self.resume_token = token
+        self.alive = True
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def try_next(self):
+        raise ConnectionError("primary stepped down")
+
+
+class FakeCollection:
+    def __init__(self):
+        self.resume_after = []
+        self.full_document = []
+
+    def watch(self, pipeline, full_document=None, resume_after=None):
+        self.resume_after.append(resume_after)
+        self.full_document.append(full_document)
+        return FakeStream({"_data": f"opened-{len(self.resume_after)}"})
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.wishlists = FakeCollection()
+
+
+async def test_stream_error_before_first_change_resumes_from_open(monkeypatch):
+    fake = FakeDatabase()
+    monkeypatch.setattr(events, "db", fake)
+    monkeypatch.setattr(events, "EVENTS_RETRY_SECONDS", 0)
+
+    task = asyncio.ensure_future(events._watch_changes())
+    while len(fake.wishlists.resume_after) < 3:
+        await asyncio.sleep(0)
+    await events.stop_event_feed()
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    assert fake.wishlists.resume_after[:3] == [None, {"_data": "opened-1"}, {"_data": "opened-2"}]
+    assert set(fake.wishlists.full_document) == {"updateLookup"}
+
+
+def test_update_events_name_the_owner():
+    change = {
+        "operationType": "update",
+        "documentKey": {"_id": "w1"},
+        "fullDocument": {"user_id": "u1", "version": 4},
+        "updateDescription": {"updatedFields": {"name": "Renamed", "version": 3}},
+    }
+
+    assert events._event_from_change(change) == {
+        "type": "updated", "wishlist_id": "w1", "user_id": "u1", "version": 3
+    }
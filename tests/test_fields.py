@@ -0,0 +1,40 @@
+from wishlist.controller import create_wishlist, add_activity
+
+
+async def _place_with_activities(user_id: str) -> dict:
+    wishlist = await create_wishlist({"name": "Trip", "latitude": 1.0, "longitude": 2.0}, user_id)
+    await add_activity(wishlist["id"], user_id, {"name": "Lunch", "cost": 10.0, "is_completed": True})
+    await add_activity(wishlist["id"], user_id, {"name": "Dinner", "cost": 5.5, "is_completed": False})
+    return wishlist
+
+
+async def test_list_returns_only_requested_fields(api, user):
+    wishlist = await _place_with_activities(user["id"])
+
+    response = await api.get("/wishlist/", params={"fields": "name,activity_count,completed_count,total_cost"})
+
+    assert response.json()["items"] == [{
+        "id": wishlist["id"],
+        "name": "Trip",
+        "activity_count": 2,
+        "completed_count": 1,
+        "total_cost": 15.5,
+    }]
+
+
+async def test_single_place_fields_leave_out_the_version(api, user):
+    wishlist = await _place_with_activities(user["id"])
+
+    sparse = await api.get(f"/wishlist/{wishlist['id']}", params={"fields": "latitude,longitude"})
+    versioned = await api.get(f"/wishlist/{wishlist['id']}", params={"fields": "name,version"})
+
+    assert sparse.json() == {"id": wishlist["id"], "latitude": 1.0, "longitude": 2.0}
+    assert versioned.json() == {"id": wishlist["id"], "name": "Trip", "version": 3}
+    assert sparse.headers["ETag"] != versioned.headers["ETag"]
+
+
+async def test_unknown_fields_are_rejected(api):
+    response = await api.get("/wishlist/", params={"fields": "name,password"})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown fields: password"
@@ -0,0 +1,81 @@
+import math
+
+import pytest
+
+from wishlist.controller import create_wishlist
+from wishlist.geo import (
+    make_point,
+    geo_fields,
+    parse_bbox,
+    split_antimeridian,
+    bbox_polygons,
+    within_bbox_query
+)
+from tests.conftest import requires_server
+
+
+@pytest.mark.parametrize("latitude, longitude", [(95.0, 10.0), (-90.5, 10.0), (10.0, 180.5), (None, 10.0)])
+def test_no_point_off_the_globe(latitude, longitude):
+    assert make_point(latitude, longitude) is None
+    assert geo_fields(latitude, longitude) is None
+
+
+def test_point_is_longitude_first():
+    assert make_point(90.0, -180.0) == {"type": "Point", "coordinates": [-180.0, 90.0]}
+
+
+async def test_out_of_range_coordinates_are_rejected(api):
+    created = await api.post("/wishlist/", json={"name": "Trip", "latitude": 95, "longitude": 10})
+    valid = await api.post("/wishlist/", json={"name": "Trip", "latitude": 45, "longitude": 10})
+    updated = await api.put(f"/wishlist/{valid.json()['id']}", json={"longitude": -181})
+
+    assert (created.status_code, updated.status_code) == (422, 422)
+
+
+async def test_imported_rows_are_range_checked(api):
+    response = await api.post("/wishlist/import", json=[
+        {"name": "Pole", "latitude": 91, "longitude": 0},
+        {"name": "Trip", "latitude": 1, "longitude": 2},
+    ])
+
+    body = response.json()
+    assert (body["created"], body["failed"]) == (1, 1)
+    assert "latitude" in body["results"][0]["error"]
+
+
+def test_box_across_the_antimeridian_is_split():
+    bbox = parse_bbox("170,-10,-170,10")
+
+    assert split_antimeridian(*bbox) == [(170.0, -10.0, 180.0, 10.0), (-180.0, -10.0, -170.0, 10.0)]
+    assert [clause["longitude"] for clause in within_bbox_query(bbox)["$or"]] == [
+        {"$gte": 170.0, "$lte": 180.0},
+        {"$gte": -180.0, "$lte": -170.0},
+    ]
+
+
+@pytest.mark.parametrize("min_lat, max_lat", [(40.0, 60.0), (-60.0, -40.0), (-10.0, 10.0)])
+def test_polygon_edges_do_not_cut_into_the_box(min_lat, max_lat):
+    ((ring,),) = [polygon["coordinates"] for polygon in bbox_polygons(-60.0, min_lat, 60.0, max_lat)]
+    south, north = ring[0][1], ring[2][1]
+
+    # Highest/lowest latitude the geodesic edges reach, at their midpoints
+    def bulge(latitude):
+        return math.degrees(math.atan(math.tan(math.radians(latitude)) / math.cos(math.radians(60.0))))
+
+    assert bulge(south) <= min_lat + 1e-9 and south <= min_lat
+    assert bulge(north) >= max_lat - 1e-9 and north >= max_lat
+
+
+# mongomock has no $geoWithin
+@requires_server
+async def test_within_returns_exactly_the_rectangle(api, user):
+    for name, latitude, longitude in [
+        ("Inside", 41.0, 0.0), ("Above", 52.0, 0.0), ("East", 41.0, 175.0), ("West", 41.0, -175.0)
+    ]:
+        await create_wishlist({"name": name, "latitude": latitude, "longitude": longitude}, user["id"])
+
+    wide = await api.get("/wishlist/within", params={"bbox": "-80,40,80,50"})
+    across = await api.get("/wishlist/within", params={"bbox": "170,40,-170,50"})
+
+    assert sorted(place["name"] for place in wide.json()) == ["Inside"]
+    assert sorted(place["name"] for place in across.json()) == ["East", "West"]
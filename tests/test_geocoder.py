@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta
+
+import wishlist.geocoder as geocoder
+from database import db
+
+
+async def test_one_process_holds_the_sweep_lease(monkeypatch):
+    monkeypatch.setattr(geocoder, "_process_id", "first")
+    assert await geocoder.claim_sweep_lease()
+    assert await geocoder.claim_sweep_lease()  # Renewed by its holder
+
+    monkeypatch.setattr(geocoder, "_process_id", "second")
+    assert not await geocoder.claim_sweep_lease()
+
+    # Taken over once the holder stops renewing it
+    await db.locks.update_one(
+        {"_id": geocoder.SWEEP_LOCK_ID},
+        {"$set": {"expires_at": datetime.utcnow() - timedelta(seconds=1)}}
+    )
+    assert await geocoder.claim_sweep_lease()
+    assert (await db.locks.find_one({"_id": geocoder.SWEEP_LOCK_ID}))["owner"] == "second"
+
+
+async def test_sweeper_can_be_turned_off(monkeypatch):
+    monkeypatch.setattr(geocoder, "GEOCODE_SWEEPER_ENABLED", False)
+    monkeypatch.setattr(geocoder, "GEOCODE_WORKERS", 2)
+    try:
+        geocoder.start_geocoder()
+        assert len(geocoder._tasks) == 2
+    finally:
+        await geocoder.stop_geocoder()
+
+
+async def test_geocoded_event_names_the_owner(monkeypatch, user):
+    async def resolve(url):
+        return 1.5, 2.5
+
+    published = []
+    monkeypatch.setattr(geocoder, "_resolve_with_retry", resolve)
+    monkeypatch.setattr(geocoder, "publish_event", lambda *args: published.append(args))
+    result = await db.wishlists.insert_one({
+        "name": "Trip", "user_id": user["id"], "google_maps_url": "https://maps.app.goo.gl/x",
+        "geocode_status": "pending", "version": 1
+    })
+
+    await geocoder._geocode(str(result.inserted_id), "https://maps.app.goo.gl/x")
+
+    assert published == [("updated", str(result.inserted_id), user["id"], 2)]
@@ -0,0 +1,72 @@
+import json
+
+import wishlist.routes as routes
+from database import db
+from wishlist.versioning import get_collection_version
+
+
+async def test_json_import_reports_each_row(api):
+    response = await api.post("/wishlist/import", json=[
+        {"name": "Trip", "latitude": 1, "longitude": 2},
+        {"latitude": 1, "longitude": 2},
+        {"name": "Nowhere"},
+        "not a place",
+        {"name": "Beach", "status": "Planned", "latitude": 3, "longitude": 4},
+    ])
+
+    body = response.json()
+    assert response.status_code == 201
+    assert (body["created"], body["failed"]) == (2, 3)
+    assert [row["row"] for row in body["results"]] == [0, 1, 2, 3, 4]
+    assert [bool(row["id"]) for row in body["results"]] == [True, False, False, False, True]
+    assert "name" in body["results"][1]["error"]
+    assert body["results"][2]["error"] == "Either provide latitude/longitude or google_maps_url"
+    assert body["results"][3]["error"] == "Each place must be an object"
+    assert sorted([doc["name"] async for doc in db.wishlists.find({})]) == ["Beach", "Trip"]
+
+
+async def test_csv_import_treats_empty_cells_as_missing(api):
+    rows = "name,description,status,latitude,longitude,google_maps_url\n" \
+           "Trip,,,1.5,2.5,\n" \
+           "Pole,,,95,0,\n"
+
+    response = await api.post("/wishlist/import", content=rows, headers={"Content-Type": "text/csv"})
+
+    body = response.json()
+    assert (body["created"], body["failed"]) == (1, 1)
+    stored = await db.wishlists.find_one({"_id": {"$exists": True}})
+    assert (stored["name"], stored["description"], stored["status"]) == ("Trip", None, "Wishlist")
+    assert stored["location"] == {"type": "Point", "coordinates": [2.5, 1.5]}
+
+
+async def test_import_updates_stats_and_collection_version(api, user):
+    before = await get_collection_version()
+
+    await api.post("/wishlist/import", json=[
+        {"name": "Trip", "latitude": 1, "longitude": 2},
+        {"name": "Beach", "status": "Planned", "latitude": 3, "longitude": 4},
+        {"name": "Broken"},
+    ])
+
+    stats = (await api.get("/wishlist/stats")).json()
+    assert stats["wishlist_count"] == 2
+    assert {k: v for k, v in stats["status_counts"].items() if v} == {"Wishlist": 1, "Planned": 1}
+    assert await get_collection_version() == before + 1
+
+
+async def test_import_with_no_valid_rows_writes_nothing(api, user):
+    response = await api.post("/wishlist/import", json=[{"name": "Nowhere"}])
+
+    assert response.json()["created"] == 0
+    assert await get_collection_version() == 0
+    assert await db.user_stats.find_one({"_id": user["id"]}) is None
+
+
+async def test_unparseable_or_oversized_bodies_are_rejected(api, monkeypatch):
+    not_array = await api.post("/wishlist/import", json={"name": "Trip"})
+    not_json = await api.post("/wishlist/import", content=b"{", headers={"Content-Type": "application/json"})
+    monkeypatch.setattr(routes, "IMPORT_MAX_ROWS", 1)
+    too_many = await api.post("/wishlist/import", content=json.dumps([{}, {}]),
+                              headers={"Content-Type": "application/json"})
+
+    assert (not_array.status_code, not_json.status_code, too_many.status_code) == (400, 400, 413)
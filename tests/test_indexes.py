@@ -0,0 +1,23 @@
+import pytest
+
+from database import db
+from indexes import ensure_indexes, IndexCreationError
+from main import startup_db_client
+
+
+async def test_duplicate_emails_block_startup():
+    await db.users.insert_many([{"email": "same@example.com"}, {"email": "same@example.com"}])
+
+    with pytest.raises(IndexCreationError):
+        await ensure_indexes()
+    with pytest.raises(IndexCreationError):
+        await startup_db_client()
+
+
+async def test_unique_email_index_rejects_second_registration(api):
+    await ensure_indexes()
+    account = {"full_name": "Ann", "email": "ann@example.com", "password": "secret-password"}
+
+    assert (await api.post("/auth/register", json=account)).status_code == 200
+    assert (await api.post("/auth/register", json=account)).status_code == 400
+    assert await db.users.count_documents({"email": "ann@example.com"}) == 1
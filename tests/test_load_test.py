@@ -0,0 +1,57 @@
+import sys
+import argparse
+
+import pytest
+
+from database import db
+from benchmarks import load_test
+
+
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 101))
+
+    assert load_test.percentile(values, 0.50) == 50
+    assert load_test.percentile(values, 0.99) == 99
+    assert load_test.percentile([], 0.50) == 0.0
+
+
+def test_refuses_to_drop_a_database_that_is_not_scratch(monkeypatch):
+    # The test database is already open, and its name does not end in _loadtest
+    monkeypatch.setattr(sys, "argv", ["load_test", "--requests", "1"])
+
+    with pytest.raises(SystemExit) as exit_info:
+        load_test.main()
+
+    assert exit_info.value.code == 2
+    assert load_test.SCRATCH_DB_SUFFIX not in db.name
+
+
+def test_counts_must_be_positive(monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["load_test", "--users", "0"])
+
+    with pytest.raises(SystemExit):
+        load_test.main()
+
+
+async def test_seeds_wishlists_with_activities(user):
+    # The user fixture already stored one user, and no counter exists yet
+    seeded = await load_test.seed(users=2, wishlists_per_user=3, activities_per_wishlist=2)
+
+    assert len(seeded["users"]) == 2
+    assert len(seeded["wishlist_ids"]) == 6
+    counts = [doc["activity_count"] async for doc in db.wishlists.find({}, {"activity_count": 1})]
+    assert counts == [2] * 6
+    assert (await db.counters.find_one({"_id": "users"}))["count"] == await db.users.count_documents({})
+
+
+async def test_run_drives_routes_without_errors():
+    args = argparse.Namespace(
+        users=2, wishlists=2, activities=1, requests=4, concurrency=2,
+        routes=["token", "list", "get", "create", "activity"]
+    )
+
+    report = await load_test.run(args)
+
+    for route in args.routes:
+        assert report["results"][route]["requests"] == 4
+        assert report["results"][route]["errors"] == {}
@@ -0,0 +1,56 @@
+import re
+
+from wishlist.controller import create_wishlist
+
+NEW_SERIES = [
+    "http_request_duration_seconds",
+    "http_requests_in_flight",
+    "mongodb_command_duration_seconds",
+    "bcrypt_queue_seconds",
+    "bcrypt_run_seconds",
+    "url_resolution_seconds",
+    "wishlist_event_subscribers",
+    "cache_hits_total",
+    "cache_misses_total",
+]
+
+
+def _sample(text: str, series: str) -> float:
+    match = re.search(rf"^{re.escape(series)} (\S+)$", text, re.MULTILINE)
+    assert match, f"{series} missing"
+    return float(match.group(1))
+
+
+async def test_metrics_declare_every_series(api):
+    response = await api.get("/metrics")
+
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    for name in NEW_SERIES:
+        assert f"# TYPE {name} " in response.text
+
+
+async def test_requests_are_labelled_by_route_template(api, user):
+    wishlist = await create_wishlist({"name": "Trip", "latitude": 1.0, "longitude": 2.0}, user["id"])
+    count = 'http_request_duration_seconds_count{method="GET",route="/wishlist/{wishlist_id}",status="200"}'
+    before = (await api.get("/metrics")).text
+
+    await api.get(f"/wishlist/{wishlist['id']}")
+    await api.get(f"/wishlist/{wishlist['id']}")
+    after = (await api.get("/metrics")).text
+
+    previous = _sample(before, count) if count in before else 0
+    assert _sample(after, count) == previous + 2
+    assert wishlist["id"] not in after
+    # The scrape itself is the one request in flight
+    assert _sample(after, "http_requests_in_flight") == 1
+
+
+async def test_cache_counters_follow_lookups(api):
+    series = 'cache_misses_total{cache="user"}'
+    before = _sample((await api.get("/metrics")).text, series)
+
+    await api.get("/auth/me")  # The cache was cleared after the previous test
+    await api.get("/auth/me")
+    text = (await api.get("/metrics")).text
+
+    assert _sample(text, series) == before + 1
@@ -0,0 +1,37 @@
+import pytest
+
+import wishlist.routes as routes
+from wishlist.controller import create_wishlist
+
+
+async def test_cursor_walks_every_page(api, user):
+    for name in ("A", "B", "C"):
+        await create_wishlist({"name": name, "latitude": 1.0, "longitude": 2.0}, user["id"])
+
+    names, cursor = [], None
+    while True:
+        params = {"limit": 2, "fields": "name", **({"cursor": cursor} if cursor else {})}
+        page = (await api.get("/wishlist/", params=params)).json()
+        names += [item["name"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert names == ["A", "B", "C"]
+
+
+async def test_malformed_cursor_is_a_bad_request(api):
+    response = await api.get("/wishlist/", params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+async def test_query_errors_are_not_reported_as_bad_requests(api, monkeypatch):
+    async def failing_page(**kwargs):
+        raise ValueError("driver detail")
+
+    monkeypatch.setattr(routes, "get_wishlists_page", failing_page)
+
+    with pytest.raises(ValueError):
+        await api.get("/wishlist/")
@@ -0,0 +1,63 @@
+import os
+import asyncio
+
+import pytest
+
+import profiling
+from profiling import ProfilingMiddleware
+
+
+async def _endpoint(scope, receive, send):
+    await asyncio.sleep(0.02)
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def _call(middleware: ProfilingMiddleware, profile: bool = True) -> dict:
+    headers = [(b"x-profile", b"1")] if profile else []
+    scope = {"type": "http", "method": "GET", "path": "/slow", "query_string": b"", "headers": headers}
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    await middleware(scope, receive, send)
+    return dict(messages[0]["headers"])
+
+
+@pytest.fixture
+def middleware(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    middleware = ProfilingMiddleware(_endpoint)
+
+    async def is_admin(scope):
+        return True
+
+    monkeypatch.setattr(middleware, "_is_admin", is_admin)
+    return middleware
+
+
+@pytest.mark.parametrize("mode", ["sample", "cprofile"])
+async def test_profile_is_written_and_named(middleware, monkeypatch, tmp_path, mode):
+    monkeypatch.setattr(profiling, "PROFILE_MODE", mode)
+
+    headers = await _call(middleware)
+
+    name = headers[b"x-profile-file"].decode()
+    assert os.listdir(tmp_path) == [name]
+    assert os.path.getsize(tmp_path / name) > 0
+
+
+async def test_cprofile_skips_requests_while_others_are_in_flight(middleware, monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling, "PROFILE_MODE", "cprofile")
+
+    other = asyncio.ensure_future(_call(middleware, profile=False))
+    await asyncio.sleep(0)
+    headers = await _call(middleware)
+    await other
+
+    assert b"x-profile-file" not in headers
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,50 @@
+import httpx
+import pytest
+
+import wishlist.resolver as resolver
+from database import db
+from wishlist.resolver import resolve_coordinates, url_cache
+from tests.redirect_stub import RedirectStub, SHORT_HOST
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    monkeypatch.setattr(resolver, "SHORT_URL_HOSTS", [SHORT_HOST])
+    url_cache.clear()
+    with RedirectStub() as stub:
+        yield stub
+    url_cache.clear()
+
+
+async def test_short_link_is_resolved_once_then_cached(stub):
+    link = stub.url("1.5,2.5")
+
+    assert await resolve_coordinates(link) == (1.5, 2.5)
+    assert await resolve_coordinates(link) == (1.5, 2.5)
+
+    assert stub.requests == 2  # The redirect and the final page, fetched once
+    assert await db.url_resolutions.count_documents({"_id": link}) == 1
+
+
+@pytest.mark.parametrize("code", [404, 429, 503])
+async def test_error_responses_are_raised_and_not_cached(stub, code):
+    link = stub.url(f"status/{code}")
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await resolve_coordinates(link)
+    with pytest.raises(httpx.HTTPStatusError):
+        await resolve_coordinates(link)
+
+    assert stub.requests == 2
+    assert url_cache.get(link) is None
+    assert await db.url_resolutions.count_documents({}) == 0
+
+
+async def test_link_that_does_not_redirect_is_not_cached(stub):
+    link = stub.url("stay")
+
+    with pytest.raises(ValueError):
+        await resolve_coordinates(link)
+
+    assert url_cache.get(link) is None
+    assert await db.url_resolutions.count_documents({}) == 0
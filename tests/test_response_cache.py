@@ -0,0 +1,42 @@
+import fakeredis
+import pytest
+
+from response_cache import RedisBackend, ResponseCache
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+async def backend(server):
+    backend = RedisBackend(ttl=60, client=fakeredis.FakeAsyncRedis(server=server))
+    yield backend
+    await backend.close()
+
+
+async def test_redis_backend_round_trips_bodies(backend):
+    cache = ResponseCache(backend)
+
+    assert await cache.get("etag") is None
+    await cache.set("etag", b'{"items": []}')
+
+    assert await cache.get("etag") == b'{"items": []}'
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+async def test_redis_entries_expire_after_the_ttl(backend, server):
+    await backend.set("etag", b"body")
+
+    ttl = await fakeredis.FakeAsyncRedis(server=server).ttl("responses:etag")
+    assert 0 < ttl <= 60
+
+
+async def test_redis_outage_falls_back_to_a_miss(backend, server):
+    await backend.set("etag", b"body")
+    server.connected = False
+
+    # Neither call raises; the route just renders the response itself
+    await backend.set("other", b"body")
+    assert await backend.get("etag") is None
@@ -0,0 +1,55 @@
+import uuid
+
+import pytest
+
+import wishlist.activity_store as activity_store
+from database import db
+from indexes import ensure_indexes
+from wishlist.controller import create_wishlist, add_activity, search_wishlists
+from tests.conftest import requires_server
+
+pytestmark = requires_server  # mongomock has no $text or $unionWith
+
+
+@pytest.fixture
+def collection_storage(monkeypatch):
+    monkeypatch.setattr(activity_store, "ACTIVITY_STORAGE", "collection")
+
+
+async def _place(user_id: str, name: str, activities=(), status: str = "Wishlist") -> dict:
+    wishlist = await create_wishlist({"name": name, "latitude": 1.0, "longitude": 2.0, "status": status}, user_id)
+    for activity in activities:
+        await add_activity(wishlist["id"], user_id, {"name": activity})
+    return wishlist
+
+
+async def test_activity_matches_are_not_capped(user, collection_storage):
+    await ensure_indexes()
+    # More matching activities than the old 1000-match cap, all on other places
+    crowded = await _place(user["id"], "Crowded")
+    await db.activities.insert_many([
+        activity_store.activity_document(crowded["id"], user["id"], {"id": uuid.uuid4().hex, "name": "snorkel trip"})
+        for _ in range(1001)
+    ])
+    own = await _place(user["id"], "Snorkel bay")
+    late = await _place(user["id"], "Quiet", ["snorkel lesson"])
+
+    page = await search_wishlists("snorkel", limit=10)
+
+    ids = [item["id"] for item in page["items"]]
+    assert ids[0] == own["id"]  # Matching by its own name ranks first
+    assert set(ids) == {own["id"], crowded["id"], late["id"]}
+    assert page["next_offset"] is None
+
+
+async def test_activity_matches_respect_filters_and_paging(user, collection_storage):
+    await ensure_indexes()
+    planned = [await _place(user["id"], f"Place {n}", ["museum visit"], status="Planned") for n in range(3)]
+    await _place(user["id"], "Elsewhere", ["museum visit"])
+
+    first = await search_wishlists("museum", limit=2, status="Planned")
+    second = await search_wishlists("museum", limit=2, offset=first["next_offset"], status="Planned")
+
+    ids = [item["id"] for item in first["items"] + second["items"]]
+    assert sorted(ids) == sorted(place["id"] for place in planned)
+    assert second["next_offset"] is None
@@ -0,0 +1,51 @@
+import warnings
+import importlib
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from database import db, fix_id
+from wishlist.model import WishlistResponse
+import wishlist.serialization as serialization
+from wishlist.serialization import RESPONSE_PROJECTION
+
+CREATED = datetime(2024, 1, 2, 3, 4, 5)
+
+LEGACY_DOCUMENTS = [
+    # Written before status, source_type, counters and versions existed
+    {"name": "Old", "user_id": "u1", "created_at": CREATED},
+    # Activity items from before cost and is_completed had defaults
+    {"name": "Items", "user_id": "u1", "created_at": CREATED,
+     "activities": [{"id": "a1", "name": "Walk"}, {"id": "a2", "name": "Eat", "cost": 4.5, "note": "x"}]},
+    # A complete current document
+    {"name": "New", "user_id": "u1", "created_at": CREATED, "updated_at": CREATED,
+     "status": "Visited", "source_type": "google_map", "description": "d",
+     "latitude": 1.0, "longitude": 2.0, "google_maps_url": "https://maps.google.com/?q=1,2",
+     "geocode_status": "resolved", "activities": [{"id": "a3", "name": "Swim", "cost": 1.0, "is_completed": True}],
+     "activity_count": 1, "completed_count": 1, "total_cost": 1.0, "version": 3,
+     "location": {"type": "Point", "coordinates": [2.0, 1.0]}, "geohash": "s00"},
+]
+
+
+@pytest.mark.parametrize("document", LEGACY_DOCUMENTS, ids=["bare", "legacy-activities", "current"])
+async def test_projection_matches_validated_response(document):
+    await db.wishlists.insert_one(dict(document))
+
+    # aggregate rather than find, since mongomock only evaluates $toString there
+    [fast] = await db.wishlists.aggregate([{"$project": RESPONSE_PROJECTION}]).to_list(length=None)
+    stored = await db.wishlists.find_one({})
+
+    assert fast == WishlistResponse(**fix_id(stored)).dict()
+
+
+def test_fast_json_response_encodes_object_ids_without_deprecated_bases():
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        importlib.reload(serialization)
+    object_id = ObjectId()
+
+    response = serialization.FastJSONResponse({"id": object_id, "at": CREATED})
+
+    assert response.media_type == "application/json"
+    assert response.body == f'{{"id":"{object_id}","at":"2024-01-02T03:04:05"}}'.encode()
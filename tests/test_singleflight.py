@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from singleflight import SingleFlight
+
+
+class Backend:
+    """Slow backend that counts its calls."""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def fetch(self, key: str) -> dict:
+        self.calls += 1
+        await self.release.wait()
+        return {"id": key, "activities": [{"name": "Visit"}]}
+
+    async def fail(self, key: str) -> dict:
+        self.calls += 1
+        await self.release.wait()
+        raise ConnectionError(key)
+
+
+class CountingCopy:
+    def __init__(self):
+        self.copies = 0
+
+    def __call__(self, value: dict) -> dict:
+        self.copies += 1
+        return {**value, "activities": [dict(a) for a in value["activities"]]}
+
+
+async def _start(flight: SingleFlight, backend: Backend, callers: int, method: str = "fetch") -> list:
+    tasks = [asyncio.ensure_future(flight.do("place", getattr(backend, method), "place")) for _ in range(callers)]
+    await asyncio.sleep(0)
+    return tasks
+
+
+async def test_concurrent_callers_share_one_call():
+    backend, flight = Backend(), SingleFlight()
+    tasks = await _start(flight, backend, 5)
+
+    backend.release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert backend.calls == 1
+    assert (flight.calls, flight.shared) == (1, 4)
+    assert all(result == {"id": "place", "activities": [{"name": "Visit"}]} for result in results)
+    assert len(flight) == 0
+
+
+async def test_unshared_call_is_not_copied():
+    backend, counting = Backend(), CountingCopy()
+    backend.release.set()
+
+    await SingleFlight(copy=counting).do("place", backend.fetch, "place")
+
+    assert counting.copies == 0
+
+
+async def test_only_joined_callers_get_copies():
+    backend, counting = Backend(), CountingCopy()
+    flight = SingleFlight(copy=counting)
+
+    async def leader():
+        result = await flight.do("place", backend.fetch, "place")
+        # Mutate before yielding, ahead of the joined callers resuming
+        result["activities"].append({"name": "Mutated"})
+        return result
+
+    tasks = [asyncio.ensure_future(leader())] + await _start(flight, backend, 3)
+    backend.release.set()
+    first, *joined = await asyncio.gather(*tasks)
+
+    assert counting.copies == 3
+    assert len(first["activities"]) == 2
+    assert all(result["activities"] == [{"name": "Visit"}] for result in joined)
+    assert len({id(result) for result in [first, *joined]}) == 4
+
+
+async def test_error_reaches_every_caller_and_is_not_kept():
+    backend, flight = Backend(), SingleFlight()
+    tasks = await _start(flight, backend, 3, "fail")
+
+    backend.release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert all(isinstance(result, ConnectionError) for result in results)
+    assert (await flight.do("place", backend.fetch, "place"))["id"] == "place"
+    assert backend.calls == 2
+
+
+@pytest.mark.parametrize("cancelled", [0, 1], ids=["starter", "joined"])
+async def test_cancelled_caller_does_not_cancel_the_others(cancelled):
+    backend, flight = Backend(), SingleFlight()
+    tasks = await _start(flight, backend, 3)
+
+    tasks[cancelled].cancel()
+    await asyncio.sleep(0)
+    backend.release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert isinstance(results[cancelled], asyncio.CancelledError)
+    assert [result["id"] for i, result in enumerate(results) if i != cancelled] == ["place", "place"]
+    assert backend.calls == 1
@@ -0,0 +1,101 @@
+import pytest
+
+import wishlist.activity_store as activity_store
+from database import db
+from wishlist.controller import (
+    create_wishlist,
+    update_wishlist,
+    delete_wishlist,
+    add_activity,
+    update_activity,
+    delete_activity,
+    apply_activity_operations,
+    get_wishlist_by_id
+)
+from wishlist.stats import rebuild_stats
+from tests.conftest import requires_server
+
+
+async def _stats(user_id: str) -> dict:
+    stats = await db.user_stats.find_one({"_id": user_id}, {"_id": 0, "updated_at": 0})
+    stats["status_counts"] = {k: v for k, v in stats.get("status_counts", {}).items() if v}
+    return stats
+
+
+def _activity(name: str, cost: float) -> dict:
+    return {"name": name, "cost": cost, "is_completed": False}
+
+
+@pytest.mark.parametrize("storage", ["embedded", "collection"])
+async def test_writes_keep_user_stats_in_step(user, monkeypatch, storage):
+    monkeypatch.setattr(activity_store, "ACTIVITY_STORAGE", storage)
+    user_id = user["id"]
+    first = await create_wishlist({"name": "Trip", "latitude": 1.0, "longitude": 2.0}, user_id)
+    second = await create_wishlist({"name": "Beach", "latitude": 3.0, "longitude": 4.0}, user_id)
+
+    wishlist = await add_activity(first["id"], user_id, _activity("Lunch", 10))
+    lunch = wishlist["activities"][0]["id"]
+    await add_activity(first["id"], user_id, _activity("Dinner", 30))
+    await update_activity(first["id"], user_id, lunch, {"is_completed": True, "cost": 12})
+    await apply_activity_operations(first["id"], user_id, [{"op": "add", "activity": _activity("Tour", 5)}])
+    await add_activity(second["id"], user_id, _activity("Swim", 0))
+    await update_wishlist(second["id"], user_id, {"status": "Planned"})
+
+    assert await _stats(user_id) == {
+        "wishlist_count": 2,
+        "status_counts": {"Wishlist": 1, "Planned": 1},
+        "activity_count": 4,
+        "completed_count": 1,
+        "total_cost": 47,
+    }
+
+    await delete_activity(first["id"], user_id, lunch)
+    await delete_wishlist(second["id"], user_id)
+
+    assert await _stats(user_id) == {
+        "wishlist_count": 1,
+        "status_counts": {"Wishlist": 1},
+        "activity_count": 2,
+        "completed_count": 0,
+        "total_cost": 35,
+    }
+    stored = await db.wishlists.find_one({})
+    assert stored["activity_count"] == 2 and "counter_delta" not in stored
+
+
+@pytest.mark.parametrize("storage", ["embedded", "collection"])
+async def test_delete_of_unknown_activity_changes_nothing(user, monkeypatch, storage):
+    monkeypatch.setattr(activity_store, "ACTIVITY_STORAGE", storage)
+    wishlist = await create_wishlist({"name": "Trip", "latitude": 1.0, "longitude": 2.0}, user["id"])
+    wishlist = await add_activity(wishlist["id"], user["id"], _activity("Lunch", 10))
+
+    # An id that reads like an expression must not match every activity
+    await delete_activity(wishlist["id"], user["id"], "$$a.id")
+
+    stored = await db.wishlists.find_one({})
+    assert stored["activity_count"] == 1
+    assert (await _stats(user["id"]))["activity_count"] == 1
+    assert [a["name"] for a in (await get_wishlist_by_id(wishlist["id"], user["id"]))["activities"]] == ["Lunch"]
+
+
+async def test_update_without_status_change_leaves_stats_alone(user):
+    wishlist = await create_wishlist({"name": "Trip", "latitude": 1.0, "longitude": 2.0}, user["id"])
+
+    updated = await update_wishlist(wishlist["id"], user["id"], {"name": "Renamed"})
+
+    assert updated["name"] == "Renamed"
+    assert updated["version"] == wishlist["version"] + 1
+    assert (await _stats(user["id"]))["status_counts"] == {"Wishlist": 1}
+
+
+# rebuild_stats writes user summaries with $merge, which mongomock lacks
+@requires_server
+@pytest.mark.parametrize("storage", ["embedded", "collection"])
+async def test_rebuild_bumps_versions(user, monkeypatch, storage):
+    monkeypatch.setattr(activity_store, "ACTIVITY_STORAGE", storage)
+    wishlist = await create_wishlist({"name": "Trip", "latitude": 1.0, "longitude": 2.0}, user["id"])
+
+    await rebuild_stats()
+
+    rebuilt = await get_wishlist_by_id(wishlist["id"], user["id"])
+    assert rebuilt["version"] == wishlist["version"] + 1
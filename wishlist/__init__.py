@@ -2,39 +2,67 @@
 from .controller import (
     extract_coordinates_from_url,
     get_user_wishlists,
+    get_wishlists_page,
+    search_wishlists,
     get_wishlist_by_id,
+    get_activities_page,
     create_wishlist,
+    import_wishlists,
     update_wishlist,
     delete_wishlist,
     add_activity,
     update_activity,
-    delete_activity
+    delete_activity,
+    apply_activity_operations
 )
 from .routes import router as wishlist_router
 from .model import (
     WishlistCreate,
     WishlistUpdate,
     WishlistResponse,
+    WishlistPage,
+    WishlistSearchPage,
+    WishlistSuggestion,
+    WishlistSummary,
+    WishlistClusterResponse,
+    ImportResponse,
+    WishlistStats,
     ActivityCreate,
     ActivityUpdate,
-    ActivityResponse
+    ActivityResponse,
+    ActivityPage,
+    ActivityBatch
 )
 
 __all__ = [
     "extract_coordinates_from_url",
     "get_user_wishlists",
+    "get_wishlists_page",
+    "search_wishlists",
     "get_wishlist_by_id",
+    "get_activities_page",
     "create_wishlist",
+    "import_wishlists",
     "update_wishlist",
     "delete_wishlist",
     "add_activity",
     "update_activity",
     "delete_activity",
+    "apply_activity_operations",
     "wishlist_router",
     "WishlistCreate",
     "WishlistUpdate",
     "WishlistResponse",
+    "WishlistPage",
+    "WishlistSearchPage",
+    "WishlistSuggestion",
+    "WishlistSummary",
+    "WishlistClusterResponse",
+    "ImportResponse",
+    "WishlistStats",
     "ActivityCreate",
     "ActivityUpdate",
-    "ActivityResponse"
+    "ActivityResponse",
+    "ActivityPage",
+    "ActivityBatch"
 ]
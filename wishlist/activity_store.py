@@ -0,0 +1,293 @@
+import os
+import time
+import uuid
+from collections import defaultdict
+from typing import List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import DeleteOne, InsertOne, ReplaceOne, ReturnDocument, UpdateOne
+
+from database import db
+from .versioning import with_version
+
+# Where activities live: "embedded" keeps them in each wishlist's activities
+# array, "collection" stores one document per activity in the activities
+# collection so long itineraries don't grow (and rewrite) the wishlist.
+ACTIVITY_STORAGE = os.getenv("ACTIVITY_STORAGE", "embedded").lower()
+
+# Activity fields returned to clients
+ACTIVITY_PROJECTION = {"_id": 0, "id": 1, "name": 1, "cost": 1, "is_completed": 1}
+
+# Activities of a wishlist are listed in this order
+ACTIVITY_SORT = [("position", 1), ("id", 1)]
+
+_last_position = 0
+
+
+def uses_activity_collection() -> bool:
+    """Whether activities are stored in their own collection."""
+    return ACTIVITY_STORAGE == "collection"
+
+
+def _next_position() -> int:
+    """Position for a new activity, after every existing one."""
+    global _last_position
+    _last_position = max(time.time_ns(), _last_position + 1)
+    return _last_position
+
+
+def activity_document(
+    wishlist_id: str,
+    user_id: str,
+    activity: dict,
+    position: Optional[int] = None
+) -> dict:
+    """Build the stored form of one activity."""
+    return {
+        "id": activity["id"],
+        "wishlist_id": wishlist_id,
+        "user_id": user_id,
+        "position": _next_position() if position is None else position,
+        "name": activity["name"],
+        "cost": activity.get("cost", 0),
+        "is_completed": activity.get("is_completed", False),
+    }
+
+
+def counter_delta(before: Optional[dict], after: Optional[dict]) -> dict:
+    """$inc for a wishlist's counters when one activity goes from before to after."""
+    def counts(activity: Optional[dict]) -> Tuple[int, int, float]:
+        if activity is None:
+            return 0, 0, 0
+        return 1, 1 if activity.get("is_completed") else 0, activity.get("cost", 0)
+
+    old, new = counts(before), counts(after)
+    return {
+        "activity_count": new[0] - old[0],
+        "completed_count": new[1] - old[1],
+        "total_cost": new[2] - old[2],
+    }
+
+
+async def attach_activities(wishlists: List[dict]) -> List[dict]:
+    """Fill in the activities of already-fetched wishlists with one query."""
+    if not wishlists:
+        return wishlists
+    grouped = defaultdict(list)
+    cursor = db.activities.find(
+        {"wishlist_id": {"$in": [wishlist["id"] for wishlist in wishlists]}},
+        {**ACTIVITY_PROJECTION, "wishlist_id": 1}
+    ).sort([("wishlist_id", 1)] + ACTIVITY_SORT)
+    async for activity in cursor:
+        grouped[activity.pop("wishlist_id")].append(activity)
+    for wishlist in wishlists:
+        wishlist["activities"] = grouped.get(wishlist["id"], [])
+    return wishlists
+
+
+async def list_activities(
+    wishlist_id: str,
+    limit: int,
+    after: Optional[Tuple[int, str]] = None
+) -> List[dict]:
+    """Get up to limit activities of a wishlist that sort after the (position, id) key."""
+    query = {"wishlist_id": wishlist_id}
+    if after:
+        position, activity_id = after
+        query["$or"] = [
+            {"position": {"$gt": position}},
+            {"position": position, "id": {"$gt": activity_id}}
+        ]
+    return await db.activities.find(
+        query,
+        {**ACTIVITY_PROJECTION, "position": 1}
+    ).sort(ACTIVITY_SORT).limit(limit).to_list(length=limit)
+
+
+async def insert_activity(wishlist_id: str, user_id: str, activity: dict) -> None:
+    """Store a new activity at the end of its wishlist."""
+    await db.activities.insert_one(activity_document(wishlist_id, user_id, activity))
+
+
+async def update_activity_document(
+    wishlist_id: str,
+    user_id: str,
+    activity_id: str,
+    changes: dict
+) -> Optional[dict]:
+    """Update one activity. Returns the counter delta, or None if it does not exist."""
+    before = await db.activities.find_one_and_update(
+        {"id": activity_id, "wishlist_id": wishlist_id, "user_id": user_id},
+        {"$set": changes},
+        projection=ACTIVITY_PROJECTION,
+        return_document=ReturnDocument.BEFORE
+    )
+    if before is None:
+        return None
+    return counter_delta(before, {**before, **changes})
+
+
+async def delete_activity_document(wishlist_id: str, user_id: str, activity_id: str) -> dict:
+    """Delete one activity. Returns the counter delta (all zero if it did not exist)."""
+    before = await db.activities.find_one_and_delete(
+        {"id": activity_id, "wishlist_id": wishlist_id, "user_id": user_id},
+        projection=ACTIVITY_PROJECTION
+    )
+    return counter_delta(before, None)
+
+
+async def delete_wishlist_activities(wishlist_id: str) -> None:
+    """Delete every activity of a wishlist."""
+    await db.activities.delete_many({"wishlist_id": wishlist_id})
+
+
+async def _reorder_writes(wishlist_id: str, order: List[str]) -> list:
+    """Position updates putting the listed activities first, the rest after in their current order."""
+    current = [
+        activity["id"] async for activity in db.activities.find(
+            {"wishlist_id": wishlist_id}, {"_id": 0, "id": 1}
+        ).sort(ACTIVITY_SORT)
+    ]
+    listed = [activity_id for activity_id in dict.fromkeys(order) if activity_id in set(current)]
+    rest = [activity_id for activity_id in current if activity_id not in set(order)]
+    return [
+        UpdateOne({"wishlist_id": wishlist_id, "id": activity_id}, {"$set": {"position": position}})
+        for position, activity_id in enumerate(listed + rest)
+    ]
+
+
+async def apply_activity_documents(wishlist_id: str, user_id: str, operations: List[dict]) -> bool:
+    """
+    Apply add/update/delete/reorder operations to a wishlist's activity documents.
+    Returns False (and changes nothing) if a referenced activity does not exist.
+    """
+    required_ids = []
+    for operation in operations:
+        if operation["op"] in ("update", "delete"):
+            required_ids.append(operation["id"])
+        elif operation["op"] == "reorder":
+            required_ids.extend(operation["order"])
+    required_ids = list(dict.fromkeys(required_ids))
+    if required_ids:
+        found = await db.activities.count_documents(
+            {"wishlist_id": wishlist_id, "id": {"$in": required_ids}}
+        )
+        if found != len(required_ids):
+            return False
+
+    writes = []
+    for operation in operations:
+        op = operation["op"]
+        if op == "add":
+            activity = {**operation["activity"], "id": str(uuid.uuid4())}
+            writes.append(InsertOne(activity_document(wishlist_id, user_id, activity)))
+        elif op == "update":
+            changes = {k: v for k, v in operation["changes"].items() if v is not None}
+            if changes:
+                writes.append(UpdateOne(
+                    {"wishlist_id": wishlist_id, "id": operation["id"]},
+                    {"$set": changes}
+                ))
+        elif op == "delete":
+            writes.append(DeleteOne({"wishlist_id": wishlist_id, "id": operation["id"]}))
+        elif op == "reorder":
+            # New positions depend on the current order, so apply earlier writes first
+            if writes:
+                await db.activities.bulk_write(writes)
+            writes = await _reorder_writes(wishlist_id, operation["order"])
+        else:
+            raise ValueError(f"Unknown activity operation: {op}")
+    if writes:
+        await db.activities.bulk_write(writes)
+    return True
+
+
+async def count_activities(wishlist_id: str) -> dict:
+    """Recompute one wishlist's activity counters from its activity documents."""
+    result = await db.activities.aggregate([
+        {"$match": {"wishlist_id": wishlist_id}},
+        {"$group": {
+            "_id": None,
+            "activity_count": {"$sum": 1},
+            "completed_count": {"$sum": {"$cond": ["$is_completed", 1, 0]}},
+            "total_cost": {"$sum": "$cost"},
+        }}
+    ]).to_list(length=1)
+    if not result:
+        return {"activity_count": 0, "completed_count": 0, "total_cost": 0.0}
+    counters = result[0]
+    del counters["_id"]
+    return counters
+
+
+async def recount_all_activities() -> None:
+    """Recompute every wishlist's activity counters from the activities collection, bumping its version."""
+    await db.wishlists.update_many(
+        {},
+        with_version({"$set": {"activity_count": 0, "completed_count": 0, "total_cost": 0.0}})
+    )
+    await db.activities.aggregate([
+        {"$group": {
+            "_id": {"$toObjectId": "$wishlist_id"},
+            "activity_count": {"$sum": 1},
+            "completed_count": {"$sum": {"$cond": ["$is_completed", 1, 0]}},
+            "total_cost": {"$sum": "$cost"},
+        }},
+        {"$merge": {"into": "wishlists", "on": "_id", "whenMatched": "merge", "whenNotMatched": "discard"}},
+    ]).to_list(length=None)
+
+
+async def migrate_to_collection(batch_size: int = 500) -> int:
+    """Move embedded activity arrays into the activities collection. Returns wishlists migrated."""
+    cursor = db.wishlists.find(
+        {"activities.0": {"$exists": True}},
+        {"user_id": 1, "activities": 1}
+    ).batch_size(batch_size)
+
+    migrated = 0
+    async for wishlist in cursor:
+        wishlist_id = str(wishlist["_id"])
+        # Upsert by activity id so an interrupted run can simply be repeated
+        writes = [
+            ReplaceOne(
+                {"id": activity["id"]},
+                activity_document(wishlist_id, wishlist.get("user_id"), activity, position),
+                upsert=True
+            )
+            for position, activity in enumerate(wishlist["activities"])
+        ]
+        await db.activities.bulk_write(writes, ordered=False)
+        await db.wishlists.update_one({"_id": wishlist["_id"]}, {"$unset": {"activities": ""}})
+        migrated += 1
+    return migrated
+
+
+async def migrate_to_embedded() -> int:
+    """
+    Move the activities collection back into embedded arrays. Returns wishlists migrated.
+    Wishlists with no activity documents get an empty array, so every
+    wishlist has the field afterwards.
+    """
+    pipeline = [
+        {"$sort": {"wishlist_id": 1, "position": 1, "id": 1}},
+        {"$group": {
+            "_id": "$wishlist_id",
+            "activities": {"$push": {
+                "id": "$id",
+                "name": "$name",
+                "cost": "$cost",
+                "is_completed": "$is_completed",
+            }},
+        }},
+    ]
+
+    migrated = 0
+    async for group in db.activities.aggregate(pipeline, allowDiskUse=True):
+        await db.wishlists.update_one(
+            {"_id": ObjectId(group["_id"])},
+            {"$set": {"activities": group["activities"]}}
+        )
+        await db.activities.delete_many({"wishlist_id": group["_id"]})
+        migrated += 1
+    await db.wishlists.update_many({"activities": {"$exists": False}}, {"$set": {"activities": []}})
+    return migrated
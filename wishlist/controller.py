@@ -1,12 +1,52 @@
-import re
+import os
 import uuid
-import httpx
+import json
+import base64
+import asyncio
+from collections import Counter
 from datetime import datetime
-from typing import Optional, Tuple, List
+from typing import Optional, Tuple, List, AsyncIterator
 from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import UpdateOne, ReturnDocument
+from pymongo.errors import BulkWriteError
 from fastapi import HTTPException, status
 
 from database import db, fix_id
+from singleflight import SingleFlight
+from .resolver import is_short_url, resolve_coordinates
+from .parser import parse_coordinates
+from .geocoder import enqueue_geocode
+from .versioning import with_version, pipeline_version_stage, bump_collection_version
+from .stats import (
+    COUNTER_FIELDS,
+    activity_counters,
+    counter_expressions,
+    counters_stage,
+    status_key,
+    update_user_stats
+)
+from .activity_store import (
+    uses_activity_collection,
+    attach_activities,
+    list_activities,
+    insert_activity,
+    update_activity_document,
+    delete_activity_document,
+    delete_wishlist_activities,
+    apply_activity_documents,
+    count_activities
+)
+from .geo import make_point, geo_fields, within_bbox_query, zoom_to_precision
+from .suggest import index_wishlist, unindex_wishlist
+from .events import publish_event
+
+# Bulk import tuning: concurrent short-link resolutions and documents per insert_many
+IMPORT_CONCURRENCY = int(os.getenv("IMPORT_CONCURRENCY", 16))
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", 500))
+
+# Concurrent reads of the same place share one query; callers that join get a copy
+wishlist_flight = SingleFlight()
 
 
 async def extract_coordinates_from_url(google_maps_url: str) -> Tuple[Optional[float], Optional[float]]:
@@ -15,95 +55,554 @@ async def extract_coordinates_from_url(google_maps_url: str) -> Tuple[Optional[f
     Handles both short URLs (goo.gl/maps/...) and full URLs.
     """
     try:
-        final_url = google_maps_url
-        
-        # Follow redirects for short URLs
-        if "goo.gl" in google_maps_url or "maps.app.goo.gl" in google_maps_url:
-            async with httpx.AsyncClient(follow_redirects=True) as client:
-                response = await client.get(google_maps_url)
-                final_url = str(response.url)
-        
-        # Pattern 1: @lat,lng,zoom (most common)
-        pattern1 = r"@(-?\d+\.?\d*),(-?\d+\.?\d*)"
-        match = re.search(pattern1, final_url)
-        if match:
-            return float(match.group(1)), float(match.group(2))
-        
-        # Pattern 2: !3d{lat}!4d{lng}
-        pattern2 = r"!3d(-?\d+\.?\d*)!4d(-?\d+\.?\d*)"
-        match = re.search(pattern2, final_url)
-        if match:
-            return float(match.group(1)), float(match.group(2))
-        
-        # Pattern 3: query parameters ll=lat,lng
-        pattern3 = r"ll=(-?\d+\.?\d*),(-?\d+\.?\d*)"
-        match = re.search(pattern3, final_url)
-        if match:
-            return float(match.group(1)), float(match.group(2))
-        
-        # Pattern 4: /place/lat,lng
-        pattern4 = r"/place/(-?\d+\.?\d*),(-?\d+\.?\d*)"
-        match = re.search(pattern4, final_url)
-        if match:
-            return float(match.group(1)), float(match.group(2))
-        
-        return None, None
-        
+        return await resolve_coordinates(google_maps_url)
     except Exception as e:
         print(f"Error extracting coordinates: {e}")
         return None, None
 
 
+async def _with_activities(wishlists: List[dict], projection: Optional[dict] = None) -> List[dict]:
+    """Fill in activities from the activities collection when that storage mode is on."""
+    if uses_activity_collection() and (projection is None or "activities" in projection):
+        await attach_activities(wishlists)
+    return wishlists
+
+
 async def get_user_wishlists(user_id: str) -> List[dict]:
     """Get all wishlists for a user."""
     cursor = db.wishlists.find({"user_id": user_id})
     wishlists = []
     async for wishlist in cursor:
         wishlists.append(fix_id(wishlist))
-    return wishlists
+    return await _with_activities(wishlists)
 
 
-async def get_all_wishlists() -> List[dict]:
-    """Get all wishlists from all users."""
-    cursor = db.wishlists.find({})
-    wishlists = []
+def encode_cursor(created_at: datetime, wishlist_id: ObjectId) -> str:
+    """Encode the sort key of the last item of a page into an opaque cursor."""
+    raw = json.dumps({"c": created_at.isoformat(), "i": str(wishlist_id)})
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    """Decode a cursor produced by encode_cursor. Raises ValueError if malformed."""
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(raw["c"]), ObjectId(raw["i"])
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+async def get_wishlists_page(
+    limit: int = 50,
+    after: Optional[Tuple[datetime, ObjectId]] = None,
+    status: Optional[str] = None,
+    user_id: Optional[str] = None,
+    source_type: Optional[str] = None,
+    projection: Optional[dict] = None
+) -> dict:
+    """
+    Get one page of wishlists ordered by (created_at, _id), starting after
+    the key decode_cursor returns for the previous page's next_cursor.
+    Uses keyset pagination so the cost of a page depends only on its size.
+    """
+    query = {}
+    if status:
+        query["status"] = status
+    if user_id:
+        query["user_id"] = user_id
+    if source_type:
+        query["source_type"] = source_type
+    
+    if after:
+        created_at, last_id = after
+        query["$or"] = [
+            {"created_at": {"$gt": created_at}},
+            {"created_at": created_at, "_id": {"$gt": last_id}}
+        ]
+    
+    # The cursor is built from created_at, so a projection must include it
+    strip_created_at = projection is not None and "created_at" not in projection
+    if strip_created_at:
+        projection = {**projection, "created_at": 1}
+    
+    # Fetch one extra document to know whether another page exists. An
+    # aggregation rather than find, so expression projections such as
+    # RESPONSE_PROJECTION's $toString run on any server or stand-in
+    pipeline = [
+        {"$match": query},
+        {"$sort": {"created_at": 1, "_id": 1}},
+        {"$limit": limit + 1}
+    ]
+    if projection is not None:
+        pipeline.append({"$project": projection})
+    docs = await db.wishlists.aggregate(pipeline).to_list(length=limit + 1)
+    
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        # Projections may already have replaced _id with a string id
+        last = docs[-1]
+        last_id = last["_id"] if "_id" in last else ObjectId(last["id"])
+        next_cursor = encode_cursor(last["created_at"], last_id)
+    
+    if strip_created_at:
+        for doc in docs:
+            del doc["created_at"]
+    
+    return {
+        "items": await _with_activities([fix_id(doc) for doc in docs], projection),
+        "next_cursor": next_cursor
+    }
+
+
+async def iter_wishlists(batch_size: int = 500) -> AsyncIterator[dict]:
+    """Stream every wishlist, fetching at most batch_size documents per round trip."""
+    cursor = db.wishlists.find({}).sort("_id", 1).batch_size(batch_size)
+    batch = []
     async for wishlist in cursor:
-        wishlists.append(fix_id(wishlist))
-    return wishlists
+        batch.append(fix_id(wishlist))
+        if len(batch) >= batch_size:
+            for wishlist in await _with_activities(batch):
+                yield wishlist
+            batch = []
+    for wishlist in await _with_activities(batch):
+        yield wishlist
+
+
+async def iter_activities(batch_size: int = 500) -> AsyncIterator[dict]:
+    """Stream every activity as a flat row tagged with its wishlist and owner."""
+    if uses_activity_collection():
+        cursor = db.activities.find({}, {"_id": 0, "position": 0}).sort(
+            [("wishlist_id", 1), ("position", 1), ("id", 1)]
+        ).batch_size(batch_size)
+        async for activity in cursor:
+            yield activity
+        return
+    
+    cursor = db.wishlists.find(
+        {"activities.0": {"$exists": True}},
+        {"user_id": 1, "activities": 1}
+    ).sort("_id", 1).batch_size(batch_size)
+    async for wishlist in cursor:
+        for activity in wishlist.get("activities", []):
+            yield {
+                **activity,
+                "wishlist_id": str(wishlist["_id"]),
+                "user_id": wishlist.get("user_id")
+            }
+
+
+async def search_wishlists(
+    text: str,
+    limit: int = 20,
+    offset: int = 0,
+    status: Optional[str] = None,
+    user_id: Optional[str] = None,
+    projection: Optional[dict] = None
+) -> dict:
+    """
+    Full-text search over place names, descriptions and activity names,
+    best matches first. Returns one page and the offset of the next.
+    """
+    filters = {}
+    if status:
+        filters["status"] = status
+    if user_id:
+        filters["user_id"] = user_id
+    
+    if uses_activity_collection():
+        docs = await _search_with_activity_collection(text, filters, limit + 1, offset, projection)
+    else:
+        query = {"$text": {"$search": text}, **filters}
+        projection = {**(projection or {}), "score": {"$meta": "textScore"}}
+        docs = await db.wishlists.find(query, projection).sort(
+            [("score", {"$meta": "textScore"}), ("_id", 1)]
+        ).skip(offset).limit(limit + 1).to_list(length=limit + 1)
+    
+    next_offset = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_offset = offset + limit
+    return {
+        "items": await _with_activities([fix_id(doc) for doc in docs], projection),
+        "next_offset": next_offset
+    }
+
 
+async def _search_with_activity_collection(
+    text: str,
+    filters: dict,
+    limit: int,
+    offset: int,
+    projection: Optional[dict]
+) -> List[dict]:
+    """
+    search_wishlists for ACTIVITY_STORAGE=collection, where activity names
+    live in their own collection. Places matching by their own text and by
+    their activities are merged on the server, so every match is ranked;
+    places matching only through an activity score 0.
+    """
+    pipeline = [
+        {"$match": {"$text": {"$search": text}, **filters}},
+        {"$project": {"score": {"$meta": "textScore"}}},
+        {"$unionWith": {"coll": "activities", "pipeline": [
+            {"$match": {"$text": {"$search": text}}},
+            {"$group": {"_id": "$wishlist_id"}},
+            {"$project": {"_id": {"$toObjectId": "$_id"}, "score": {"$literal": 0}}},
+        ]}},
+        {"$group": {"_id": "$_id", "score": {"$max": "$score"}}},
+        {"$lookup": {"from": "wishlists", "localField": "_id", "foreignField": "_id", "as": "wishlist"}},
+        {"$unwind": "$wishlist"},
+        {"$match": {f"wishlist.{field}": value for field, value in filters.items()}},
+        {"$sort": {"score": -1, "_id": 1}},
+        {"$skip": offset},
+        {"$limit": limit},
+        {"$replaceRoot": {"newRoot": {"$mergeObjects": ["$wishlist", {"score": "$score"}]}}},
+    ]
+    if projection:
+        pipeline.append({"$project": {**projection, "score": 1}})
+    return await db.wishlists.aggregate(pipeline).to_list(length=limit)
+
+
+async def get_wishlists_near(
+    latitude: float,
+    longitude: float,
+    radius: float,
+    limit: int = 100,
+    projection: Optional[dict] = None
+) -> List[dict]:
+    """Get wishlists within radius metres of a point, nearest first."""
+    cursor = db.wishlists.find({
+        "location": {
+            "$nearSphere": {
+                "$geometry": make_point(latitude, longitude),
+                "$maxDistance": radius
+            }
+        }
+    }, projection).limit(limit)
+    return await _with_activities([fix_id(wishlist) async for wishlist in cursor], projection)
+
+
+async def get_wishlists_within(
+    bbox: Tuple[float, float, float, float],
+    limit: int = 500,
+    projection: Optional[dict] = None
+) -> List[dict]:
+    """Get wishlists whose location falls inside a (minLng, minLat, maxLng, maxLat) box."""
+    cursor = db.wishlists.find(within_bbox_query(bbox), projection).limit(limit)
+    return await _with_activities([fix_id(wishlist) async for wishlist in cursor], projection)
+
+
+async def get_wishlist_clusters(
+    bbox: Tuple[float, float, float, float],
+    zoom: int
+) -> dict:
+    """
+    Group wishlists inside a bounding box into geohash cells sized for the zoom level.
+    Returns one centroid and count per non-empty cell.
+    """
+    precision = zoom_to_precision(zoom)
+    pipeline = [
+        {"$match": {**within_bbox_query(bbox), "geohash": {"$exists": True}}},
+        {"$group": {
+            "_id": {"$substrCP": ["$geohash", 0, precision]},
+            "count": {"$sum": 1},
+            "latitude": {"$avg": "$latitude"},
+            "longitude": {"$avg": "$longitude"},
+            "wishlist_id": {"$first": "$_id"}
+        }},
+        {"$sort": {"_id": 1}}
+    ]
+    
+    clusters = []
+    async for cell in db.wishlists.aggregate(pipeline):
+        clusters.append({
+            "geohash": cell["_id"],
+            "count": cell["count"],
+            "latitude": cell["latitude"],
+            "longitude": cell["longitude"],
+            # Single-place cells can be rendered as a regular pin
+            "wishlist_id": str(cell["wishlist_id"]) if cell["count"] == 1 else None
+        })
+    return {"precision": precision, "clusters": clusters}
 
-async def get_wishlist_by_id(wishlist_id: str, user_id: str = None) -> Optional[dict]:
+
+async def backfill_locations(batch_size: int = 500) -> int:
+    """Add GeoJSON location and geohash to existing wishlists that only have latitude/longitude."""
+    cursor = db.wishlists.find(
+        {
+            "$or": [
+                {"location": {"$exists": False}},
+                {"geohash": {"$exists": False}}
+            ],
+            "latitude": {"$type": "number"},
+            "longitude": {"$type": "number"}
+        },
+        {"latitude": 1, "longitude": 1}
+    ).batch_size(batch_size)
+    
+    updated = 0
+    batch = []
+    async for wishlist in cursor:
+        geo = geo_fields(wishlist["latitude"], wishlist["longitude"])
+        if geo is None:
+            # Out of range; a 2dsphere index would reject the point
+            print(f"Skipping wishlist {wishlist['_id']} with invalid coordinates")
+            continue
+        batch.append(UpdateOne({"_id": wishlist["_id"]}, {"$set": geo}))
+        if len(batch) >= batch_size:
+            result = await db.wishlists.bulk_write(batch, ordered=False)
+            updated += result.modified_count
+            batch = []
+    if batch:
+        result = await db.wishlists.bulk_write(batch, ordered=False)
+        updated += result.modified_count
+    return updated
+
+
+def build_projection(fields: List[str]) -> dict:
+    """
+    Build a find() projection for a sparse fieldset.
+    Activity counters are computed server-side.
+    """
+    counters = counter_expressions()
+    projection = {}
+    for field in fields:
+        if field == "id":
+            continue  # _id is always returned
+        elif field in counters:
+            projection[field] = counters[field]
+        else:
+            projection[field] = 1
+    return projection
+
+
+async def get_wishlist_by_id(
+    wishlist_id: str,
+    user_id: str = None,
+    projection: Optional[dict] = None
+) -> Optional[dict]:
     """Get a specific wishlist by ID. If user_id is provided, ensures it belongs to the user."""
     try:
         query = {"_id": ObjectId(wishlist_id)}
         if user_id:
             query["user_id"] = user_id
-        wishlist = await db.wishlists.find_one(query)
-        return fix_id(wishlist) if wishlist else None
+        key = (wishlist_id, user_id, repr(projection))
+        return await wishlist_flight.do(key, _find_wishlist, query, projection)
     except Exception:
         return None
 
 
-async def create_wishlist(wishlist_data: dict, user_id: str) -> dict:
-    """Create a new wishlist place."""
+async def _find_wishlist(query: dict, projection: Optional[dict]) -> Optional[dict]:
+    """Fetch one wishlist for get_wishlist_by_id."""
+    wishlist = await db.wishlists.find_one(query, projection)
+    if not wishlist:
+        return None
+    wishlist = fix_id(wishlist)
+    await _with_activities([wishlist], projection)
+    return wishlist
+
+
+def encode_activity_cursor(key: dict) -> str:
+    """Encode the position of the last activity of a page into an opaque cursor."""
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def decode_activity_cursor(cursor: str) -> dict:
+    """Decode a cursor produced by encode_activity_cursor. Raises ValueError if malformed."""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(key, dict):
+        raise ValueError("Invalid cursor")
+    return key
+
+
+async def get_activities_page(
+    wishlist_id: str,
+    limit: int = 50,
+    cursor: Optional[str] = None
+) -> Optional[dict]:
+    """
+    Get one page of a wishlist's activities in itinerary order.
+    Returns None if the wishlist does not exist. Raises ValueError for a bad cursor.
+    """
+    key = decode_activity_cursor(cursor) if cursor else {}
+    try:
+        object_id = ObjectId(wishlist_id)
+    except Exception:
+        return None
+    
+    if uses_activity_collection():
+        after = None
+        if key:
+            if not isinstance(key.get("p"), int) or not isinstance(key.get("i"), str):
+                raise ValueError("Invalid cursor")
+            after = (key["p"], key["i"])
+        if await db.wishlists.find_one({"_id": object_id}, {"_id": 1}) is None:
+            return None
+        items = await list_activities(wishlist_id, limit + 1, after)
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            next_cursor = encode_activity_cursor({"p": items[-1]["position"], "i": items[-1]["id"]})
+        for item in items:
+            del item["position"]
+        return {"items": items, "next_cursor": next_cursor}
+    
+    # Embedded arrays are paged by offset with a $slice projection
+    offset = key.get("o", 0)
+    if not isinstance(offset, int) or offset < 0:
+        raise ValueError("Invalid cursor")
+    wishlist = await db.wishlists.find_one(
+        {"_id": object_id},
+        {"_id": 1, "activities": {"$slice": [offset, limit + 1]}}
+    )
+    if wishlist is None:
+        return None
+    items = wishlist.get("activities", [])
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_activity_cursor({"o": offset + limit})
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def _url_coordinate_fields(
+    google_maps_url: str,
+    resolved: Optional[Tuple[Optional[float], Optional[float]]] = None
+) -> dict:
+    """
+    Coordinate fields for a Google Maps URL.
+    Full URLs are parsed inline; short links are left pending for the background
+    geocoder unless the caller already resolved them.
+    """
+    if resolved is not None:
+        lat, lng = resolved
+    elif is_short_url(google_maps_url):
+        return {
+            "latitude": None,
+            "longitude": None,
+            "geocode_status": "pending",
+            "geocode_attempts": 0
+        }
+    else:
+        lat, lng = parse_coordinates(google_maps_url)
+    return {
+        "latitude": lat,
+        "longitude": lng,
+        "geocode_status": "resolved" if lat is not None else "failed",
+        "geocode_attempts": 0
+    }
+
+
+def _prepare_wishlist_document(
+    wishlist_data: dict,
+    user_id: str,
+    resolved: Optional[Tuple[Optional[float], Optional[float]]] = None
+) -> dict:
+    """Fill in the derived and bookkeeping fields of a new wishlist document."""
     # Determine source type and extract coordinates if needed
     if wishlist_data.get("google_maps_url"):
-        lat, lng = await extract_coordinates_from_url(wishlist_data["google_maps_url"])
-        wishlist_data["latitude"] = lat
-        wishlist_data["longitude"] = lng
+        wishlist_data.update(_url_coordinate_fields(wishlist_data["google_maps_url"], resolved))
         wishlist_data["source_type"] = "google_map"
     else:
         wishlist_data["source_type"] = "manual"
     
+    # Store a GeoJSON point and geohash alongside the raw floats for map queries
+    geo = geo_fields(wishlist_data.get("latitude"), wishlist_data.get("longitude"))
+    if geo:
+        wishlist_data.update(geo)
+    
     # Prepare document
     wishlist_data["user_id"] = user_id
-    wishlist_data["activities"] = []
+    if not uses_activity_collection():
+        wishlist_data["activities"] = []
+    wishlist_data["activity_count"] = 0
+    wishlist_data["completed_count"] = 0
+    wishlist_data["total_cost"] = 0.0
     wishlist_data["created_at"] = datetime.utcnow()
+    wishlist_data["updated_at"] = wishlist_data["created_at"]
+    wishlist_data["version"] = 1
+    return wishlist_data
+
+
+async def _record_write(user_id: str, **stats) -> None:
+    """
+    Bump the collection version and apply the owner's stats change after a
+    wishlist write. The two are independent, so they share one round trip.
+    """
+    await asyncio.gather(bump_collection_version(), update_user_stats(user_id, **stats))
+
+
+async def create_wishlist(wishlist_data: dict, user_id: str) -> dict:
+    """Create a new wishlist place."""
+    wishlist_data = _prepare_wishlist_document(wishlist_data, user_id)
     
     # Insert into database
     result = await db.wishlists.insert_one(wishlist_data)
-    created = await db.wishlists.find_one({"_id": result.inserted_id})
-    return fix_id(created)
+    index_wishlist(str(result.inserted_id), wishlist_data.get("name"))
+    await _record_write(user_id, wishlists=1, statuses={status_key(wishlist_data.get("status")): 1})
+    publish_event("created", str(result.inserted_id), user_id, 1)
+    if wishlist_data.get("geocode_status") == "pending":
+        enqueue_geocode(str(result.inserted_id), wishlist_data["google_maps_url"])
+    # insert_one filled in _id, so the document is the response as-is
+    return fix_id(wishlist_data)
+
+
+async def import_wishlists(items: List[dict], user_id: str) -> List[dict]:
+    """
+    Create many wishlist places at once.
+    
+    Short links are resolved concurrently (at most IMPORT_CONCURRENCY at a time)
+    and documents are written with insert_many in chunks. Returns one
+    {"id", "error"} result per item, in input order.
+    """
+    semaphore = asyncio.Semaphore(IMPORT_CONCURRENCY)
+    
+    async def resolve(item: dict):
+        url = item.get("google_maps_url")
+        if not url or not is_short_url(url):
+            return None
+        async with semaphore:
+            try:
+                return await resolve_coordinates(url)
+            except Exception as e:
+                # Leave it pending; the background geocoder retries it
+                print(f"Error resolving {url} during import: {e}")
+                return None
+    
+    resolved = await asyncio.gather(*(resolve(item) for item in items))
+    docs = [
+        _prepare_wishlist_document(item, user_id, coordinates)
+        for item, coordinates in zip(items, resolved)
+    ]
+    
+    results = [{"id": None, "error": None} for _ in docs]
+    created = Counter()  # Inserted places by status, for the user summary
+    for start in range(0, len(docs), IMPORT_CHUNK_SIZE):
+        chunk = docs[start:start + IMPORT_CHUNK_SIZE]
+        failed = {}
+        try:
+            await db.wishlists.insert_many(chunk, ordered=False)
+        except BulkWriteError as e:
+            failed = {err["index"]: err.get("errmsg", "Write failed") for err in e.details["writeErrors"]}
+        
+        for offset, doc in enumerate(chunk):
+            if offset in failed:
+                results[start + offset]["error"] = failed[offset]
+                continue
+            results[start + offset]["id"] = str(doc["_id"])
+            created[status_key(doc.get("status"))] += 1
+            index_wishlist(str(doc["_id"]), doc.get("name"))
+            publish_event("created", str(doc["_id"]), user_id, 1)
+            if doc.get("geocode_status") == "pending":
+                enqueue_geocode(str(doc["_id"]), doc["google_maps_url"])
+    
+    if created:
+        await _record_write(user_id, wishlists=sum(created.values()), statuses=created)
+    return results
 
 
 async def update_wishlist(wishlist_id: str, user_id: str, update_data: dict) -> Optional[dict]:
@@ -116,19 +615,52 @@ async def update_wishlist(wishlist_id: str, user_id: str, update_data: dict) ->
     
     # If updating Google Maps URL, re-extract coordinates
     if "google_maps_url" in update_data and update_data["google_maps_url"]:
-        lat, lng = await extract_coordinates_from_url(update_data["google_maps_url"])
-        update_data["latitude"] = lat
-        update_data["longitude"] = lng
+        update_data.update(_url_coordinate_fields(update_data["google_maps_url"]))
         update_data["source_type"] = "google_map"
     
     try:
-        result = await db.wishlists.update_one(
+        update = {"$set": update_data}
+        
+        # Keep the GeoJSON location and geohash in sync with latitude/longitude
+        if "latitude" in update_data or "longitude" in update_data:
+            latitude = update_data.get("latitude")
+            longitude = update_data.get("longitude")
+            if "latitude" not in update_data or "longitude" not in update_data:
+                current = await db.wishlists.find_one(
+                    {"_id": ObjectId(wishlist_id), "user_id": user_id},
+                    {"latitude": 1, "longitude": 1}
+                )
+                if current is None:
+                    return None
+                latitude = update_data.get("latitude", current.get("latitude"))
+                longitude = update_data.get("longitude", current.get("longitude"))
+            geo = geo_fields(latitude, longitude)
+            if geo:
+                update_data.update(geo)
+            else:
+                update["$unset"] = {"location": "", "geohash": ""}
+        
+        update = with_version(update)
+        # The old status is needed for the user summary, so take the document
+        # from before the update and apply the same $set/$unset/$inc to it
+        before = await db.wishlists.find_one_and_update(
             {"_id": ObjectId(wishlist_id), "user_id": user_id},
-            {"$set": update_data}
+            update,
+            return_document=ReturnDocument.BEFORE
         )
-        if result.matched_count == 0:
+        if before is None:
             return None
-        return await get_wishlist_by_id(wishlist_id, user_id)
+        updated = {**before, **update["$set"], "version": before.get("version", 0) + 1}
+        for field in update.get("$unset", {}):
+            updated.pop(field, None)
+        if "name" in update_data:
+            index_wishlist(wishlist_id, updated.get("name"))
+        old_status, new_status = status_key(before.get("status")), status_key(updated.get("status"))
+        await _record_write(user_id, statuses={old_status: -1, new_status: 1} if old_status != new_status else None)
+        publish_event("updated", wishlist_id, user_id, updated.get("version"))
+        if update_data.get("geocode_status") == "pending":
+            enqueue_geocode(wishlist_id, update_data["google_maps_url"])
+        return (await _with_activities([fix_id(updated)]))[0]
     except Exception:
         return None
 
@@ -136,28 +668,190 @@ async def update_wishlist(wishlist_id: str, user_id: str, update_data: dict) ->
 async def delete_wishlist(wishlist_id: str, user_id: str) -> bool:
     """Delete a wishlist."""
     try:
-        result = await db.wishlists.delete_one({
-            "_id": ObjectId(wishlist_id),
-            "user_id": user_id
-        })
-        return result.deleted_count > 0
+        deleted = await db.wishlists.find_one_and_delete(
+            {"_id": ObjectId(wishlist_id), "user_id": user_id},
+            projection={"status": 1, **{field: 1 for field in COUNTER_FIELDS}}
+        )
+        if deleted is None:
+            return False
+        unindex_wishlist(wishlist_id)
+        if uses_activity_collection():
+            await delete_wishlist_activities(wishlist_id)
+        await _record_write(
+            user_id,
+            wishlists=-1,
+            statuses={status_key(deleted.get("status")): -1},
+            counters={field: -deleted.get(field, 0) for field in COUNTER_FIELDS}
+        )
+        publish_event("deleted", wishlist_id, user_id)
+        return True
     except Exception:
         return False
 
 
+# Stored fields of an activity besides its id, rewritten by update operations
+ACTIVITY_FIELDS = ("name", "cost", "is_completed")
+
+
+def _with_new_ids(operations: List[dict]) -> List[dict]:
+    """Copy activity operations, giving each added activity its id."""
+    return [
+        {**operation, "activity": {**operation["activity"], "id": str(uuid.uuid4())}}
+        if operation["op"] == "add" else operation
+        for operation in operations
+    ]
+
+
+def _activity_stages(operations: List[dict]) -> Tuple[List[dict], List[str]]:
+    """
+    Build pipeline-update stages that apply activity operations (ids assigned
+    by _with_new_ids) in order, one
+    $set of the activities array per operation, so the update stays equally
+    shallow however long the batch is. Every value from the request is
+    wrapped in $literal, so ids such as "$$a.id" are compared as strings.
+    Returns the stages and the IDs of existing activities the operations require.
+    """
+    stages = [{"$set": {"activities": {"$ifNull": ["$activities", []]}}}]
+    required_ids = []
+    
+    def rewrite(expr: dict) -> None:
+        stages.append({"$set": {"activities": expr}})
+    
+    def is_activity(activity_id: str) -> dict:
+        return {"$eq": ["$$a.id", {"$literal": activity_id}]}
+    
+    def is_other_activity(activity_id: str) -> dict:
+        return {"$ne": ["$$a.id", {"$literal": activity_id}]}
+    
+    for operation in operations:
+        op = operation["op"]
+        if op == "add":
+            rewrite({"$concatArrays": ["$activities", {"$literal": [operation["activity"]]}]})
+        elif op == "update":
+            changes = {k: v for k, v in operation["changes"].items() if v is not None}
+            required_ids.append(operation["id"])
+            if changes:
+                updated = {"id": "$$a.id"}
+                for field in ACTIVITY_FIELDS:
+                    updated[field] = {"$literal": changes[field]} if field in changes else f"$$a.{field}"
+                rewrite({"$map": {
+                    "input": "$activities",
+                    "as": "a",
+                    "in": {"$cond": [is_activity(operation["id"]), updated, "$$a"]}
+                }})
+        elif op == "delete":
+            required_ids.append(operation["id"])
+            rewrite({"$filter": {"input": "$activities", "as": "a", "cond": is_other_activity(operation["id"])}})
+        elif op == "reorder":
+            # One $filter per listed id, so a repeated id would duplicate its activity
+            order = list(dict.fromkeys(operation["order"]))
+            required_ids.extend(order)
+            # Listed activities first in the given order, then the rest as they were
+            listed = [
+                {"$filter": {"input": "$activities", "as": "a", "cond": is_activity(activity_id)}}
+                for activity_id in order
+            ]
+            rest = {"$filter": {
+                "input": "$activities",
+                "as": "a",
+                "cond": {"$and": [is_other_activity(activity_id) for activity_id in order]}
+            }}
+            rewrite({"$concatArrays": listed + [rest]})
+        else:
+            raise ValueError(f"Unknown activity operation: {op}")
+    
+    return stages, list(dict.fromkeys(required_ids))
+
+
+def _fold_activities(activities: List[dict], operations: List[dict]) -> List[dict]:
+    """
+    Apply activity operations to an activities array in Python, exactly as
+    the stages from _activity_stages do on the server. Lets the updated
+    wishlist be rebuilt from the document an update returns from before it.
+    """
+    for operation in operations:
+        op = operation["op"]
+        if op == "add":
+            activities = activities + [operation["activity"]]
+        elif op == "update":
+            changes = {k: v for k, v in operation["changes"].items() if v is not None}
+            if changes:
+                activities = [
+                    {"id": a.get("id"), **{f: changes.get(f, a.get(f)) for f in ACTIVITY_FIELDS if f in changes or f in a}}
+                    if a.get("id") == operation["id"] else a
+                    for a in activities
+                ]
+        elif op == "delete":
+            activities = [a for a in activities if a.get("id") != operation["id"]]
+        elif op == "reorder":
+            order = list(dict.fromkeys(operation["order"]))
+            listed = [a for activity_id in order for a in activities if a.get("id") == activity_id]
+            activities = listed + [a for a in activities if a.get("id") not in order]
+    return activities
+
+
+def _after_update(before: dict, changes: dict) -> Tuple[dict, dict]:
+    """
+    Rebuild a wishlist as an update left it, from the document before the
+    update and the fields it set. Returns it and the change in its counters.
+    """
+    updated = {**before, **changes, "version": before.get("version", 0) + 1}
+    delta = {field: updated.get(field, 0) - before.get(field, 0) for field in COUNTER_FIELDS}
+    return updated, delta
+
+
+async def _update_embedded_activities(query: dict, operations: List[dict]) -> Tuple[Optional[dict], dict]:
+    """
+    Apply activity operations to an embedded activities array and recount,
+    in one pipeline update. Returns the updated wishlist (None if the query
+    matched nothing) and the change in its counters.
+    """
+    stages, _ = _activity_stages(operations)
+    version_stage = pipeline_version_stage()
+    before = await db.wishlists.find_one_and_update(
+        query,
+        [*stages, counters_stage(), version_stage],
+        return_document=ReturnDocument.BEFORE
+    )
+    if before is None:
+        return None, {}
+    activities = _fold_activities(before.get("activities") or [], operations)
+    return _after_update(before, {
+        "activities": activities,
+        **activity_counters(activities),
+        "updated_at": version_stage["$set"]["updated_at"]
+    })
+
+
 async def add_activity(wishlist_id: str, user_id: str, activity_data: dict) -> Optional[dict]:
     """Add an activity to a wishlist."""
     # Generate unique ID for the activity
     activity_data["id"] = str(uuid.uuid4())
     
+    update = {
+        "$inc": {
+            "activity_count": 1,
+            "completed_count": 1 if activity_data.get("is_completed") else 0,
+            "total_cost": activity_data.get("cost", 0)
+        }
+    }
+    if not uses_activity_collection():
+        update["$push"] = {"activities": activity_data}
+    
     try:
-        result = await db.wishlists.update_one(
+        updated = await db.wishlists.find_one_and_update(
             {"_id": ObjectId(wishlist_id), "user_id": user_id},
-            {"$push": {"activities": activity_data}}
+            with_version(update),
+            return_document=ReturnDocument.AFTER
         )
-        if result.matched_count == 0:
+        if updated is None:
             return None
-        return await get_wishlist_by_id(wishlist_id, user_id)
+        if uses_activity_collection():
+            # Stored only once the update above proved the wishlist is the user's
+            await insert_activity(wishlist_id, user_id, activity_data)
+        await _record_write(user_id, counters=update["$inc"])
+        publish_event("activity", wishlist_id, user_id, updated.get("version"))
+        return (await _with_activities([fix_id(updated)]))[0]
     except Exception:
         return None
 
@@ -175,34 +869,105 @@ async def update_activity(
     if not update_data:
         return await get_wishlist_by_id(wishlist_id, user_id)
     
-    # Build update query for nested array
-    set_fields = {f"activities.$.{k}": v for k, v in update_data.items()}
-    
+    # A malformed id matches no wishlist; other errors are real failures and propagate
     try:
-        result = await db.wishlists.update_one(
-            {
-                "_id": ObjectId(wishlist_id),
-                "user_id": user_id,
-                "activities.id": activity_id
-            },
-            {"$set": set_fields}
-        )
-        if result.matched_count == 0:
+        object_id = ObjectId(wishlist_id)
+    except InvalidId:
+        return None
+    
+    if uses_activity_collection():
+        # Update the activity document, then apply its counter delta to the wishlist
+        delta = await update_activity_document(wishlist_id, user_id, activity_id, update_data)
+        if delta is None:
             return None
-        return await get_wishlist_by_id(wishlist_id, user_id)
-    except Exception:
+        updated = await db.wishlists.find_one_and_update(
+            {"_id": object_id, "user_id": user_id},
+            with_version({"$inc": delta}),
+            return_document=ReturnDocument.AFTER
+        )
+    else:
+        # Rewrite the activity and its wishlist's counters in one pipeline update
+        updated, delta = await _update_embedded_activities(
+            {"_id": object_id, "user_id": user_id, "activities.id": activity_id},
+            [{"op": "update", "id": activity_id, "changes": update_data}]
+        )
+    if updated is None:
         return None
+    await _record_write(user_id, counters=delta)
+    publish_event("activity", wishlist_id, user_id, updated.get("version"))
+    return (await _with_activities([fix_id(updated)]))[0]
 
 
 async def delete_activity(wishlist_id: str, user_id: str, activity_id: str) -> Optional[dict]:
     """Delete an activity from a wishlist."""
+    # A malformed id matches no wishlist; other errors are real failures and propagate
     try:
-        result = await db.wishlists.update_one(
-            {"_id": ObjectId(wishlist_id), "user_id": user_id},
-            {"$pull": {"activities": {"id": activity_id}}}
+        object_id = ObjectId(wishlist_id)
+    except InvalidId:
+        return None
+    
+    if uses_activity_collection():
+        delta = await delete_activity_document(wishlist_id, user_id, activity_id)
+        updated = await db.wishlists.find_one_and_update(
+            {"_id": object_id, "user_id": user_id},
+            with_version({"$inc": delta}),
+            return_document=ReturnDocument.AFTER
+        )
+    else:
+        # Drop the activity and recount in one pipeline update; only a
+        # wishlist that has the activity matches, so a bad id changes nothing
+        updated, delta = await _update_embedded_activities(
+            {"_id": object_id, "user_id": user_id, "activities.id": activity_id},
+            [{"op": "delete", "id": activity_id}]
         )
-        if result.matched_count == 0:
+    if updated is None:
+        return None
+    await _record_write(user_id, counters=delta)
+    publish_event("activity", wishlist_id, user_id, updated.get("version"))
+    return (await _with_activities([fix_id(updated)]))[0]
+
+
+async def apply_activity_operations(
+    wishlist_id: str,
+    user_id: str,
+    operations: List[dict]
+) -> Optional[dict]:
+    """
+    Apply a batch of add/update/delete/reorder activity operations atomically.
+    
+    All operations become stages of one pipeline update, so the batch costs a
+    single round trip. Returns None (and changes nothing) if the wishlist or
+    any referenced activity does not exist.
+    
+    With ACTIVITY_STORAGE=collection the operations become bulk writes on the
+    activities collection followed by a recount; references are still checked
+    up front, but the batch is no longer applied as a single atomic write.
+    """
+    # A malformed id matches no wishlist; other errors are real failures and propagate
+    try:
+        object_id = ObjectId(wishlist_id)
+    except InvalidId:
+        return None
+    
+    query = {"_id": object_id, "user_id": user_id}
+    if uses_activity_collection():
+        if await db.wishlists.find_one(query, {"_id": 1}) is None:
             return None
-        return await get_wishlist_by_id(wishlist_id, user_id)
-    except Exception:
+        if not await apply_activity_documents(wishlist_id, user_id, operations):
+            return None
+        update = with_version({"$set": await count_activities(wishlist_id)})
+        before = await db.wishlists.find_one_and_update(query, update, return_document=ReturnDocument.BEFORE)
+        if before is None:
+            return None
+        updated, delta = _after_update(before, update["$set"])
+    else:
+        operations = _with_new_ids(operations)
+        _, required_ids = _activity_stages(operations)
+        if required_ids:
+            query["activities.id"] = {"$all": required_ids}
+        updated, delta = await _update_embedded_activities(query, operations)
+    if updated is None:
         return None
+    await _record_write(user_id, counters=delta)
+    publish_event("activity", wishlist_id, user_id, updated.get("version"))
+    return (await _with_activities([fix_id(updated)]))[0]
@@ -0,0 +1,206 @@
+import os
+import json
+import asyncio
+from itertools import count
+from typing import AsyncIterator, Optional, Set
+
+from pymongo.errors import OperationFailure
+
+from database import db
+from metrics import Gauge
+
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", 256))
+EVENTS_MAX_SUBSCRIBERS = int(os.getenv("EVENTS_MAX_SUBSCRIBERS", 1000))
+EVENTS_HEARTBEAT_SECONDS = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", 15))
+EVENTS_RETRY_SECONDS = 5
+
+# Server error code when a change stream's resume point has aged out of the oplog
+CHANGE_STREAM_HISTORY_LOST = 286
+
+_CHANGE_PIPELINE = [
+    {"$match": {"operationType": {"$in": ["insert", "update", "replace", "delete"]}}},
+    {"$project": {
+        "operationType": 1,
+        "documentKey": 1,
+        "fullDocument.user_id": 1,
+        "fullDocument.version": 1,
+        "updateDescription.updatedFields": 1,
+    }},
+]
+
+
+class Subscriber:
+    """One connected client with a bounded queue of pending events."""
+
+    def __init__(self):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=EVENTS_QUEUE_SIZE)
+
+    def push(self, event: Optional[dict]) -> None:
+        """
+        Queue an event without waiting. A client too slow to keep up has its
+        backlog replaced by a single reset (None), telling it to refetch.
+        """
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+
+_subscribers: Set[Subscriber] = set()
+_event_ids = count(1)
+_watch_task: Optional[asyncio.Task] = None
+# "local" until a change stream is open; then mutators stop publishing themselves
+_source = "local"
+
+
+def subscriber_count() -> int:
+    """Number of connected event stream clients."""
+    return len(_subscribers)
+
+
+Gauge(
+    "wishlist_event_subscribers",
+    "Clients connected to /wishlist/events"
+).set_function(subscriber_count)
+
+
+def _broadcast(event: Optional[dict]) -> None:
+    if event is not None:
+        event = {"id": next(_event_ids), **event}
+    for subscriber in list(_subscribers):
+        subscriber.push(event)
+
+
+def publish_event(
+    event_type: str,
+    wishlist_id: str,
+    user_id: Optional[str] = None,
+    version: Optional[int] = None
+) -> None:
+    """
+    Announce a wishlist change to connected clients. Called by the mutators;
+    ignored while a change stream is delivering the same changes.
+    """
+    if _source != "local" or not _subscribers:
+        return
+    _broadcast({"type": event_type, "wishlist_id": wishlist_id, "user_id": user_id, "version": version})
+
+
+def _event_from_change(change: dict) -> dict:
+    """Translate a change stream document into a client event."""
+    operation = change["operationType"]
+    document = change.get("fullDocument") or {}
+    updated_fields = (change.get("updateDescription") or {}).get("updatedFields") or {}
+    if operation == "insert":
+        event_type = "created"
+    elif operation == "delete":
+        event_type = "deleted"
+    elif any(field.startswith("activit") for field in updated_fields):
+        # activities array, its elements, or the activity counters
+        event_type = "activity"
+    else:
+        event_type = "updated"
+    return {
+        "type": event_type,
+        "wishlist_id": str(change["documentKey"]["_id"]),
+        "user_id": document.get("user_id"),
+        "version": updated_fields.get("version", document.get("version")),
+    }
+
+
+async def _watch_changes() -> None:
+    """Relay wishlist change stream events; fall back to local publishing if unsupported."""
+    global _source
+    resume_token = None
+    while True:
+        try:
+            # Update events only carry the changed fields; look the document up
+            # so they name its owner too. Deletes cannot, since it is gone.
+            async with db.wishlists.watch(
+                _CHANGE_PIPELINE,
+                full_document="updateLookup",
+                resume_after=resume_token
+            ) as stream:
+                # The token of the opening batch marks where the stream started,
+                # so an error before the first change resumes from there, not from now
+                resume_token = stream.resume_token or resume_token
+                if _source != "change_stream":
+                    _source = "change_stream"
+                    print("📡 Live events: using MongoDB change streams")
+                while stream.alive:
+                    change = await stream.try_next()
+                    # Advances on empty batches too, keeping the resume point recent
+                    resume_token = stream.resume_token or resume_token
+                    if change is not None:
+                        _broadcast(_event_from_change(change))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if _source != "change_stream":
+                # Standalone servers have no change streams
+                print(f"📡 Live events: change streams unavailable ({e}), using in-process events")
+                return
+            if isinstance(e, OperationFailure) and e.code == CHANGE_STREAM_HISTORY_LOST:
+                # Changes were missed; tell clients to refetch and start from now
+                resume_token = None
+                _broadcast(None)
+            print(f"Error in wishlist change stream: {e}")
+            await asyncio.sleep(EVENTS_RETRY_SECONDS)
+
+
+def start_event_feed() -> None:
+    """Start relaying change stream events. Called on application startup."""
+    global _watch_task
+    if _watch_task is None:
+        _watch_task = asyncio.create_task(_watch_changes())
+
+
+async def stop_event_feed() -> None:
+    """Stop the change stream relay and release subscribers. Called on application shutdown."""
+    global _watch_task, _source
+    if _watch_task is not None:
+        _watch_task.cancel()
+        await asyncio.gather(_watch_task, return_exceptions=True)
+        _watch_task = None
+    _source = "local"
+    _broadcast(None)
+
+
+def _format(event_type: str, data: dict, event_id: Optional[int] = None) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event_type}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def event_stream(is_disconnected) -> AsyncIterator[str]:
+    """
+    Server-Sent Events for one client until it disconnects or falls behind.
+    Sends a comment line as heartbeat when idle, and a reset event before
+    closing a client whose queue overflowed.
+    """
+    subscriber = Subscriber()
+    _subscribers.add(subscriber)
+    try:
+        yield f"retry: {EVENTS_RETRY_SECONDS * 1000}\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(subscriber.queue.get(), EVENTS_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                if await is_disconnected():
+                    break
+                yield ": heartbeat\n\n"
+                continue
+            if event is None:
+                yield _format("reset", {})
+                break
+            event = dict(event)
+            event_id = event.pop("id")
+            event_type = event.pop("type")
+            yield _format(event_type, event, event_id)
+    finally:
+        _subscribers.discard(subscriber)
@@ -0,0 +1,20 @@
+import zlib
+from typing import AsyncIterator
+
+from .serialization import dumps
+
+
+async def ndjson_lines(docs: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    """Serialize documents into newline-delimited JSON, one line per document."""
+    async for doc in docs:
+        yield dumps(doc) + b"\n"
+
+
+async def gzip_chunks(chunks: AsyncIterator[bytes], level: int = 6) -> AsyncIterator[bytes]:
+    """Compress a stream of byte chunks into a single gzip stream on the fly."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -0,0 +1,157 @@
+import math
+from typing import Optional, Tuple, List
+
+GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# Precision stored on every document; clusters group on a prefix of it
+GEOHASH_PRECISION = 9
+
+
+def valid_coordinates(latitude: Optional[float], longitude: Optional[float]) -> bool:
+    """Whether latitude/longitude are both present and on the globe."""
+    return (
+        latitude is not None and longitude is not None
+        and -90 <= latitude <= 90 and -180 <= longitude <= 180
+    )
+
+
+def make_point(latitude: Optional[float], longitude: Optional[float]) -> Optional[dict]:
+    """
+    Build a GeoJSON Point from latitude/longitude, or None if either is
+    missing or out of range (a 2dsphere index rejects such points).
+    """
+    if not valid_coordinates(latitude, longitude):
+        return None
+    # GeoJSON stores coordinates as [longitude, latitude]
+    return {"type": "Point", "coordinates": [longitude, latitude]}
+
+
+def encode_geohash(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    """Encode a coordinate as a geohash string of the given length."""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True  # Geohash interleaves bits starting with longitude
+    
+    while len(chars) < precision:
+        rng, value = (lng_range, longitude) if even else (lat_range, latitude)
+        mid = (rng[0] + rng[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(chars)
+
+
+def geo_fields(latitude: Optional[float], longitude: Optional[float]) -> Optional[dict]:
+    """Derived geospatial fields stored on a wishlist, or None if coordinates are missing or invalid."""
+    location = make_point(latitude, longitude)
+    if location is None:
+        return None
+    return {"location": location, "geohash": encode_geohash(latitude, longitude)}
+
+
+def zoom_to_precision(zoom: int) -> int:
+    """Map a web map zoom level (0-22) to the geohash prefix length used for clustering."""
+    # Roughly one geohash cell per few hundred screen pixels at each zoom
+    thresholds = [(3, 1), (5, 2), (8, 3), (10, 4), (13, 5), (15, 6), (17, 7)]
+    for max_zoom, precision in thresholds:
+        if zoom < max_zoom:
+            return precision
+    return 8
+
+
+def parse_bbox(bbox: str) -> Tuple[float, float, float, float]:
+    """
+    Parse a "minLng,minLat,maxLng,maxLat" bounding box string. A minLng
+    greater than maxLng means the box crosses the antimeridian.
+    Raises ValueError if the string is malformed or out of range.
+    """
+    try:
+        min_lng, min_lat, max_lng, max_lat = (float(part) for part in bbox.split(","))
+    except ValueError:
+        raise ValueError("bbox must be minLng,minLat,maxLng,maxLat")
+    
+    if not (-180 <= min_lng <= 180 and -180 <= max_lng <= 180) or min_lng == max_lng:
+        raise ValueError("bbox longitude must be between -180 and 180 with minLng != maxLng")
+    if not -90 <= min_lat < max_lat <= 90:
+        raise ValueError("bbox latitude must be between -90 and 90 with minLat < maxLat")
+    return min_lng, min_lat, max_lng, max_lat
+
+
+def split_antimeridian(
+    min_lng: float, min_lat: float, max_lng: float, max_lat: float
+) -> List[Tuple[float, float, float, float]]:
+    """Split a box that crosses the antimeridian (minLng > maxLng) into two that do not."""
+    if min_lng < max_lng:
+        return [(min_lng, min_lat, max_lng, max_lat)]
+    return [(min_lng, min_lat, 180.0, max_lat), (-180.0, min_lat, max_lng, max_lat)]
+
+
+def _geodesic_edge_latitude(latitude: float, width: float) -> float:
+    """
+    Latitude at which a geodesic edge spanning width degrees of longitude
+    touches the given latitude at its midpoint. Geodesics between points
+    of equal latitude bow towards the pole, so this is nearer the equator.
+    """
+    half_width = math.radians(width / 2)
+    return math.degrees(math.atan(math.tan(math.radians(latitude)) * math.cos(half_width)))
+
+
+def bbox_polygons(min_lng: float, min_lat: float, max_lng: float, max_lat: float) -> List[dict]:
+    """
+    Build closed GeoJSON Polygons covering the bounding box.
+    
+    MongoDB always picks the smaller of the two regions a polygon ring
+    describes, so boxes 180 degrees wide or more are split in two. Polygon
+    edges are geodesics, so the pole-side edge is moved towards the equator
+    until it no longer cuts into the box; the polygons then cover at least
+    the box, and within_bbox_query trims them back to it.
+    """
+    if max_lng - min_lng >= 180:
+        mid_lng = (min_lng + max_lng) / 2
+        return (
+            bbox_polygons(min_lng, min_lat, mid_lng, max_lat)
+            + bbox_polygons(mid_lng, min_lat, max_lng, max_lat)
+        )
+    
+    width = max_lng - min_lng
+    south = min(min_lat, _geodesic_edge_latitude(min_lat, width))
+    north = max(max_lat, _geodesic_edge_latitude(max_lat, width))
+    ring = [
+        [min_lng, south],
+        [max_lng, south],
+        [max_lng, north],
+        [min_lng, north],
+        [min_lng, south],
+    ]
+    return [{"type": "Polygon", "coordinates": [ring]}]
+
+
+def within_bbox_query(bbox: Tuple[float, float, float, float]) -> dict:
+    """
+    Build a filter for wishlists inside a latitude/longitude rectangle.
+    $geoWithin narrows the search with the 2dsphere index; the range
+    conditions on latitude/longitude then keep exactly the rectangle.
+    """
+    clauses = []
+    for min_lng, min_lat, max_lng, max_lat in split_antimeridian(*bbox):
+        clauses.extend(
+            {
+                "location": {"$geoWithin": {"$geometry": polygon}},
+                "latitude": {"$gte": min_lat, "$lte": max_lat},
+                "longitude": {"$gte": min_lng, "$lte": max_lng}
+            }
+            for polygon in bbox_polygons(min_lng, min_lat, max_lng, max_lat)
+        )
+    return clauses[0] if len(clauses) == 1 else {"$or": clauses}
@@ -0,0 +1,197 @@
+import os
+import uuid
+import random
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional, List, Set
+from bson import ObjectId
+from dotenv import load_dotenv
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from database import db
+from .resolver import resolve_coordinates
+from .geo import geo_fields
+from .versioning import with_version, bump_collection_version
+from .events import publish_event
+
+load_dotenv()
+
+GEOCODE_WORKERS = int(os.getenv("GEOCODE_WORKERS", 4))
+GEOCODE_RETRIES = int(os.getenv("GEOCODE_RETRIES", 3))
+GEOCODE_MAX_ATTEMPTS = int(os.getenv("GEOCODE_MAX_ATTEMPTS", 5))
+GEOCODE_SWEEP_INTERVAL_SECONDS = float(os.getenv("GEOCODE_SWEEP_INTERVAL_SECONDS", 300))
+# Set to false on processes that should only resolve newly queued places
+GEOCODE_SWEEPER_ENABLED = os.getenv("GEOCODE_SWEEPER_ENABLED", "true").lower() == "true"
+GEOCODE_QUEUE_SIZE = 1000
+
+# Lease in the locks collection that lets one process at a time sweep, so
+# several app workers do not all queue the same places
+SWEEP_LOCK_ID = "geocode_sweeper"
+_process_id = uuid.uuid4().hex
+
+_queue: Optional[asyncio.Queue] = None
+_tasks: List[asyncio.Task] = []
+# Wishlist IDs queued or being resolved, so the sweep does not double-queue them
+_in_flight: Set[str] = set()
+
+
+def enqueue_geocode(wishlist_id: str, google_maps_url: str) -> bool:
+    """
+    Queue a wishlist for background coordinate resolution.
+    Returns False if the queue is not running or full; the sweep picks those up later.
+    """
+    if _queue is None or wishlist_id in _in_flight:
+        return False
+    try:
+        _queue.put_nowait((wishlist_id, google_maps_url))
+    except asyncio.QueueFull:
+        return False
+    _in_flight.add(wishlist_id)
+    return True
+
+
+async def _resolve_with_retry(google_maps_url: str):
+    """Resolve coordinates, retrying network failures with exponential backoff."""
+    for attempt in range(GEOCODE_RETRIES):
+        try:
+            return await resolve_coordinates(google_maps_url)
+        except Exception as e:
+            if attempt == GEOCODE_RETRIES - 1:
+                raise
+            delay = 0.5 * 2 ** attempt + random.uniform(0, 0.5)
+            print(f"Geocode retry {attempt + 1} for {google_maps_url} in {delay:.1f}s: {e}")
+            await asyncio.sleep(delay)
+
+
+async def _geocode(wishlist_id: str, google_maps_url: str) -> None:
+    """Resolve one wishlist and patch its document with the outcome."""
+    # Only patch if the URL has not been changed since the job was queued
+    query = {"_id": ObjectId(wishlist_id), "google_maps_url": google_maps_url}
+    
+    try:
+        lat, lng = await _resolve_with_retry(google_maps_url)
+    except Exception as e:
+        print(f"Error geocoding wishlist {wishlist_id}: {e}")
+        result = await db.wishlists.find_one_and_update(
+            query,
+            {"$inc": {"geocode_attempts": 1}},
+            projection={"geocode_attempts": 1}
+        )
+        # Give up once the attempt budget is spent; otherwise the sweep retries
+        if result and result.get("geocode_attempts", 0) + 1 >= GEOCODE_MAX_ATTEMPTS:
+            failed = await db.wishlists.find_one_and_update(
+                query,
+                with_version({"$set": {"geocode_status": "failed"}}),
+                projection={"user_id": 1, "version": 1},
+                return_document=ReturnDocument.AFTER
+            )
+            if failed:
+                await bump_collection_version()
+                publish_event("updated", wishlist_id, failed.get("user_id"), failed.get("version"))
+        return
+    
+    # Coordinates off the globe count as a failed lookup
+    geo = geo_fields(lat, lng)
+    update = {
+        "latitude": lat if geo else None,
+        "longitude": lng if geo else None,
+        "geocode_status": "resolved" if geo else "failed",
+        "geocoded_at": datetime.utcnow()
+    }
+    if geo:
+        update.update(geo)
+    updated = await db.wishlists.find_one_and_update(
+        query,
+        with_version({"$set": update, "$inc": {"geocode_attempts": 1}}),
+        projection={"user_id": 1, "version": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    if updated:
+        await bump_collection_version()
+        publish_event("updated", wishlist_id, updated.get("user_id"), updated.get("version"))
+
+
+async def _worker() -> None:
+    while True:
+        wishlist_id, google_maps_url = await _queue.get()
+        try:
+            await _geocode(wishlist_id, google_maps_url)
+        except Exception as e:
+            print(f"Error in geocode worker: {e}")
+        finally:
+            _in_flight.discard(wishlist_id)
+            _queue.task_done()
+
+
+async def sweep_pending() -> int:
+    """Re-queue places whose coordinates are still unresolved. Returns how many were queued."""
+    cursor = db.wishlists.find(
+        {
+            "$or": [
+                {"geocode_status": "pending"},
+                # Documents written before background geocoding existed
+                {"geocode_status": {"$exists": False}, "google_maps_url": {"$type": "string"}}
+            ],
+            "latitude": None,
+            "geocode_attempts": {"$not": {"$gte": GEOCODE_MAX_ATTEMPTS}}
+        },
+        {"google_maps_url": 1}
+    ).limit(GEOCODE_QUEUE_SIZE)
+    
+    queued = 0
+    async for wishlist in cursor:
+        if enqueue_geocode(str(wishlist["_id"]), wishlist["google_maps_url"]):
+            queued += 1
+    return queued
+
+
+async def claim_sweep_lease() -> bool:
+    """Take or renew the sweep lease. Returns False while another process holds it."""
+    now = datetime.utcnow()
+    try:
+        await db.locks.update_one(
+            {"_id": SWEEP_LOCK_ID, "$or": [{"owner": _process_id}, {"expires_at": {"$lt": now}}]},
+            # Outlives one sweep interval, so the holder keeps it by renewing each sweep
+            {"$set": {"owner": _process_id, "expires_at": now + timedelta(seconds=2 * GEOCODE_SWEEP_INTERVAL_SECONDS)}},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        return False
+    return True
+
+
+async def _sweeper() -> None:
+    while True:
+        try:
+            queued = await sweep_pending() if await claim_sweep_lease() else 0
+            if queued:
+                print(f"📍 Re-queued {queued} place(s) for geocoding")
+        except Exception as e:
+            print(f"Error in geocode sweep: {e}")
+        await asyncio.sleep(GEOCODE_SWEEP_INTERVAL_SECONDS)
+
+
+def start_geocoder() -> None:
+    """
+    Start the worker pool and, unless GEOCODE_SWEEPER_ENABLED is false, the
+    periodic sweep. Called on application startup.
+    """
+    global _queue
+    if _tasks:
+        return
+    _queue = asyncio.Queue(maxsize=GEOCODE_QUEUE_SIZE)
+    _tasks.extend(asyncio.create_task(_worker()) for _ in range(GEOCODE_WORKERS))
+    if GEOCODE_SWEEPER_ENABLED:
+        _tasks.append(asyncio.create_task(_sweeper()))
+
+
+async def stop_geocoder() -> None:
+    """Cancel the background tasks. Called on application shutdown."""
+    global _queue
+    for task in _tasks:
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    _tasks.clear()
+    _in_flight.clear()
+    _queue = None
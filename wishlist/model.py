@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 from enum import Enum
 
@@ -15,6 +15,12 @@ class SourceType(str, Enum):
     GOOGLE_MAP = "google_map"
 
 
+class GeocodeStatus(str, Enum):
+    PENDING = "pending"
+    RESOLVED = "resolved"
+    FAILED = "failed"
+
+
 # --- Activity Schemas ---
 class ActivityBase(BaseModel):
     name: str
@@ -36,6 +42,34 @@ class ActivityResponse(ActivityBase):
     id: str
 
 
+class ActivityPage(BaseModel):
+    items: List[ActivityResponse]
+    next_cursor: Optional[str] = None
+
+
+class ActivityOperationType(str, Enum):
+    ADD = "add"
+    UPDATE = "update"
+    DELETE = "delete"
+    REORDER = "reorder"
+
+
+class ActivityOperation(BaseModel):
+    op: ActivityOperationType
+    # Target activity for update and delete
+    id: Optional[str] = None
+    # New activity for add
+    activity: Optional[ActivityCreate] = None
+    # Fields to change for update
+    changes: Optional[ActivityUpdate] = None
+    # Activity IDs in their new order for reorder; unlisted ones follow
+    order: Optional[List[str]] = None
+
+
+class ActivityBatch(BaseModel):
+    operations: List[ActivityOperation]
+
+
 # --- Wishlist Schemas ---
 class WishlistBase(BaseModel):
     name: str
@@ -45,8 +79,8 @@ class WishlistBase(BaseModel):
 
 class WishlistCreate(WishlistBase):
     # For manual entry
-    latitude: Optional[float] = None
-    longitude: Optional[float] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     # For Google Maps import
     google_maps_url: Optional[str] = None
 
@@ -55,8 +89,8 @@ class WishlistUpdate(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = None
     status: Optional[WishlistStatus] = None
-    latitude: Optional[float] = None
-    longitude: Optional[float] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     google_maps_url: Optional[str] = None
 
 
@@ -66,6 +100,92 @@ class WishlistResponse(WishlistBase):
     latitude: Optional[float] = None
     longitude: Optional[float] = None
     google_maps_url: Optional[str] = None
-    source_type: SourceType
+    source_type: SourceType = SourceType.MANUAL
+    geocode_status: Optional[GeocodeStatus] = None
     activities: List[ActivityResponse] = []
+    activity_count: int = 0
+    completed_count: int = 0
+    total_cost: float = 0.0
     created_at: datetime
+    updated_at: Optional[datetime] = None
+    version: int = 0
+
+
+# Sparse view of a wishlist returned when a fields= query is given
+class WishlistSummary(BaseModel):
+    id: str
+    name: Optional[str] = None
+    description: Optional[str] = None
+    status: Optional[WishlistStatus] = None
+    user_id: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    google_maps_url: Optional[str] = None
+    source_type: Optional[SourceType] = None
+    geocode_status: Optional[GeocodeStatus] = None
+    activities: Optional[List[ActivityResponse]] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    version: Optional[int] = None
+    # Computed from the activities array
+    activity_count: Optional[int] = None
+    completed_count: Optional[int] = None
+    total_cost: Optional[float] = None
+
+
+class WishlistSearchResult(WishlistResponse):
+    score: float
+
+
+class WishlistSearchPage(BaseModel):
+    items: List[WishlistSearchResult]
+    next_offset: Optional[int] = None
+
+
+class WishlistSuggestion(BaseModel):
+    id: str
+    name: str
+
+
+class WishlistPage(BaseModel):
+    items: List[WishlistResponse]
+    next_cursor: Optional[str] = None
+
+
+# --- Map Cluster Schemas ---
+class WishlistCluster(BaseModel):
+    geohash: str
+    count: int
+    latitude: float
+    longitude: float
+    wishlist_id: Optional[str] = None
+
+
+class WishlistClusterResponse(BaseModel):
+    precision: int
+    clusters: List[WishlistCluster]
+
+
+# --- Bulk Import Schemas ---
+class ImportRowResult(BaseModel):
+    row: int
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class ImportResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[ImportRowResult]
+
+
+# --- Stats Schemas ---
+class WishlistStats(BaseModel):
+    user_id: str
+    wishlist_count: int = 0
+    status_counts: Dict[str, int] = {}
+    activity_count: int = 0
+    completed_count: int = 0
+    total_cost: float = 0.0
+    completion_rate: float = 0.0
+    updated_at: Optional[datetime] = None
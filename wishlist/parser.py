@@ -0,0 +1,55 @@
+import re
+from typing import Optional, Tuple
+from urllib.parse import unquote
+
+_NUM = r"(-?\d+(?:\.\d*)?)"
+# Separator between the two numbers in query values: "," optionally followed by "+"/spaces
+_SEP = r",[+\s]*"
+
+# Every supported URL form in one alternation, so a URL is scanned once.
+# Each alternative has exactly two capturing groups, and alternatives are
+# listed in priority order: when a URL matches several, the earliest
+# alternative wins regardless of where it appears in the URL.
+_COORDINATE_PATTERN = re.compile(
+    # @lat,lng,zoom (most common)
+    rf"@{_NUM},{_NUM}"
+    # !3d{lat}!4d{lng} in data= blobs
+    rf"|!3d{_NUM}!4d{_NUM}"
+    # ll=lat,lng, sll=lat,lng and center=lat,lng query parameters
+    rf"|(?:ll|center)={_NUM}{_SEP}{_NUM}"
+    # /place/lat,lng
+    rf"|/place/{_NUM}{_SEP}{_NUM}"
+    # q=, query=, destination= and daddr= with raw coordinates
+    rf"|[?&](?:q|query|destination|daddr)=(?:loc:)?{_NUM}{_SEP}{_NUM}"
+    # !2d{lng}!3d{lat} in embed pb= blobs
+    rf"|!2d{_NUM}!3d{_NUM}"
+)
+_FORM_COUNT = _COORDINATE_PATTERN.groups // 2
+
+# Alternatives whose pair is (longitude, latitude)
+_LNG_FIRST_FORMS = {5}
+
+
+def parse_coordinates(url: str) -> Tuple[Optional[float], Optional[float]]:
+    """Extract latitude and longitude from a full (already resolved) Google Maps URL."""
+    if "%" in url:
+        url = unquote(url)
+    
+    best = None
+    best_form = _FORM_COUNT
+    for match in _COORDINATE_PATTERN.finditer(url):
+        # lastindex is the second group of whichever alternative matched
+        form = (match.lastindex - 1) // 2
+        if form >= best_form:
+            continue
+        
+        first, second = float(match.group(form * 2 + 1)), float(match.group(form * 2 + 2))
+        lat, lng = (second, first) if form in _LNG_FIRST_FORMS else (first, second)
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+            continue
+        
+        best, best_form = (lat, lng), form
+        if form == 0:
+            break
+    
+    return best if best else (None, None)
@@ -0,0 +1,120 @@
+import os
+import time
+import httpx
+from datetime import datetime
+from typing import Optional, Tuple
+from urllib.parse import urlparse
+from dotenv import load_dotenv
+
+from cache import TTLCache
+from metrics import Histogram, cache_metrics
+from singleflight import SingleFlight
+from database import db
+from .parser import parse_coordinates
+
+load_dotenv()
+
+# Hosts whose links are redirects that must be followed to get coordinates.
+# Point this at a local stub redirect server to exercise resolution offline.
+SHORT_URL_HOSTS = [
+    host.strip()
+    for host in os.getenv("SHORT_URL_HOSTS", "goo.gl,maps.app.goo.gl").split(",")
+    if host.strip()
+]
+URL_CACHE_TTL_SECONDS = int(os.getenv("URL_CACHE_TTL_SECONDS", 7 * 24 * 3600))
+URL_CACHE_MAX_SIZE = int(os.getenv("URL_CACHE_MAX_SIZE", 10000))
+
+# First tier: per-process LRU. Second tier: the url_resolutions collection,
+# shared by every worker and expired by a TTL index on resolved_at.
+url_cache = TTLCache(maxsize=URL_CACHE_MAX_SIZE, ttl=URL_CACHE_TTL_SECONDS)
+cache_metrics("url", url_cache)
+url_resolution_seconds = Histogram(
+    "url_resolution_seconds",
+    "Time to resolve a short link missing from the in-memory cache, by where it was found",
+    labelnames=["source"]
+)
+
+# Concurrent resolutions of the same link share one lookup
+resolution_flight = SingleFlight(copy=None)
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the application-wide HTTP client, creating it on first use."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            follow_redirects=True,
+            timeout=httpx.Timeout(10.0, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=20,
+                max_keepalive_connections=10,
+                keepalive_expiry=60.0
+            )
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client. Called on application shutdown."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+def is_short_url(url: str) -> bool:
+    """Check whether a URL is a short link that needs to be resolved over the network."""
+    host = (urlparse(url).hostname or "").lower()
+    return any(host == short or host.endswith("." + short) for short in SHORT_URL_HOSTS)
+
+
+async def resolve_short_url(url: str) -> str:
+    """
+    Follow a short link's redirect chain and return the final URL.
+    Results are cached in memory and in MongoDB, so repeat links skip the network.
+    Raises if the link fails or does not redirect, and caches nothing then.
+    """
+    final_url = url_cache.get(url)
+    if final_url is not None:
+        return final_url
+    return await resolution_flight.do(url, _resolve_uncached, url)
+
+
+async def _resolve_uncached(url: str) -> str:
+    """Resolve a short link missing from the in-memory cache."""
+    started = time.perf_counter()
+    cached = await db.url_resolutions.find_one({"_id": url})
+    if cached:
+        url_cache.set(url, cached["final_url"])
+        url_resolution_seconds.labels("mongo").observe(time.perf_counter() - started)
+        return cached["final_url"]
+    
+    # Stream so the final page body is never downloaded, only the redirect chain
+    async with get_http_client().stream("GET", url) as response:
+        # Error and rate-limit pages must not be cached; raising lets the geocoder retry
+        response.raise_for_status()
+        final_url = str(response.url)
+    url_resolution_seconds.labels("network").observe(time.perf_counter() - started)
+    if is_short_url(final_url):
+        raise ValueError(f"Short link {url} did not redirect to a full URL")
+    
+    url_cache.set(url, final_url)
+    await db.url_resolutions.update_one(
+        {"_id": url},
+        {"$set": {"final_url": final_url, "resolved_at": datetime.utcnow()}},
+        upsert=True
+    )
+    return final_url
+
+
+async def resolve_coordinates(google_maps_url: str) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Resolve a Google Maps URL (following short links) and extract its coordinates.
+    Network errors are raised so callers can decide whether to retry.
+    """
+    final_url = google_maps_url
+    if is_short_url(google_maps_url):
+        final_url = await resolve_short_url(google_maps_url)
+    return parse_coordinates(final_url)
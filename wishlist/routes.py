@@ -1,29 +1,84 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from typing import List
+import io
+import csv
+import json
+import hashlib
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from typing import Optional, List
+from enum import Enum
 
 from auth.controller import get_current_user
+from response_cache import response_cache
 from .model import (
     WishlistCreate,
     WishlistUpdate,
     WishlistResponse,
+    WishlistPage,
+    WishlistSearchPage,
+    WishlistSuggestion,
+    WishlistSummary,
+    WishlistClusterResponse,
+    ImportResponse,
+    ImportRowResult,
+    WishlistStats,
+    WishlistStatus,
+    SourceType,
     ActivityCreate,
     ActivityUpdate,
-    ActivityResponse
+    ActivityResponse,
+    ActivityPage,
+    ActivityBatch,
+    ActivityOperationType
 )
 from .controller import (
     get_user_wishlists,
-    get_all_wishlists,
+    get_wishlists_page,
+    decode_cursor,
+    search_wishlists,
+    iter_wishlists,
+    iter_activities,
+    get_wishlists_near,
+    get_wishlists_within,
+    get_wishlist_clusters,
     get_wishlist_by_id,
+    get_activities_page,
+    build_projection,
     create_wishlist,
+    import_wishlists,
     update_wishlist,
     delete_wishlist,
     add_activity,
     update_activity,
-    delete_activity
+    delete_activity,
+    apply_activity_operations
 )
+from .export import ndjson_lines, gzip_chunks
+from .geo import parse_bbox
+from .serialization import FastJSONResponse, RESPONSE_PROJECTION, dumps
+from .versioning import get_collection_version
+from .stats import get_user_stats
+from .suggest import suggest
+from .events import EVENTS_MAX_SUBSCRIBERS, event_stream, subscriber_count
 
 router = APIRouter(prefix="/wishlist", tags=["Wishlist"])
 
+IMPORT_MAX_ROWS = 5000
+ACTIVITY_BATCH_MAX_OPERATIONS = 200
+
+# Fields each batch activity operation must provide
+ACTIVITY_OPERATION_FIELDS = {
+    ActivityOperationType.ADD: ("activity",),
+    ActivityOperationType.UPDATE: ("id", "changes"),
+    ActivityOperationType.DELETE: ("id",),
+    ActivityOperationType.REORDER: ("order",),
+}
+
+
+class ExportResource(str, Enum):
+    WISHLISTS = "wishlists"
+    ACTIVITIES = "activities"
+
 
 @router.post("/", response_model=WishlistResponse, status_code=status.HTTP_201_CREATED)
 async def create_wishlist_place(
@@ -36,6 +91,9 @@ async def create_wishlist_place(
     You can either:
     - Provide latitude and longitude manually (source_type will be 'manual')
     - Provide a google_maps_url and coordinates will be extracted automatically (source_type will be 'google_map')
+    
+    Short links (goo.gl) are resolved in the background: the place is returned
+    with geocode_status 'pending' and its coordinates are filled in shortly after.
     """
     wishlist_data = wishlist.dict()
     
@@ -53,24 +111,422 @@ async def create_wishlist_place(
     return result
 
 
-@router.get("/", response_model=List[WishlistResponse])
-async def get_all_wishlist_places(current_user: dict = Depends(get_current_user)):
-    """Get all wishlist places from all users."""
-    return await get_all_wishlists()
+FIELDS_DESCRIPTION = (
+    "Comma-separated fields to return, e.g. name,status,latitude,longitude. "
+    "activity_count, completed_count and total_cost are computed from the activities."
+)
+
+
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Validate a fields= query against the WishlistSummary model."""
+    if fields is None:
+        return None
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in WishlistSummary.__fields__]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+    return requested
+
+
+def _sparse(doc: dict) -> dict:
+    """Serialize a projected document with only the fields it actually has."""
+    return WishlistSummary(**doc).dict(exclude_unset=True)
+
+
+def _make_etag(*parts) -> str:
+    """Build a strong ETag from the values that determine a response body."""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest[:20]}"'
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Check a request's If-None-Match header against an ETag."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so ignore any W/ prefix
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+
+async def _collection_etag(request: Request) -> str:
+    """ETag for a response derived from the whole wishlists collection and the query."""
+    version = await get_collection_version()
+    return _make_etag(request.url.path, version, sorted(request.query_params.multi_items()))
+
+
+def _validation_message(error: ValidationError) -> str:
+    """Flatten a pydantic ValidationError into a single readable line."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}"
+        for err in error.errors()
+    )
+
+
+def _parse_import_rows(body: bytes, content_type: str) -> List[dict]:
+    """Parse a bulk import body as a JSON array or as CSV with a header row."""
+    if content_type.startswith("text/csv"):
+        reader = csv.DictReader(io.StringIO(body.decode("utf-8-sig")))
+        # Empty CSV cells mean "not provided", so leave them out and let defaults apply
+        return [{k: v for k, v in row.items() if k and v not in ("", None)} for row in reader]
+    
+    rows = json.loads(body)
+    if not isinstance(rows, list):
+        raise ValueError("Expected a JSON array of places")
+    return rows
+
+
+@router.post("/import", response_model=ImportResponse, status_code=status.HTTP_201_CREATED)
+async def import_wishlist_places(
+    request: Request,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Create many wishlist places in one request.
+    
+    Send either a JSON array of places (same fields as POST /wishlist/) or
+    text/csv with a header row of name, description, status, latitude,
+    longitude and google_maps_url. Each row gets its own result, so invalid
+    rows do not stop the rest from being imported.
+    """
+    try:
+        rows = _parse_import_rows(await request.body(), request.headers.get("content-type", ""))
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Could not parse import body: {e}"
+        )
+    if len(rows) > IMPORT_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {IMPORT_MAX_ROWS} places can be imported at once"
+        )
+    
+    # Validate every row up front, then import only the valid ones
+    results = [ImportRowResult(row=index) for index in range(len(rows))]
+    valid_rows, valid_items = [], []
+    for index, row in enumerate(rows):
+        try:
+            if not isinstance(row, dict):
+                raise ValueError("Each place must be an object")
+            item = WishlistCreate(**row).dict()
+        except ValidationError as e:
+            results[index].error = _validation_message(e)
+            continue
+        except ValueError as e:
+            results[index].error = str(e)
+            continue
+        
+        has_coordinates = item.get("latitude") is not None and item.get("longitude") is not None
+        if not has_coordinates and item.get("google_maps_url") is None:
+            results[index].error = "Either provide latitude/longitude or google_maps_url"
+            continue
+        valid_rows.append(index)
+        valid_items.append(item)
+    
+    if valid_items:
+        imported = await import_wishlists(valid_items, current_user["id"])
+        for index, outcome in zip(valid_rows, imported):
+            results[index].id = outcome["id"]
+            results[index].error = outcome["error"]
+    
+    created = sum(1 for result in results if result.id)
+    return ImportResponse(created=created, failed=len(results) - created, results=results)
+
+
+@router.get("/", response_model=WishlistPage)
+async def get_all_wishlist_places(
+    request: Request,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    status_filter: Optional[WishlistStatus] = Query(None, alias="status"),
+    user_id: Optional[str] = None,
+    source_type: Optional[SourceType] = None,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Get wishlist places from all users, one page at a time.
+    
+    Pass the returned next_cursor as cursor to fetch the following page.
+    A null next_cursor means there are no more places. Use fields= to return
+    only some fields, e.g. for map pins without the activities.
+    
+    Responses carry an ETag; send it back in If-None-Match to get an empty
+    304 when nothing has changed.
+    """
+    requested = _parse_fields(fields)
+    etag = await _collection_etag(request)
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
+    
+    # The ETag covers the collection version and the query, so it keys the
+    # serialized page; any write moves every key to a new generation
+    body = await response_cache.get(etag)
+    if body is not None:
+        return Response(body, media_type="application/json", headers={"ETag": etag, "X-Cache": "HIT"})
+    
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    page = await get_wishlists_page(
+        limit=limit,
+        after=after,
+        status=status_filter.value if status_filter else None,
+        user_id=user_id,
+        source_type=source_type.value if source_type else None,
+        projection=build_projection(requested) if requested else RESPONSE_PROJECTION
+    )
+    
+    if requested:
+        page["items"] = [_sparse(doc) for doc in page["items"]]
+    # Documents come back response-shaped, so skip re-validating them
+    body = dumps(page)
+    await response_cache.set(etag, body)
+    return Response(body, media_type="application/json", headers={"ETag": etag, "X-Cache": "MISS"})
+
+
+@router.get("/export")
+async def export_wishlists(
+    resource: ExportResource = ExportResource.WISHLISTS,
+    gzip: bool = False,
+    batch_size: int = Query(500, ge=1, le=5000),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Export all wishlists (or all activities) as newline-delimited JSON.
+    
+    Rows are streamed as they are read from MongoDB, so memory use stays flat
+    regardless of collection size. Set gzip=true to compress the stream.
+    """
+    if resource == ExportResource.ACTIVITIES:
+        docs = iter_activities(batch_size)
+    else:
+        docs = iter_wishlists(batch_size)
+    
+    body = ndjson_lines(docs)
+    filename = f"{resource.value}.ndjson"
+    media_type = "application/x-ndjson"
+    if gzip:
+        body = gzip_chunks(body)
+        filename += ".gz"
+        media_type = "application/gzip"
+    
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.get("/near", response_model=List[WishlistResponse])
+async def get_wishlist_places_near(
+    request: Request,
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius: float = Query(5000, gt=0, le=20000000, description="Radius in metres"),
+    limit: int = Query(100, ge=1, le=500),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get wishlist places within radius metres of a point, nearest first."""
+    requested = _parse_fields(fields)
+    etag = await _collection_etag(request)
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
+    
+    if requested:
+        places = await get_wishlists_near(lat, lng, radius, limit, build_projection(requested))
+        return FastJSONResponse([_sparse(doc) for doc in places], headers={"ETag": etag})
+    places = await get_wishlists_near(lat, lng, radius, limit, RESPONSE_PROJECTION)
+    return FastJSONResponse(places, headers={"ETag": etag})
+
+
+@router.get("/within", response_model=List[WishlistResponse])
+async def get_wishlist_places_within(
+    request: Request,
+    bbox: str = Query(..., description="minLng,minLat,maxLng,maxLat"),
+    limit: int = Query(500, ge=1, le=2000),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get wishlist places inside a map viewport bounding box."""
+    requested = _parse_fields(fields)
+    try:
+        bounds = parse_bbox(bbox)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    etag = await _collection_etag(request)
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
+    
+    if requested:
+        places = await get_wishlists_within(bounds, limit, build_projection(requested))
+        return FastJSONResponse([_sparse(doc) for doc in places], headers={"ETag": etag})
+    places = await get_wishlists_within(bounds, limit, RESPONSE_PROJECTION)
+    return FastJSONResponse(places, headers={"ETag": etag})
+
+
+@router.get("/clusters", response_model=WishlistClusterResponse)
+async def get_wishlist_place_clusters(
+    request: Request,
+    bbox: str = Query(..., description="minLng,minLat,maxLng,maxLat"),
+    zoom: int = Query(..., ge=0, le=22),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Get clustered wishlist places for a zoomed-out map viewport.
+    
+    Places are grouped into geohash cells sized for the zoom level, and each
+    cell is returned as a centroid with a count.
+    """
+    try:
+        bounds = parse_bbox(bbox)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    etag = await _collection_etag(request)
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
+    return FastJSONResponse(await get_wishlist_clusters(bounds, zoom), headers={"ETag": etag})
+
+
+@router.get("/stats", response_model=WishlistStats)
+async def get_wishlist_stats(
+    user_id: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Get a user's wishlist statistics (defaults to the current user).
+    
+    Reads a precomputed summary that is refreshed whenever the user's
+    wishlists or activities change.
+    """
+    user_id = user_id or current_user["id"]
+    summary = await get_user_stats(user_id) or {}
+    summary.pop("_id", None)
+    activity_count = summary.get("activity_count", 0)
+    completion_rate = summary.get("completed_count", 0) / activity_count if activity_count else 0.0
+    return {**summary, "user_id": user_id, "completion_rate": completion_rate}
+
+
+@router.get("/search", response_model=WishlistSearchPage)
+async def search_wishlist_places(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=1000),
+    status_filter: Optional[WishlistStatus] = Query(None, alias="status"),
+    user_id: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Search wishlist places by name, description and activity names, best matches first.
+    Pass the returned next_offset as offset to get the following page.
+    """
+    etag = await _collection_etag(request)
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
+    
+    page = await search_wishlists(
+        q,
+        limit=limit,
+        offset=offset,
+        status=status_filter.value if status_filter else None,
+        user_id=user_id,
+        projection=RESPONSE_PROJECTION
+    )
+    return FastJSONResponse(page, headers={"ETag": etag})
+
+
+@router.get("/suggest", response_model=List[WishlistSuggestion])
+async def suggest_wishlist_places(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: dict = Depends(get_current_user)
+):
+    """Type-ahead: places whose name has words starting with each word of q."""
+    return FastJSONResponse(suggest(q, limit))
+
+
+@router.get("/events")
+async def wishlist_events(
+    request: Request,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Live feed of wishlist changes as Server-Sent Events, instead of polling GET /wishlist/.
+    
+    Events are created, updated, deleted and activity, each with
+    {"wishlist_id", "user_id", "version"}; refetch the place (with its ETag)
+    to get the new state. A reset event means changes may have been missed:
+    refetch the list and reconnect.
+    """
+    if subscriber_count() >= EVENTS_MAX_SUBSCRIBERS:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many event stream connections"
+        )
+    return StreamingResponse(
+        event_stream(request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @router.get("/{wishlist_id}", response_model=WishlistResponse)
 async def get_wishlist(
     wishlist_id: str,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     current_user: dict = Depends(get_current_user)
 ):
-    """Get a specific wishlist place by ID."""
-    wishlist = await get_wishlist_by_id(wishlist_id)
+    """
+    Get a specific wishlist place by ID.
+    
+    Responses carry an ETag that changes with the place's version; send it
+    back in If-None-Match to get an empty 304 when nothing has changed.
+    """
+    requested = _parse_fields(fields)
+    projection = None
+    if requested:
+        # The ETag needs the version even when it was not requested
+        projection = {**build_projection(requested), "version": 1}
+    wishlist = await get_wishlist_by_id(wishlist_id, projection=projection)
     if not wishlist:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Wishlist not found"
         )
+    
+    etag = _make_etag(wishlist_id, wishlist.get("version", 0), fields or "")
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
+    
+    if requested:
+        if "version" not in requested:
+            wishlist.pop("version", None)
+        return FastJSONResponse(_sparse(wishlist), headers={"ETag": etag})
+    response.headers["ETag"] = etag
     return wishlist
 
 
@@ -107,6 +563,32 @@ async def delete_wishlist_place(
 
 # --- Activity Routes ---
 
+@router.get("/{wishlist_id}/activities", response_model=ActivityPage)
+async def list_wishlist_activities(
+    wishlist_id: str,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Get the activities of a wishlist place one page at a time, in itinerary order.
+    Pass the returned next_cursor to get the following page.
+    """
+    try:
+        page = await get_activities_page(wishlist_id, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if page is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Wishlist not found"
+        )
+    return page
+
+
 @router.post("/{wishlist_id}/activities", response_model=WishlistResponse)
 async def create_activity(
     wishlist_id: str,
@@ -159,3 +641,53 @@ async def delete_wishlist_activity(
             detail="Wishlist or activity not found"
         )
     return result
+
+
+@router.patch("/{wishlist_id}/activities", response_model=WishlistResponse)
+async def batch_update_activities(
+    wishlist_id: str,
+    batch: ActivityBatch,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Apply several activity changes to a wishlist place in one atomic update.
+    
+    Operations run in order:
+    - add: {"op": "add", "activity": {...}}
+    - update: {"op": "update", "id": "...", "changes": {...}}
+    - delete: {"op": "delete", "id": "..."}
+    - reorder: {"op": "reorder", "order": ["id", ...]} (unlisted activities keep their order after these)
+    
+    If the place or any referenced activity does not exist, nothing is changed.
+    """
+    if len(batch.operations) > ACTIVITY_BATCH_MAX_OPERATIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {ACTIVITY_BATCH_MAX_OPERATIONS} operations per batch"
+        )
+    
+    operations = []
+    for index, operation in enumerate(batch.operations):
+        missing = [
+            field for field in ACTIVITY_OPERATION_FIELDS[operation.op]
+            if getattr(operation, field) is None
+        ]
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Operation {index} ({operation.op.value}) requires {', '.join(missing)}"
+            )
+        if operation.op == ActivityOperationType.REORDER and len(set(operation.order)) != len(operation.order):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Operation {index} (reorder) lists an activity more than once"
+            )
+        operations.append(operation.dict())
+    
+    result = await apply_activity_operations(wishlist_id, current_user["id"], operations)
+    if not result:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Wishlist or activity not found"
+        )
+    return result
@@ -0,0 +1,65 @@
+import orjson
+from typing import Any
+from bson import ObjectId
+from fastapi.responses import Response
+
+
+def _default(value: Any) -> Any:
+    """orjson fallback for BSON types; datetimes and enums are handled natively."""
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize to JSON bytes with orjson."""
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(Response):
+    """orjson response that also encodes ObjectId, for documents straight from MongoDB."""
+    
+    media_type = "application/json"
+    
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+# Activity items shaped like ActivityResponse, with the model's defaults for
+# fields that legacy items lack and any other stored keys dropped
+ACTIVITY_PROJECTION = {"$map": {
+    "input": {"$ifNull": ["$activities", []]},
+    "as": "a",
+    "in": {
+        "id": "$$a.id",
+        "name": "$$a.name",
+        "cost": {"$ifNull": ["$$a.cost", 0.0]},
+        "is_completed": {"$ifNull": ["$$a.is_completed", False]},
+    },
+}}
+
+# find() projection that makes MongoDB return documents already shaped like
+# WishlistResponse: _id renamed to a string id, internal fields dropped and
+# every field the model defaults given the same default here. Trusted
+# documents can then be serialized directly, without fix_id or Pydantic
+# validation; keep the two in step when either changes.
+RESPONSE_PROJECTION = {
+    "_id": 0,
+    "id": {"$toString": "$_id"},
+    "name": 1,
+    "description": {"$ifNull": ["$description", None]},
+    "status": {"$ifNull": ["$status", "Wishlist"]},
+    "user_id": 1,
+    "latitude": {"$ifNull": ["$latitude", None]},
+    "longitude": {"$ifNull": ["$longitude", None]},
+    "google_maps_url": {"$ifNull": ["$google_maps_url", None]},
+    "source_type": {"$ifNull": ["$source_type", "manual"]},
+    "geocode_status": {"$ifNull": ["$geocode_status", None]},
+    "activities": ACTIVITY_PROJECTION,
+    "activity_count": {"$ifNull": ["$activity_count", 0]},
+    "completed_count": {"$ifNull": ["$completed_count", 0]},
+    "total_cost": {"$ifNull": ["$total_cost", 0.0]},
+    "created_at": 1,
+    "updated_at": {"$ifNull": ["$updated_at", None]},
+    "version": {"$ifNull": ["$version", 0]},
+}
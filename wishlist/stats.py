@@ -0,0 +1,131 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from database import db
+from .activity_store import uses_activity_collection, recount_all_activities
+from .versioning import pipeline_version_stage
+
+# Per-wishlist activity counters, computed from the activities array.
+# Used as a pipeline-update stage so they are written in the same update
+# as the activities themselves, and by the rebuild.
+ACTIVITY_COUNTERS = {
+    "activity_count": {"$size": {"$ifNull": ["$activities", []]}},
+    "completed_count": {"$size": {"$filter": {
+        "input": {"$ifNull": ["$activities", []]},
+        "as": "a",
+        "cond": {"$eq": ["$$a.is_completed", True]}
+    }}},
+    "total_cost": {"$sum": "$activities.cost"},
+}
+
+# The same counters read from the stored fields, for when activities live in
+# their own collection and the wishlist has no array to compute them from.
+STORED_ACTIVITY_COUNTERS = {
+    "activity_count": {"$ifNull": ["$activity_count", 0]},
+    "completed_count": {"$ifNull": ["$completed_count", 0]},
+    "total_cost": {"$ifNull": ["$total_cost", 0]},
+}
+
+COUNTER_FIELDS = tuple(ACTIVITY_COUNTERS)
+
+DEFAULT_STATUS = "Wishlist"
+
+
+def counters_stage() -> dict:
+    """Pipeline-update stage that recomputes a wishlist's activity counters."""
+    return {"$set": ACTIVITY_COUNTERS}
+
+
+def counter_expressions() -> dict:
+    """Aggregation expressions for the activity counters under the configured storage mode."""
+    return STORED_ACTIVITY_COUNTERS if uses_activity_collection() else ACTIVITY_COUNTERS
+
+
+def _user_stats_pipeline(match: dict) -> list:
+    """Aggregation that summarizes wishlists per user and merges into user_stats."""
+    return [
+        {"$match": match},
+        {"$project": {
+            "user_id": 1,
+            "status": {"$ifNull": ["$status", DEFAULT_STATUS]},
+            **counter_expressions()
+        }},
+        {"$group": {
+            "_id": {"user_id": "$user_id", "status": "$status"},
+            "wishlists": {"$sum": 1},
+            "activity_count": {"$sum": "$activity_count"},
+            "completed_count": {"$sum": "$completed_count"},
+            "total_cost": {"$sum": "$total_cost"},
+        }},
+        {"$group": {
+            "_id": "$_id.user_id",
+            "wishlist_count": {"$sum": "$wishlists"},
+            "activity_count": {"$sum": "$activity_count"},
+            "completed_count": {"$sum": "$completed_count"},
+            "total_cost": {"$sum": "$total_cost"},
+            "status_counts": {"$push": {"k": "$_id.status", "v": "$wishlists"}},
+        }},
+        {"$set": {
+            "status_counts": {"$arrayToObject": "$status_counts"},
+            "updated_at": datetime.utcnow(),
+        }},
+        {"$merge": {"into": "user_stats", "on": "_id", "whenMatched": "replace", "whenNotMatched": "insert"}},
+    ]
+
+
+def activity_counters(activities: List[dict]) -> Dict[str, float]:
+    """The counters ACTIVITY_COUNTERS computes, for an activities array already in hand."""
+    costs = [a.get("cost") for a in activities]
+    return {
+        "activity_count": len(activities),
+        "completed_count": sum(1 for a in activities if a.get("is_completed") is True),
+        "total_cost": sum(c for c in costs if isinstance(c, (int, float)) and not isinstance(c, bool)),
+    }
+
+
+def status_key(status) -> str:
+    """A wishlist status as stored, whether given as an enum or a string."""
+    return getattr(status, "value", status) or DEFAULT_STATUS
+
+
+async def update_user_stats(
+    user_id: str,
+    wishlists: int = 0,
+    statuses: Optional[Dict[str, int]] = None,
+    counters: Optional[Dict[str, float]] = None
+) -> None:
+    """
+    Apply a change to a user's summary document with $inc, in the same
+    request as the write it reflects. Zero changes cost no round trip.
+    """
+    inc = {"wishlist_count": wishlists, **(counters or {})}
+    for status, change in (statuses or {}).items():
+        inc[f"status_counts.{status_key(status)}"] = change
+    inc = {field: change for field, change in inc.items() if change}
+    if not inc:
+        return
+    await db.user_stats.update_one(
+        {"_id": user_id},
+        {"$inc": inc, "$set": {"updated_at": datetime.utcnow()}},
+        upsert=True
+    )
+
+
+async def get_user_stats(user_id: str) -> Optional[Dict]:
+    """Read a user's precomputed summary document."""
+    return await db.user_stats.find_one({"_id": user_id})
+
+
+async def rebuild_stats() -> None:
+    """
+    Recompute every wishlist's counters and every user's summary from scratch.
+    Writes keep both up to date with deltas; this repairs drift and seeds
+    documents written before the counters existed. Every wishlist's version
+    is bumped, since its counters are part of the body its ETag stands for.
+    """
+    if uses_activity_collection():
+        await recount_all_activities()
+    else:
+        await db.wishlists.update_many({}, [counters_stage(), pipeline_version_stage()])
+    await db.user_stats.delete_many({})
+    await db.wishlists.aggregate(_user_stats_pipeline({})).to_list(length=None)
@@ -0,0 +1,190 @@
+import os
+import re
+import heapq
+import bisect
+import asyncio
+import unicodedata
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+from database import db
+
+# Full rebuild interval, to pick up writes made by other app processes
+SUGGEST_REFRESH_INTERVAL_SECONDS = float(os.getenv("SUGGEST_REFRESH_INTERVAL_SECONDS", 300))
+
+_WORD = re.compile(r"\w+")
+
+
+def normalize(text: str) -> str:
+    """Lowercase and strip accents so "Café" matches "cafe"."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def _trigrams(word: str) -> Set[str]:
+    """Trigrams of a word padded at the start, so its 1- and 2-letter prefixes are trigrams too."""
+    padded = "  " + word
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """
+    In-memory word-prefix index over wishlist names for type-ahead.
+    
+    Names are kept sorted so names starting with the query are a bisect away;
+    every word is also split into start-padded trigrams, so names where the
+    query words start later words are found by intersecting posting sets.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Set[str]] = defaultdict(set)
+        self._names: Dict[str, Tuple[str, str]] = {}
+        # (words joined by single spaces, wishlist id), sorted
+        self._sorted: List[Tuple[str, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def add(self, wishlist_id: str, name: Optional[str]) -> None:
+        """Index (or re-index) a wishlist's name."""
+        self.remove(wishlist_id)
+        if not name:
+            return
+        key = " ".join(_WORD.findall(normalize(name)))
+        if not key:
+            return
+        self._names[wishlist_id] = (name, key)
+        bisect.insort(self._sorted, (key, wishlist_id))
+        for word in key.split(" "):
+            for trigram in _trigrams(word):
+                self._postings[trigram].add(wishlist_id)
+
+    def remove(self, wishlist_id: str) -> None:
+        """Drop a wishlist from the index."""
+        entry = self._names.pop(wishlist_id, None)
+        if entry is None:
+            return
+        key = entry[1]
+        position = bisect.bisect_left(self._sorted, (key, wishlist_id))
+        if position < len(self._sorted) and self._sorted[position] == (key, wishlist_id):
+            del self._sorted[position]
+        for word in key.split(" "):
+            for trigram in _trigrams(word):
+                posting = self._postings.get(trigram)
+                if posting is not None:
+                    posting.discard(wishlist_id)
+                    if not posting:
+                        del self._postings[trigram]
+
+    def search(self, query: str, limit: int = 10) -> List[dict]:
+        """
+        Names whose words start with every word of the query.
+        Names starting with the query come first, alphabetically, then the rest
+        shortest first.
+        """
+        terms = _WORD.findall(normalize(query))
+        if not terms or limit < 1:
+            return []
+        prefix = " ".join(terms)
+
+        found = []
+        position = bisect.bisect_left(self._sorted, (prefix,))
+        while len(found) < limit and position < len(self._sorted):
+            key, wishlist_id = self._sorted[position]
+            if not key.startswith(prefix):
+                break
+            found.append(wishlist_id)
+            position += 1
+
+        if len(found) < limit:
+            found.extend(self._word_matches(terms, set(found), limit - len(found)))
+        return [{"id": wishlist_id, "name": self._names[wishlist_id][0]} for wishlist_id in found]
+
+    def _word_matches(self, terms: List[str], exclude: Set[str], limit: int) -> List[str]:
+        """IDs of names where each term starts some word, shortest names first."""
+        # Intersect the smallest posting sets first
+        postings = sorted(
+            (self._postings.get(trigram, set()) for term in terms for trigram in _trigrams(term)),
+            key=len
+        )
+        candidates = postings[0] - exclude
+        for posting in postings[1:]:
+            candidates &= posting
+            if not candidates:
+                return []
+
+        # Trigrams may come from different words, so confirm each term starts a word
+        patterns = [re.compile(r"(?:^| )" + re.escape(term)) for term in terms]
+        matches = (
+            (len(self._names[wishlist_id][1]), self._names[wishlist_id][1], wishlist_id)
+            for wishlist_id in candidates
+            if all(pattern.search(self._names[wishlist_id][1]) for pattern in patterns)
+        )
+        return [wishlist_id for _, _, wishlist_id in heapq.nsmallest(limit, matches)]
+
+
+suggest_index = TrigramIndex()
+_refresh_task: Optional[asyncio.Task] = None
+# Writes seen while a rebuild is running, replayed onto the new index
+_journal: Optional[List[Tuple[str, Optional[str]]]] = None
+
+
+def index_wishlist(wishlist_id: str, name: Optional[str]) -> None:
+    """Add or update a wishlist in the type-ahead index after a write."""
+    suggest_index.add(wishlist_id, name)
+    if _journal is not None:
+        _journal.append((wishlist_id, name))
+
+
+def unindex_wishlist(wishlist_id: str) -> None:
+    """Remove a deleted wishlist from the type-ahead index."""
+    index_wishlist(wishlist_id, None)
+
+
+def suggest(query: str, limit: int = 10) -> List[dict]:
+    """Type-ahead suggestions for a partial place name."""
+    return suggest_index.search(query, limit)
+
+
+async def rebuild_suggest_index() -> int:
+    """Rebuild the type-ahead index from every wishlist name. Returns the number indexed."""
+    global suggest_index, _journal
+    index = TrigramIndex()
+    _journal = []
+    try:
+        async for wishlist in db.wishlists.find({}, {"name": 1}):
+            index.add(str(wishlist["_id"]), wishlist.get("name"))
+        for wishlist_id, name in _journal:
+            index.add(wishlist_id, name)
+        # Swap in the finished index so lookups never see a half-built one
+        suggest_index = index
+    finally:
+        _journal = None
+    return len(index)
+
+
+async def _refresher() -> None:
+    while True:
+        await asyncio.sleep(SUGGEST_REFRESH_INTERVAL_SECONDS)
+        try:
+            await rebuild_suggest_index()
+        except Exception as e:
+            print(f"Error rebuilding suggest index: {e}")
+
+
+async def start_suggest_index() -> None:
+    """Build the index and schedule periodic rebuilds. Called on application startup."""
+    global _refresh_task
+    indexed = await rebuild_suggest_index()
+    print(f"🔎 Type-ahead index built with {indexed} place name(s)")
+    if _refresh_task is None:
+        _refresh_task = asyncio.create_task(_refresher())
+
+
+async def stop_suggest_index() -> None:
+    """Cancel periodic rebuilds. Called on application shutdown."""
+    global _refresh_task
+    if _refresh_task is not None:
+        _refresh_task.cancel()
+        await asyncio.gather(_refresh_task, return_exceptions=True)
+        _refresh_task = None
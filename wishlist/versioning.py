@@ -0,0 +1,37 @@
+from datetime import datetime
+
+from database import db
+
+# Counter document whose value changes whenever any wishlist changes
+COLLECTION_VERSION_ID = "wishlists"
+
+
+def with_version(update: dict) -> dict:
+    """Add a version bump and updated_at timestamp to an update document."""
+    update = dict(update)
+    update["$inc"] = {**update.get("$inc", {}), "version": 1}
+    update["$set"] = {**update.get("$set", {}), "updated_at": datetime.utcnow()}
+    return update
+
+
+def pipeline_version_stage() -> dict:
+    """Pipeline-update equivalent of with_version, for aggregation-pipeline updates."""
+    return {"$set": {
+        "version": {"$add": [{"$ifNull": ["$version", 0]}, 1]},
+        "updated_at": datetime.utcnow()
+    }}
+
+
+async def bump_collection_version() -> None:
+    """Mark the wishlists collection as changed. Call after every wishlist mutation."""
+    await db.counters.update_one(
+        {"_id": COLLECTION_VERSION_ID},
+        {"$inc": {"version": 1}},
+        upsert=True
+    )
+
+
+async def get_collection_version() -> int:
+    """Current wishlists collection version; 0 before the first mutation."""
+    counter = await db.counters.find_one({"_id": COLLECTION_VERSION_ID})
+    return counter["version"] if counter else 0